@@ -1,8 +1,9 @@
 from django.contrib import admin
 
-from apps.game.models import Player, Game, Round
+from apps.game.models import Player, PlayerStats, Game, Round
 
 
 admin.site.register(Player)
 admin.site.register(Game)
 admin.site.register(Round)
+admin.site.register(PlayerStats)
@@ -0,0 +1,232 @@
+"""Async versions of the core game API views.
+
+These views are plain Django async views, so under ASGI they run on the
+event loop instead of a worker thread and use Django's async ORM interface
+(``aget``, ``acreate``, async iteration...). They return the same payloads
+as their counterparts in ``views.py`` and are served instead of them when
+the ``GAME_API_ASYNC`` setting is enabled.
+
+Django does not support transactions in async code yet, so the round
+submission pipeline, which needs a locked transaction, still runs as a
+single ``sync_to_async`` call.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from apps.game.models import Game
+from apps.game.api.pagination import GameCursorPagination
+from apps.game.api.cache import GAME_PAYLOADS_CACHE, game_etag, game_detail_key, cache_game_detail
+from apps.game.api.idempotency import IdempotentMixin
+from apps.game.api.ingestion import BacklogFullError, submit_rounds
+from apps.game.api.metrics import timer
+from apps.game.api.rendering import render_game, render_games, render_game_page
+from apps.game.api.services import aresolve_players, record_rounds, GameFinishedError
+from apps.game.api.serializers import (
+    NewGameSerializer,
+    GameSerializer,
+    GameFieldsQuerySerializer,
+    ErrorDetailSerializer,
+    RoundSerializer,
+    RoundBatchSerializer,
+    RoundBatchResultSerializer
+)
+
+
+def render(data, status_code: int = status.HTTP_200_OK, headers: dict | None = None) -> HttpResponse:
+    """Render data as JSON the same way DRF's JSONRenderer does."""
+    with timer('render'):
+        content = JSONRenderer().render(data)
+    return HttpResponse(
+        content,
+        content_type='application/json',
+        status=status_code,
+        headers=headers
+    )
+
+
+def error(detail: str, code: str, status_code: int) -> HttpResponse:
+    """Render an error payload."""
+    return render(ErrorDetailSerializer({'detail': detail, 'code': code}).data, status_code)
+
+
+def parse_json(request: HttpRequest):
+    """Parse the JSON body of a request, returning None if it is malformed."""
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+class GameListView(View):
+    """Async view to list all games.
+    """
+    pagination_class = GameCursorPagination
+
+    async def get(self, request: HttpRequest):
+        """Handle GET request to list all games.
+        """
+        query = GameFieldsQuerySerializer(data=request.GET)
+        if not query.is_valid():
+            return render(query.errors, status.HTTP_400_BAD_REQUEST)
+
+        paginator = self.pagination_class()
+        drf_request = Request(request)
+        if settings.GAME_API_FAST_RENDER and not query.get_variant():
+            if paginator.is_requested(drf_request):
+                content = await sync_to_async(render_game_page)(paginator, Game.objects.all(), drf_request)
+            else:
+                content = await sync_to_async(render_games)(Game.objects.all())
+            return HttpResponse(content, content_type='application/json')
+
+        fields, expand = query.get_queryset_fields()
+        games = Game.objects.with_fields([*fields, 'created_at'], expand)
+        if paginator.is_requested(drf_request):
+            page = await sync_to_async(paginator.paginate_queryset)(games, drf_request)
+            return render(paginator.get_paginated_response(
+                GameSerializer(page, many=True, **query.get_serializer_kwargs()).data
+            ).data)
+        return render(GameSerializer(
+            [game async for game in games], many=True, **query.get_serializer_kwargs()
+        ).data)
+
+
+class GameDetailView(View):
+    """Async view to retrieve game details.
+    """
+
+    async def get(self, request: HttpRequest, game_id: str):
+        """Handle GET request to retrieve game details.
+        """
+        query = GameFieldsQuerySerializer(data=request.GET)
+        if not query.is_valid():
+            return render(query.errors, status.HTTP_400_BAD_REQUEST)
+        variant = query.get_variant()
+
+        try:
+            rounds_played, finished_at, *scores = await Game.objects.values_list(
+                *query.get_version_fields()
+            ).aget(id=game_id)
+        except Game.DoesNotExist:
+            return error("Game not found", "game_not_found", status.HTTP_404_NOT_FOUND)
+
+        etag = game_etag(game_id, rounds_played, finished_at, variant, scores)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return HttpResponseNotModified(headers={'ETag': etag})
+
+        content = await caches[GAME_PAYLOADS_CACHE].aget(game_detail_key(game_id, etag))
+        if content is not None:
+            return HttpResponse(content, content_type='application/json', headers={'ETag': etag})
+
+        if settings.GAME_API_FAST_RENDER and not variant:
+            try:
+                row, content = await sync_to_async(render_game)(game_id)
+            except Game.DoesNotExist:
+                return error("Game not found", "game_not_found", status.HTTP_404_NOT_FOUND)
+            etag = game_etag(
+                game_id, row.rounds_played, row.finished_at, scores=(row.player1__score, row.player2__score)
+            )
+            await sync_to_async(cache_game_detail)(game_id, etag, content, finished=bool(row.finished_at))
+            return HttpResponse(content, content_type='application/json', headers={'ETag': etag})
+
+        fields, expand = query.get_queryset_fields()
+        try:
+            game = await Game.objects.with_fields(
+                [*fields, 'rounds_played', 'finished_at'], expand
+            ).aget(id=game_id)
+        except Game.DoesNotExist:
+            return error("Game not found", "game_not_found", status.HTTP_404_NOT_FOUND)
+        # The scores read above are never newer than the ones rendered.
+        etag = game_etag(game_id, game.rounds_played, game.finished_at, variant, scores)
+        response = render(GameSerializer(game, **query.get_serializer_kwargs()).data, headers={'ETag': etag})
+        await sync_to_async(cache_game_detail)(game_id, etag, response.content, finished=bool(game.finished_at))
+        return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class NewGameView(IdempotentMixin, View):
+    """Async view to create a new game.
+    """
+
+    async def post(self, request: HttpRequest):
+        """Handle POST request to create a new game.
+        """
+        data = parse_json(request)
+        if data is None:
+            return error("JSON parse error", "parse_error", status.HTTP_400_BAD_REQUEST)
+        serializer = NewGameSerializer(data=data)
+        if not serializer.is_valid():
+            return render(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        player1_name = serializer.validated_data['player1_name']
+        player2_name = serializer.validated_data['player2_name']
+        if player1_name.lower() == player2_name.lower():
+            return render(
+                ErrorDetailSerializer({
+                    'detail': "Player names must be different.",
+                    'code': 'duplicate_player_names'
+                }).data,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        player1, player2 = await aresolve_players(player1_name, player2_name)
+        game = await Game.objects.acreate(player1=player1, player2=player2)
+        game = await Game.objects.with_details().aget(id=game.id)
+        return render(GameSerializer(game).data, status.HTTP_201_CREATED)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class NewRoundView(IdempotentMixin, View):
+    """Async view to create one or more rounds in a game.
+    """
+
+    async def post(self, request: HttpRequest, game_id: str):
+        """Handle POST request to create a new round.
+        """
+        data = parse_json(request)
+        if data is None:
+            return error("JSON parse error", "parse_error", status.HTTP_400_BAD_REQUEST)
+        is_batch = isinstance(data, dict) and 'rounds' in data
+        serializer = (RoundBatchSerializer if is_batch else RoundSerializer)(data=data)
+        if not serializer.is_valid():
+            return render(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        rounds_data = serializer.validated_data['rounds'] if is_batch else [serializer.validated_data]
+        moves = [(r['player1_choice'], r['player2_choice']) for r in rounds_data]
+        try:
+            if settings.GAME_ROUND_WRITE_BEHIND:
+                rounds = await sync_to_async(submit_rounds)(game_id, moves)
+            else:
+                rounds = await sync_to_async(record_rounds)(game_id, moves)
+        except GameFinishedError:
+            return error(
+                "Cannot create a new round for a finished game",
+                "game_finished",
+                status.HTTP_400_BAD_REQUEST
+            )
+        except Game.DoesNotExist:
+            return error("Game not found", "game_not_found", status.HTTP_404_NOT_FOUND)
+        except BacklogFullError:
+            return error(
+                "Too many rounds are waiting to be saved, retry later",
+                "rounds_backlog_full",
+                status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        if is_batch:
+            return render(
+                RoundBatchResultSerializer({'rounds': rounds, 'ignored': len(moves) - len(rounds)}).data,
+                status.HTTP_201_CREATED
+            )
+        return render(RoundSerializer(rounds[0]).data, status.HTTP_201_CREATED)
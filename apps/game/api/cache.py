@@ -0,0 +1,275 @@
+"""Caching for the game app.
+
+The app uses named caches so each kind of entry can live in the backend
+that suits it (see ``CACHES`` in the settings):
+
+* ``game_payloads``: rendered game detail payloads.
+* ``leaderboard``: leaderboard rankings.
+* ``idempotency``: responses of idempotent requests, to replay retries
+  without touching the database.
+* ``rate_limits``: request counters of throttled clients.
+* ``matchmaking``: the queue of ``CacheMatchmaker``, shared by the workers.
+
+Keys of mutable data are versioned instead of invalidated: game payloads
+are keyed by the state of the game and the scores of its players, and
+leaderboard entries by a generation number, so a change moves readers to new keys and old entries just expire.
+
+The local memory and file backends below count hits, misses and evictions;
+``cache_stats`` reports them together with the server counters of Redis
+and memcached caches.
+"""
+from collections import Counter, OrderedDict
+from hashlib import sha1
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends import filebased, locmem
+from django.core.cache.backends.memcached import PyLibMCCache
+from django.core.cache.backends.redis import RedisCache
+
+
+GAME_PAYLOADS_CACHE = 'game_payloads'
+LEADERBOARD_CACHE = 'leaderboard'
+IDEMPOTENCY_CACHE = 'idempotency'
+RATE_LIMITS_CACHE = 'rate_limits'
+MATCHMAKING_CACHE = 'matchmaking'
+
+STAT_NAMES = ('hits', 'misses', 'evictions')
+
+LEADERBOARD_GENERATION_KEY = 'game:leaderboard:generation'
+LEADERBOARD_TIMEOUT = 60 * 60
+
+FINISHED_GAME_DETAIL_TIMEOUT = 60 * 60 * 24
+ACTIVE_GAME_DETAIL_TIMEOUT = 60
+
+
+def leaderboard_generation() -> int:
+    """Return the current leaderboard generation.
+
+    Every leaderboard key embeds the generation, so bumping it invalidates all
+    cached rankings at once without having to know which keys exist.
+    """
+    cache = caches[LEADERBOARD_CACHE]
+    generation = cache.get(LEADERBOARD_GENERATION_KEY)
+    if generation is None:
+        cache.add(LEADERBOARD_GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(LEADERBOARD_GENERATION_KEY, 1)
+    return generation
+
+
+def leaderboard_key(*parts) -> str:
+    """Build a cache key for the current leaderboard generation."""
+    return ':'.join(['game:leaderboard', str(leaderboard_generation()), *map(str, parts)])
+
+
+def invalidate_leaderboard() -> None:
+    """Invalidate every cached leaderboard entry."""
+    cache = caches[LEADERBOARD_CACHE]
+    try:
+        cache.incr(LEADERBOARD_GENERATION_KEY)
+    except ValueError:
+        cache.set(LEADERBOARD_GENERATION_KEY, 2, timeout=None)
+
+
+def game_etag(game_id, rounds_played: int, finished_at, variant: str = '', scores: tuple = ()) -> str:
+    """Build a strong ETag for the detail representation of a game.
+
+    A game only changes when a round is recorded or when it finishes, so its
+    id, the number of rounds played and the finish time identify a version.
+    The embedded players also carry their ``scores``, which keep changing
+    after the game ends as they win other games. ``variant`` names the field
+    selection of the representation, since each selection is a different
+    entity.
+    """
+    finished = finished_at.isoformat() if finished_at else ''
+    scores = ','.join(map(str, scores))
+    return '"%s"' % sha1(f'{game_id}:{rounds_played}:{finished}:{scores}:{variant}'.encode()).hexdigest()
+
+
+def game_detail_key(game_id, etag: str) -> str:
+    """Build the cache key of a rendered detail payload of a game.
+
+    The key embeds the ETag, which identifies the version and the field
+    selection of the representation, so a game that changes is read from a
+    new key and never served stale.
+    """
+    version = etag.strip('"')
+    return f'game:detail:{game_id}:{version}'
+
+
+def cache_game_detail(game_id, etag: str, content: bytes, finished: bool) -> None:
+    """Cache a rendered detail payload of a game under its ETag.
+
+    Finished games are immutable and kept for a long time; payloads of games
+    in progress are short-lived, as the next round makes them unreachable.
+    """
+    timeout = FINISHED_GAME_DETAIL_TIMEOUT if finished else ACTIVE_GAME_DETAIL_TIMEOUT
+    caches[GAME_PAYLOADS_CACHE].set(game_detail_key(game_id, etag), content, timeout)
+
+
+def get_cached_game_detail(game_id, etag: str) -> bytes | None:
+    """Return the cached detail payload of a game version, if any."""
+    return caches[GAME_PAYLOADS_CACHE].get(game_detail_key(game_id, etag))
+
+
+class LRUCache:
+    """A small thread-safe in-process LRU mapping.
+
+    Used for hot lookups that are cheap to verify but expensive to resolve,
+    such as player name to player id.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` and mark it as recently used."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value) -> None:
+        """Store ``value`` for ``key``, evicting the least recently used entry."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        """Remove ``key`` from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheStats:
+    """Thread-safe hit, miss and eviction counters of a cache location."""
+
+    _registry = {}
+    _registry_lock = Lock()
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = Lock()
+
+    @classmethod
+    def for_location(cls, location: str) -> 'CacheStats':
+        """Return the counters shared by every backend instance of a location.
+
+        Django creates a backend instance per thread, so the counters are
+        kept per location, like the local memory cache keeps its data.
+        """
+        with cls._registry_lock:
+            return cls._registry.setdefault(location, cls())
+
+    def incr(self, name: str, count: int = 1) -> None:
+        """Add ``count`` to a counter."""
+        if count:
+            with self._lock:
+                self._counts[name] += count
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the current value of every counter."""
+        with self._lock:
+            return {name: self._counts[name] for name in STAT_NAMES}
+
+    def reset(self) -> None:
+        """Set every counter back to zero."""
+        with self._lock:
+            self._counts.clear()
+
+
+class InstrumentedCacheMixin:
+    """Count the hits and misses of a Django cache backend.
+
+    ``get_many`` and the async methods of the base backend go through
+    ``get``, so every read is counted once per key.
+    """
+    _missing = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._missing, version)
+        if value is self._missing:
+            self.stats.incr('misses')
+            return default
+        self.stats.incr('hits')
+        return value
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    """Local memory cache that counts hits, misses and evictions."""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self.stats = CacheStats.for_location(f'locmem:{name}')
+
+    def _cull(self):
+        size = len(self._cache)
+        super()._cull()
+        self.stats.incr('evictions', size - len(self._cache))
+
+
+class FileBasedCache(InstrumentedCacheMixin, filebased.FileBasedCache):
+    """File-based cache that counts hits, misses and evictions."""
+    _culling = False
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self.stats = CacheStats.for_location(f'file:{self._dir}')
+
+    def _cull(self):
+        self._culling = True
+        try:
+            super()._cull()
+        finally:
+            self._culling = False
+
+    def _delete(self, fname):
+        deleted = super()._delete(fname)
+        if deleted and self._culling:
+            self.stats.incr('evictions')
+        return deleted
+
+
+def backend_stats(backend) -> dict[str, int] | None:
+    """Return the hit, miss and eviction counters of a cache backend.
+
+    Local backends report the counters of this process; Redis and memcached
+    report the counters of their servers, which are shared by every client.
+    Backends without counters return ``None``.
+    """
+    if isinstance(backend, InstrumentedCacheMixin):
+        return backend.stats.as_dict()
+    if isinstance(backend, RedisCache):
+        info = backend._cache.get_client().info('stats')
+        return {
+            'hits': info['keyspace_hits'],
+            'misses': info['keyspace_misses'],
+            'evictions': info['evicted_keys'],
+        }
+    if isinstance(backend, PyLibMCCache):
+        totals = Counter()
+        for _, server in backend._cache.get_stats():
+            totals['hits'] += int(server['get_hits'])
+            totals['misses'] += int(server['get_misses'])
+            totals['evictions'] += int(server['evictions'])
+        return {name: totals[name] for name in STAT_NAMES}
+    return None
+
+
+def cache_stats() -> dict[str, dict[str, int] | None]:
+    """Return the counters of every configured cache by alias."""
+    return {alias: backend_stats(caches[alias]) for alias in caches}
@@ -0,0 +1,134 @@
+"""Pure computation engine for resolving rounds and games.
+
+This module holds the rules of the game and knows nothing about the ORM.
+Choices are encoded as small integers so whole arrays of rounds can be
+resolved at once with NumPy, e.g. for simulations, load testing or
+analytics. The ORM-facing functions in ``services.py`` use the same tables,
+so there is a single source of truth for who beats whom.
+"""
+import numpy as np
+
+
+CHOICES = {
+    'rock': 'scissors',
+    'scissors': 'paper',
+    'paper': 'rock',
+}
+
+ROUNDS_TO_WIN = 3
+
+CHOICE_CODES = {choice: code for code, choice in enumerate(('rock', 'paper', 'scissors'))}
+
+DRAW = 0
+PLAYER1 = 1
+PLAYER2 = 2
+
+OUTCOME_TABLE = tuple(
+    tuple(
+        DRAW if p1 == p2 else PLAYER1 if CHOICES[p1] == p2 else PLAYER2
+        for p2 in CHOICE_CODES
+    )
+    for p1 in CHOICE_CODES
+)
+
+OUTCOMES = np.array(OUTCOME_TABLE, dtype=np.int8)
+
+
+def resolve_round(player1_choice: str, player2_choice: str) -> int:
+    """Resolve a single round.
+
+    Args:
+        player1_choice (str): The choice of the first player.
+        player2_choice (str): The choice of the second player.
+    Returns:
+        int: ``DRAW``, ``PLAYER1`` or ``PLAYER2``.
+    """
+    return OUTCOME_TABLE[CHOICE_CODES[player1_choice]][CHOICE_CODES[player2_choice]]
+
+
+def decide_game(player1_wins: int, player2_wins: int, rounds_to_win: int = ROUNDS_TO_WIN) -> int:
+    """Decide a game from the number of rounds won by each player.
+
+    Args:
+        player1_wins (int): Rounds won by the first player.
+        player2_wins (int): Rounds won by the second player.
+        rounds_to_win (int): Rounds a player needs to win the game.
+    Returns:
+        int: ``PLAYER1`` or ``PLAYER2`` if the game is decided, otherwise ``DRAW``.
+    """
+    if player1_wins >= rounds_to_win:
+        return PLAYER1
+    if player2_wins >= rounds_to_win:
+        return PLAYER2
+    return DRAW
+
+
+def encode_choices(choices) -> np.ndarray:
+    """Encode an iterable of choice names as an array of choice codes.
+
+    Args:
+        choices: Choice names such as ``'rock'``.
+    Returns:
+        np.ndarray: The choice codes as ``int8``.
+    """
+    return np.fromiter((CHOICE_CODES[choice] for choice in choices), dtype=np.int8)
+
+
+def resolve_rounds(player1_codes: np.ndarray, player2_codes: np.ndarray) -> np.ndarray:
+    """Resolve arrays of rounds with a lookup in the outcome table.
+
+    Args:
+        player1_codes (np.ndarray): Choice codes of the first player.
+        player2_codes (np.ndarray): Choice codes of the second player, same shape.
+    Returns:
+        np.ndarray: The outcome of every round, with the same shape as the inputs.
+    """
+    return OUTCOMES[player1_codes, player2_codes]
+
+
+def resolve_games(
+    player1_codes: np.ndarray,
+    player2_codes: np.ndarray,
+    rounds_to_win: int = ROUNDS_TO_WIN
+) -> tuple[np.ndarray, np.ndarray]:
+    """Resolve a batch of games played as first-to-``rounds_to_win``.
+
+    Each row of the inputs holds the choices of one game, one column per round.
+    Running win counts are computed with cumulative sums and a game ends at the
+    first round where either count reaches ``rounds_to_win``.
+
+    Args:
+        player1_codes (np.ndarray): ``(games, rounds)`` choice codes of the first player.
+        player2_codes (np.ndarray): ``(games, rounds)`` choice codes of the second player.
+        rounds_to_win (int): Rounds a player needs to win the game.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The winner of every game (``DRAW`` if
+        undecided) and the number of rounds played in it.
+    """
+    outcomes = resolve_rounds(player1_codes, player2_codes)
+    player1_done = np.cumsum(outcomes == PLAYER1, axis=1) >= rounds_to_win
+    player2_done = np.cumsum(outcomes == PLAYER2, axis=1) >= rounds_to_win
+    decided = player1_done | player2_done
+
+    is_decided = decided.any(axis=1)
+    last_round = np.where(is_decided, decided.argmax(axis=1), outcomes.shape[1] - 1)
+
+    rows = np.arange(outcomes.shape[0])
+    winners = np.where(
+        is_decided,
+        np.where(player1_done[rows, last_round], PLAYER1, PLAYER2),
+        DRAW
+    ).astype(np.int8)
+    return winners, last_round + 1
+
+
+def random_choices(shape, seed: int | None = None) -> np.ndarray:
+    """Draw uniformly random choice codes, e.g. to simulate bots.
+
+    Args:
+        shape: Shape of the array to draw.
+        seed (int | None): Seed for reproducible draws.
+    Returns:
+        np.ndarray: Random choice codes as ``int8``.
+    """
+    return np.random.default_rng(seed).integers(0, len(CHOICE_CODES), size=shape, dtype=np.int8)
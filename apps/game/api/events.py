@@ -0,0 +1,118 @@
+"""Publish/subscribe channel for real-time game events.
+
+Events are published from the synchronous service layer once the database
+transaction that produced them commits, and delivered to subscribers that
+live on an asyncio event loop (the SSE view served under ASGI). Idle
+subscribers are just parked coroutines waiting on a queue, so a worker can
+hold many of them without dedicating a thread to each connection.
+
+The broker is looked up through the ``GAME_EVENTS_BROKER`` setting so the
+in-process implementation can be swapped for one backed by a shared broker
+when running several workers.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """A single subscriber to a channel."""
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop):
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event: dict) -> None:
+        """Queue an event; must run on the subscriber's event loop.
+
+        Events for a slow subscriber are dropped, except ``game_finished``,
+        which ends the stream and takes the place of the oldest queued event.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            if event.get('type') != 'game_finished':
+                logger.warning("Dropping event for slow subscriber on %s", self.channel)
+                return
+            logger.warning("Dropping oldest event for slow subscriber on %s", self.channel)
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        """Wait for the next event."""
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """Fan out events to the subscribers of this process."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        """Subscribe to a channel for the duration of the context."""
+        subscription = Subscription(channel, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[channel].discard(subscription)
+                if not self._subscriptions[channel]:
+                    del self._subscriptions[channel]
+
+    def publish(self, channel: str, event: dict) -> None:
+        """Send an event to every subscriber of a channel.
+
+        Safe to call from any thread, including threads without an event loop.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has been closed.
+                pass
+
+    def subscriber_count(self, channel: str) -> int:
+        """Return the number of subscribers of a channel."""
+        with self._lock:
+            return len(self._subscriptions.get(channel, ()))
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Return the configured event broker."""
+    return import_string(settings.GAME_EVENTS_BROKER)()
+
+
+def game_channel(game_id) -> str:
+    """Return the channel name of a game."""
+    return f'game:{game_id}'
+
+
+def publish_game_event(game_id, event: dict) -> None:
+    """Publish an event on the channel of a game."""
+    get_broker().publish(game_channel(game_id), {'game': str(game_id), **event})
+
+
+def format_sse(event: dict) -> str:
+    """Encode an event as a Server-Sent Events message."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
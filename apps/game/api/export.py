@@ -0,0 +1,148 @@
+"""Streaming exports of games and rounds.
+
+Exports read the table through ``QuerySet.iterator()``, which uses a
+server-side cursor on PostgreSQL, and turn each chunk of rows into text as
+it is consumed, so memory stays constant no matter how many rows are
+exported. Under ASGI, Django would buffer a synchronous streaming iterator
+whole, so ``astream_export`` produces the same chunks one at a time from a
+worker thread. Rows are ordered by ``(updated_at, id)``: a client doing
+incremental pulls passes the largest ``updated_at`` it has seen as
+``updated_since`` on the next pull. The watermark is inclusive, so rows
+updated at that exact instant are sent again and must be upserted.
+"""
+import csv
+import json
+from datetime import datetime
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+
+from apps.game.models import Game, Round
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+EXPORT_RESOURCES = {
+    'games': (Game, (
+        'id',
+        'player1_id',
+        'player1__name',
+        'player2_id',
+        'player2__name',
+        'winner_id',
+        'player1_wins',
+        'player2_wins',
+        'rounds_played',
+        'created_at',
+        'finished_at',
+        'updated_at',
+    )),
+    'rounds': (Round, (
+        'id',
+        'game_id',
+        'round_number',
+        'player1_choice',
+        'player2_choice',
+        'round_winner_id',
+        'created_at',
+        'updated_at',
+    )),
+}
+
+
+class Echo:
+    """File-like object that returns what is written, for ``csv.writer``."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_value(value):
+    """Convert a database value to its exported form."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def export_rows(resource: str, updated_since: datetime | None = None, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Return the column names and a row iterator of an export.
+
+    Args:
+        resource (str): ``games`` or ``rounds``.
+        updated_since (datetime | None): Only export rows updated at or after this instant.
+        chunk_size (int): Rows fetched from the database at a time.
+    Returns:
+        tuple: The column names and an iterator of row tuples.
+    """
+    model, columns = EXPORT_RESOURCES[resource]
+    queryset = model.objects.order_by('updated_at', 'id')
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    header = [column.replace('__', '_') for column in columns]
+    return header, queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(header: list[str], rows):
+    """Encode rows as newline-delimited JSON objects."""
+    for row in rows:
+        record = dict(zip(header, map(export_value, row)))
+        yield json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def csv_lines(header: list[str], rows):
+    """Encode rows as CSV lines, starting with the header."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([export_value(value) for value in row])
+
+
+def stream_export(
+    resource: str,
+    export_format: str,
+    updated_since: datetime | None = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+):
+    """Yield an export as text, one chunk of rows at a time.
+
+    Lines are grouped by ``chunk_size`` so the consumer writes a few large
+    blocks instead of one small write per row.
+    """
+    header, rows = export_rows(resource, updated_since, chunk_size)
+    lines = (ndjson_lines if export_format == 'ndjson' else csv_lines)(header, rows)
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def astream_export(
+    resource: str,
+    export_format: str,
+    updated_since: datetime | None = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+):
+    """Async version of ``stream_export``, for responses served under ASGI.
+
+    Every chunk is produced by ``stream_export`` in the thread-sensitive
+    worker thread, so the database cursor stays on one thread and only one
+    chunk is held in memory at a time.
+    """
+    chunks = stream_export(resource, export_format, updated_since, chunk_size)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
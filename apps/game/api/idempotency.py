@@ -0,0 +1,215 @@
+"""Idempotent POST requests through the ``Idempotency-Key`` header.
+
+Clients on unreliable networks retry requests whose response they never
+received. When a request carries an ``Idempotency-Key`` header, the key is
+inserted in the same transaction that handles the request and completed
+with the rendered response before commit. A retry with the same key finds
+the committed row and gets the recorded response back without running the
+view, so it never touches the game tables. Committed responses are also
+kept in the ``idempotency`` cache, which answers most retries without a
+database query.
+
+Concurrent duplicates are serialized by the unique index on the key: the
+second insert waits for the first transaction and, once it commits, fails
+and replays its response. If the first request fails with an exception or
+a server error, its transaction rolls back, the key is released and the
+duplicate runs normally.
+"""
+import json
+from contextlib import contextmanager
+from datetime import timedelta
+from hashlib import sha256
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.game.api.cache import IDEMPOTENCY_CACHE
+from apps.game.models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when a key is sent again with a different request."""
+
+
+def request_fingerprint(request: HttpRequest) -> str:
+    """Hash the parts of a request that must match for a replay.
+
+    A JSON body is hashed in canonical form, so a retry that only changes
+    whitespace or key order matches; any other body is hashed as is.
+    """
+    digest = sha256(f'{request.method} {request.path}\n'.encode())
+    try:
+        body = json.dumps(json.loads(request.body), sort_keys=True, separators=(',', ':')).encode()
+    except ValueError:
+        body = request.body
+    digest.update(body)
+    return digest.hexdigest()
+
+
+@contextmanager
+def idempotent(key: str, fingerprint: str):
+    """Claim an idempotency key for the duration of a transaction.
+
+    Yields the ``IdempotencyKey`` row. If it already holds a response, the
+    request is a retry and the caller must replay it; otherwise the caller
+    handles the request and stores the response with ``save_response``.
+
+    Raises:
+        IdempotencyKeyReusedError: If the key was used for a different request.
+    """
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(key=key, fingerprint=fingerprint)
+        except IntegrityError:
+            record = IdempotencyKey.objects.get(key=key)
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyReusedError(key)
+        yield record
+
+
+def idempotency_cache_key(key: str) -> str:
+    """Build the cache key of the response recorded for an idempotency key."""
+    return f'game:idempotency:{sha256(key.encode()).hexdigest()}'
+
+
+def cache_response(record: IdempotencyKey) -> None:
+    """Keep the response recorded on a key in the ``idempotency`` cache."""
+    caches[IDEMPOTENCY_CACHE].set(
+        idempotency_cache_key(record.key),
+        (record.fingerprint, record.status_code, bytes(record.content)),
+        settings.GAME_IDEMPOTENCY_KEY_TTL
+    )
+
+
+def save_response(record: IdempotencyKey, response: HttpResponse) -> None:
+    """Store a rendered response on a claimed key.
+
+    The response is cached once the transaction commits. Nothing is
+    recorded when the transaction is already marked for rollback, since it
+    cannot be written. A server error is not recorded either: the
+    transaction is rolled back explicitly, so the key is released and the
+    client can retry. Client errors are recorded and replayed like any
+    other response.
+    """
+    if transaction.get_rollback():
+        return
+    if response.status_code >= 500:
+        transaction.set_rollback(True)
+        return
+    record.status_code = response.status_code
+    record.content = response.content
+    record.save(update_fields=['status_code', 'content'])
+    transaction.on_commit(lambda: cache_response(record))
+
+
+def replay_response(status_code: int, content: bytes) -> HttpResponse:
+    """Rebuild a recorded response."""
+    return HttpResponse(
+        bytes(content),
+        status=status_code,
+        content_type='application/json',
+        headers={REPLAYED_HEADER: 'true'}
+    )
+
+
+def error_response(key: str) -> HttpResponse | None:
+    """Return the error response for an invalid key, if it is one."""
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return JsonResponse(
+            {
+                "detail": f"{IDEMPOTENCY_HEADER} must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters long",
+                "code": "invalid_idempotency_key"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+def reused_key_response() -> HttpResponse:
+    return JsonResponse(
+        {
+            "detail": f"This {IDEMPOTENCY_HEADER} was already used for a different request",
+            "code": "idempotency_key_reused"
+        },
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
+
+
+def handle_idempotent(request: HttpRequest, handler) -> HttpResponse:
+    """Run a request handler at most once per idempotency key.
+
+    Args:
+        request (HttpRequest): The request, carrying the key header.
+        handler: Callable returning the response of the request.
+    Returns:
+        HttpResponse: The response of the handler or the replayed one.
+    """
+    key = request.headers[IDEMPOTENCY_HEADER]
+    invalid = error_response(key)
+    if invalid is not None:
+        return invalid
+
+    fingerprint = request_fingerprint(request)
+    cached = caches[IDEMPOTENCY_CACHE].get(idempotency_cache_key(key))
+    if cached is not None:
+        cached_fingerprint, status_code, content = cached
+        if cached_fingerprint != fingerprint:
+            return reused_key_response()
+        return replay_response(status_code, content)
+
+    try:
+        with idempotent(key, fingerprint) as record:
+            if record.status_code is not None:
+                cache_response(record)
+                return replay_response(record.status_code, record.content)
+            response = handler()
+            if hasattr(response, 'render'):
+                response.render()
+            save_response(record, response)
+            return response
+    except IdempotencyKeyReusedError:
+        return reused_key_response()
+
+
+class IdempotentMixin:
+    """Make the POST handler of a view idempotent per ``Idempotency-Key``.
+
+    Works for DRF views and for async Django views. In async views the
+    handler runs through ``async_to_sync`` inside the thread that holds the
+    transaction, so its database calls join it.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        dispatch = super().dispatch
+        if request.method != 'POST' or IDEMPOTENCY_HEADER not in request.headers:
+            return dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            async def handler():
+                return await dispatch(request, *args, **kwargs)
+
+            return sync_to_async(handle_idempotent)(request, async_to_sync(handler))
+        return handle_idempotent(request, lambda: dispatch(request, *args, **kwargs))
+
+
+def purge_idempotency_keys() -> int:
+    """Delete the keys older than ``GAME_IDEMPOTENCY_KEY_TTL`` seconds.
+
+    Returns:
+        int: The number of keys deleted.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.GAME_IDEMPOTENCY_KEY_TTL)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
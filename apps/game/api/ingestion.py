@@ -0,0 +1,523 @@
+"""Write-behind ingestion of rounds.
+
+With ``GAME_ROUND_WRITE_BEHIND`` enabled, ``NewRoundView`` hands rounds to a
+``RoundIngestor`` instead of ``record_rounds``. The ingestor keeps the state
+of the games with unsaved rounds in memory, resolves the submitted rounds
+against it and answers at once, without a database round trip. A background
+thread writes the accepted rounds every ``GAME_ROUND_FLUSH_INTERVAL``
+seconds, or as soon as ``GAME_ROUND_FLUSH_SIZE`` rounds are waiting, in a
+single transaction: one ``bulk_create`` for the rounds of every game, then
+the player statistics, the winner's score and one UPDATE per game, exactly
+as ``record_rounds`` does. Round events are published once the rounds are
+committed.
+
+Accepted rounds are appended to a local journal, ``GAME_ROUND_JOURNAL_PATH``,
+and synced to disk before the response is sent; submissions waiting at the
+same time share one ``fsync``, issued by whichever of them gets there first.
+When a flush starts, the
+journal is renamed to a ``.flushing`` segment that is deleted once the
+flush commits. On startup ``replay`` writes whatever a previous process left
+in both files; rounds whose number the game already reached are skipped,
+so replaying a segment whose flush did commit is harmless. The ingestor is
+replayed and started with the server process, by ``start_ingestor`` in the
+WSGI and ASGI entry points, rather than inside the first request.
+
+A batch that fails is retried with an exponential backoff. After
+``GAME_ROUND_FLUSH_ATTEMPTS`` failures it is moved aside, together with the
+later rounds of its games, to a ``.failed`` file in the journal format, and
+its games are reloaded from the database. The set-aside rounds stay in the
+live journal until the next rotation, so ``replay`` skips every round id
+recorded in the ``.failed`` file. While rounds cannot be written
+they pile up in memory; past ``GAME_ROUND_MAX_BACKLOG`` rounds ``submit``
+raises ``BacklogFullError`` and the views answer 503.
+
+The in-memory state is authoritative for the games it holds, so every round
+submission must go through the same process: run a single writer process
+when the mode is enabled. The ingestor takes an exclusive ``flock`` on a
+``.lock`` file next to the journal before replaying it, so a second process
+sharing the journal refuses to start instead of writing over it. Reads are served from the database and lag behind
+by up to one flush interval, and persisted rounds take the time of the flush
+as their ``created_at``.
+"""
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.game.models import Game, Round
+from apps.game.api.engine import DRAW, decide_game
+from apps.game.api.stats import record_player_stats
+from apps.game.api.services import (
+    BULK_BATCH_SIZE,
+    GameFinishedError,
+    determine_game_winner,
+    determine_round_winner,
+    publish_game_events,
+    round_event
+)
+
+
+logger = logging.getLogger(__name__)
+
+FLUSH_MAX_BACKOFF = 30
+
+
+class BacklogFullError(Exception):
+    """Raised when too many accepted rounds are waiting to be written."""
+
+
+def journal_entry(game: Game, rounds: list[Round]) -> str:
+    """Return the journal line of rounds accepted for a game."""
+    entry = {
+        'game': str(game.id),
+        'rounds': [
+            [str(round_obj.id), round_obj.round_number, round_obj.player1_choice, round_obj.player2_choice]
+            for round_obj in rounds
+        ]
+    }
+    return json.dumps(entry, separators=(',', ':')) + '\n'
+
+
+class PendingRounds:
+    """The accepted rounds of a game that are not written yet.
+
+    ``player1_won`` and ``player2_won`` count the rounds won in the batch,
+    ``player1_wins`` and ``player2_wins`` are the game counters after it.
+    """
+    __slots__ = ('game', 'rounds', 'events', 'player1_won', 'player2_won', 'player1_wins', 'player2_wins')
+
+    def __init__(self, game: Game):
+        self.game = game
+        self.rounds = []
+        self.events = []
+        self.player1_won = self.player2_won = 0
+        self.player1_wins = game.player1_wins
+        self.player2_wins = game.player2_wins
+
+    def add(self, rounds: list[Round], events: list[dict]) -> None:
+        """Add rounds just played on ``game``."""
+        self.rounds += rounds
+        self.events += events
+        for round_obj in rounds:
+            if round_obj.round_winner_id == self.game.player1_id:
+                self.player1_won += 1
+            elif round_obj.round_winner_id is not None:
+                self.player2_won += 1
+        self.player1_wins = self.game.player1_wins
+        self.player2_wins = self.game.player2_wins
+
+
+class RoundIngestor:
+    """Accept rounds in memory and write them to the database in batches."""
+
+    def __init__(self, journal_path: str | Path, interval: float, max_pending: int,
+                 max_backlog: int = 100000, max_attempts: int = 10):
+        self.journal_path = Path(journal_path)
+        self.segment_path = self.journal_path.with_name(self.journal_path.name + '.flushing')
+        self.failed_path = self.journal_path.with_name(self.journal_path.name + '.failed')
+        self.lock_path = self.journal_path.with_name(self.journal_path.name + '.lock')
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_backlog = max_backlog
+        self.max_attempts = max_attempts
+        self._games = {}
+        self._pending = {}
+        self._pending_count = 0
+        self._flushing = None
+        self._flushing_count = 0
+        self._attempts = 0
+        self._journal = None
+        self._lock_file = None
+        self._lock = threading.Lock()
+        self._sync = threading.Condition()
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def submit(self, game_id, moves: list[tuple[str, str]]) -> list[Round]:
+        """Accept a sequence of rounds of a game.
+
+        The rounds are resolved like in ``record_rounds`` and journaled
+        before returning, but written to the database by a later flush.
+
+        Args:
+            game_id: The id of the game the rounds belong to.
+            moves (list[tuple[str, str]]): Pairs of (player1_choice, player2_choice).
+        Returns:
+            list[Round]: The accepted rounds, in order.
+        Raises:
+            Game.DoesNotExist: If the game does not exist.
+            GameFinishedError: If the game already has a winner.
+            BacklogFullError: If ``max_backlog`` rounds are waiting to be written.
+        """
+        with self._lock:
+            if self._pending_count + self._flushing_count >= self.max_backlog:
+                raise BacklogFullError(self.max_backlog)
+            game = self._get_game(game_id)
+            counters = game.rounds_played, game.player1_wins, game.player2_wins
+            rounds, events = self._play(game, moves)
+            try:
+                self._append_journal(game, rounds)
+            except OSError:
+                game.rounds_played, game.player1_wins, game.player2_wins = counters
+                raise
+            self._appended += 1
+            position = self._appended
+            self._queue(self._pending, game, rounds, events)
+            self._pending_count += len(rounds)
+            full = self._pending_count >= self.max_pending
+        self._sync_journal(position)
+        if full:
+            self._wake.set()
+        return rounds
+
+    def flush(self) -> int:
+        """Write the accepted rounds to the database.
+
+        A batch that failed to be written is retried before new rounds are
+        taken, and set aside after ``max_attempts`` failures.
+
+        Returns:
+            int: The number of rounds written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._flushing is None:
+                    if not self._pending:
+                        return 0
+                    self._flushing, self._flushing_count = self._pending, self._pending_count
+                    self._pending, self._pending_count = {}, 0
+                    self._rotate_journal()
+                batch = self._flushing
+            try:
+                self._write(batch)
+            except Exception:
+                self._attempts += 1
+                if self._attempts >= self.max_attempts:
+                    self._set_aside(batch)
+                raise
+            with self._lock:
+                self._attempts = 0
+                self._flushing, self._flushing_count = None, 0
+                for game_id in batch:
+                    if game_id not in self._pending:
+                        del self._games[game_id]
+                self.segment_path.unlink(missing_ok=True)
+            return sum(len(pending.rounds) for pending in batch.values())
+
+    def replay(self) -> int:
+        """Write the journaled rounds left by a previous process.
+
+        Must run before the ingestor accepts rounds.
+
+        Returns:
+            int: The number of rounds written.
+        """
+        batch = {}
+        with self._lock:
+            set_aside = {
+                move[0] for entry in self._read_entries(self.failed_path) for move in entry['rounds']
+            }
+            for entry in self._read_entries(self.segment_path, self.journal_path):
+                moves = [move for move in entry['rounds'] if move[0] not in set_aside]
+                if not moves:
+                    continue
+                try:
+                    game = self._get_game(entry['game'])
+                    journaled = [move for move in moves if move[1] > game.rounds_played]
+                    if not journaled:
+                        continue
+                    rounds, events = self._play(
+                        game,
+                        [(player1_choice, player2_choice) for _, _, player1_choice, player2_choice in journaled],
+                        [round_id for round_id, *_ in journaled]
+                    )
+                except (Game.DoesNotExist, GameFinishedError):
+                    logger.warning("Discarding journaled rounds of game %s", entry['game'])
+                    continue
+                self._queue(batch, game, rounds, events)
+        self._write(batch)
+        with self._lock:
+            self._games.clear()
+            self.segment_path.unlink(missing_ok=True)
+            self.journal_path.unlink(missing_ok=True)
+        return sum(len(pending.rounds) for pending in batch.values())
+
+    def lock(self) -> None:
+        """Take the journal for this process, before replaying it.
+
+        The lock is held until ``stop`` or the end of the process.
+
+        Raises:
+            ImproperlyConfigured: If another process holds the journal.
+        """
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise ImproperlyConfigured(
+                f"The round journal {self.journal_path} is used by another process; "
+                "GAME_ROUND_WRITE_BEHIND needs a single process accepting rounds"
+            )
+        self._lock_file = lock_file
+
+    def start(self) -> None:
+        """Start flushing in a background thread."""
+        self._thread = threading.Thread(target=self._run, name='round-ingestor', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Flush the remaining rounds and stop the background thread."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _run(self) -> None:
+        while True:
+            if self._attempts:
+                self._stopped.wait(min(self.interval * 2 ** self._attempts, FLUSH_MAX_BACKOFF))
+            else:
+                self._wake.wait(self.interval)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Could not write the pending rounds, retrying")
+            if self._stopped.is_set():
+                break
+        connection.close()
+
+    def _get_game(self, game_id) -> Game:
+        """Return the in-memory state of a game, loading it if needed."""
+        try:
+            key = uuid.UUID(str(game_id))
+        except ValueError:
+            raise Game.DoesNotExist(game_id)
+        game = self._games.get(key)
+        if game is None:
+            game = Game.objects.select_related('player1', 'player2').get(id=key)
+        return game
+
+    def _play(self, game: Game, moves: list[tuple[str, str]],
+              round_ids: list[str] | None = None) -> tuple[list[Round], list[dict]]:
+        """Resolve rounds against the in-memory state of a game."""
+        if game.finished_at or game.winner_id or decide_game(game.player1_wins, game.player2_wins) != DRAW:
+            raise GameFinishedError(game.id)
+
+        now = timezone.now()
+        rounds, events = [], []
+        for index, (player1_choice, player2_choice) in enumerate(moves):
+            round_obj = Round(
+                game=game,
+                round_number=game.rounds_played + 1,
+                player1_choice=player1_choice,
+                player2_choice=player2_choice,
+                created_at=now,
+                updated_at=now
+            )
+            if round_ids is not None:
+                round_obj.id = uuid.UUID(round_ids[index])
+            rounds.append(round_obj)
+
+            winner = determine_round_winner(round_obj)
+            game.rounds_played += 1
+            if winner is not None and winner.pk == game.player1_id:
+                game.player1_wins += 1
+            elif winner is not None:
+                game.player2_wins += 1
+            events.append(round_event(round_obj))
+            if decide_game(game.player1_wins, game.player2_wins) != DRAW:
+                break
+        return rounds, events
+
+    def _queue(self, batch: dict, game: Game, rounds: list[Round], events: list[dict]) -> None:
+        """Add played rounds to a batch and keep the game state in memory."""
+        self._games[game.id] = game
+        pending = batch.get(game.id)
+        if pending is None:
+            pending = batch[game.id] = PendingRounds(game)
+        pending.add(rounds, events)
+
+    def _write(self, batch: dict) -> None:
+        """Write a batch of rounds, one UPDATE per game, in one transaction."""
+        if not batch:
+            return
+        with transaction.atomic():
+            Round.objects.bulk_create(
+                [round_obj for pending in batch.values() for round_obj in pending.rounds],
+                batch_size=BULK_BATCH_SIZE
+            )
+            now = timezone.now()
+            for pending in batch.values():
+                game = Game(
+                    id=pending.game.id,
+                    player1=pending.game.player1,
+                    player2=pending.game.player2,
+                    player1_wins=pending.player1_wins,
+                    player2_wins=pending.player2_wins
+                )
+                # Round events are registered first, so that subscribers get
+                # them before the game_finished event, as in record_rounds.
+                transaction.on_commit(
+                    lambda game_id=game.id, events=pending.events: publish_game_events(game_id, events)
+                )
+                determine_game_winner(game)
+                record_player_stats(game, pending.rounds)
+                Game.objects.filter(id=game.id).update(
+                    rounds_played=F('rounds_played') + len(pending.rounds),
+                    player1_wins=F('player1_wins') + pending.player1_won,
+                    player2_wins=F('player2_wins') + pending.player2_won,
+                    winner=game.winner,
+                    finished_at=game.finished_at,
+                    updated_at=now
+                )
+
+    def _set_aside(self, batch: dict) -> None:
+        """Move a batch that keeps failing to the failed journal.
+
+        The later rounds of its games depend on it and go with it; the games
+        are then reloaded from the database on their next round.
+        """
+        with self._lock:
+            count = 0
+            with open(self.failed_path, 'a', encoding='utf-8') as failed:
+                for game_id, pending in batch.items():
+                    rounds = pending.rounds
+                    if game_id in self._pending:
+                        later = self._pending.pop(game_id).rounds
+                        self._pending_count -= len(later)
+                        rounds = rounds + later
+                    failed.write(journal_entry(pending.game, rounds))
+                    count += len(rounds)
+                    del self._games[game_id]
+                failed.flush()
+                os.fsync(failed.fileno())
+            self._attempts = 0
+            self._flushing, self._flushing_count = None, 0
+            self.segment_path.unlink(missing_ok=True)
+        logger.error(
+            "Could not write %d rounds of %d games after %d attempts, moved them to %s",
+            count, len(batch), self.max_attempts, self.failed_path
+        )
+
+    def _append_journal(self, game: Game, rounds: list[Round]) -> None:
+        """Append accepted rounds to the journal, leaving the sync to ``_sync_journal``."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(journal_entry(game, rounds))
+        self._journal.flush()
+
+    def _sync_journal(self, position: int) -> None:
+        """Wait until the journal is synced to disk up to the ``position``-th append.
+
+        The first waiter syncs everything appended so far while the others
+        wait for it, so concurrent submissions share a single ``fsync``.
+        """
+        with self._sync:
+            while self._synced < position and self._syncing:
+                self._sync.wait()
+            if self._synced >= position:
+                return
+            self._syncing = True
+        synced = 0
+        try:
+            with self._lock:
+                target = self._appended
+                fd = os.dup(self._journal.fileno()) if self._journal is not None else None
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            synced = target
+        finally:
+            with self._sync:
+                self._synced = max(self._synced, synced)
+                self._syncing = False
+                self._sync.notify_all()
+
+    def _rotate_journal(self) -> None:
+        """Move the journal of the rounds being flushed aside."""
+        if self._journal is not None:
+            os.fsync(self._journal.fileno())
+            self._journal.close()
+            self._journal = None
+            with self._sync:
+                self._synced = self._appended
+                self._sync.notify_all()
+        if self.journal_path.exists():
+            os.replace(self.journal_path, self.segment_path)
+
+    @staticmethod
+    def _read_entries(*paths):
+        """Yield the entries of the given journal files, in order.
+
+        A truncated last line, left by a crash while appending, is ignored;
+        its rounds were never acknowledged.
+        """
+        for path in paths:
+            if not path.exists():
+                continue
+            with open(path, encoding='utf-8') as journal:
+                for line in journal:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break
+
+
+@lru_cache(maxsize=None)
+def get_ingestor() -> RoundIngestor:
+    """Return the round ingestor of the process, replaying its journal first.
+
+    Raises:
+        ImproperlyConfigured: If another process holds the journal.
+    """
+    ingestor = RoundIngestor(
+        settings.GAME_ROUND_JOURNAL_PATH,
+        settings.GAME_ROUND_FLUSH_INTERVAL,
+        settings.GAME_ROUND_FLUSH_SIZE,
+        settings.GAME_ROUND_MAX_BACKLOG,
+        settings.GAME_ROUND_FLUSH_ATTEMPTS
+    )
+    ingestor.lock()
+    ingestor.replay()
+    ingestor.start()
+    return ingestor
+
+
+def start_ingestor() -> None:
+    """Replay and start the round ingestor of a server process, if enabled."""
+    if settings.GAME_ROUND_WRITE_BEHIND:
+        get_ingestor()
+
+
+def submit_rounds(game_id, moves: list[tuple[str, str]]) -> list[Round]:
+    """Accept rounds through the round ingestor of the process.
+
+    Write-behind counterpart of ``record_rounds``, with the same arguments,
+    return value and exceptions, plus ``BacklogFullError``.
+    """
+    return get_ingestor().submit(game_id, moves)
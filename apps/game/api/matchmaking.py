@@ -0,0 +1,426 @@
+"""Matchmaking queue that pairs waiting players into games.
+
+Players are placed in score brackets of ``GAME_MATCHMAKING_BRACKET_SIZE``
+points. A player who enqueues is paired at once with the player waiting in
+the same bracket, if any, so a bracket never holds more than one waiting
+ticket and the queue is a map of bracket to ticket plus the sorted list of
+brackets with a ticket. Enqueueing is a dictionary lookup and a binary
+search under a lock, cheap enough for thousands of enqueues per second.
+
+The longer a player waits, the further their bracket search reaches: one
+more bracket every ``GAME_MATCHMAKING_WIDEN_AFTER`` seconds. A new player is
+paired with the nearest waiting player whose reach covers the distance, and
+the scheduler step, ``match_waiting``, pairs neighbouring waiting players
+once either of them reaches the other. The scheduler runs at most once per
+``GAME_MATCHMAKING_INTERVAL`` seconds, driven by the clients that long-poll
+their ticket, so no background thread is needed.
+
+When a pair forms, both tickets leave the queue under the lock and the game
+is created in its own transaction; both tickets then resolve to the game.
+Matched tickets are kept for ``MATCH_TTL`` seconds so that polls that arrive
+late still get the game. Every poll records its time on the ticket; waiting
+players who stop polling for ``MATCH_IDLE_TTL`` seconds, twice the longest
+poll, are assumed gone: they are never picked as opponents and the
+scheduler drops them from the queue.
+
+The matchmaker is looked up through the ``GAME_MATCHMAKING_BACKEND`` setting.
+``LocalMatchmaker`` only pairs players queued on the same worker process,
+which suits a single worker and the tests. ``CacheMatchmaker`` keeps the
+queue in the ``matchmaking`` cache, so players can enqueue and poll on any
+worker as long as that cache is shared, e.g. Redis.
+"""
+import threading
+import uuid
+import weakref
+from bisect import bisect_left, insort
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import lru_cache
+from time import monotonic, sleep, time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from apps.game.models import Game, Player
+from apps.game.api.cache import MATCHMAKING_CACHE
+
+
+MATCH_MAX_REACH = 5
+
+MATCH_TTL = 60
+
+MATCH_MAX_POLL_TIMEOUT = 25
+
+MATCH_IDLE_TTL = 2 * MATCH_MAX_POLL_TIMEOUT
+
+MATCH_QUEUE_KEY = 'game:matchmaking:queue'
+
+MATCH_LOCK_KEY = 'game:matchmaking:lock'
+
+MATCH_LOCK_TIMEOUT = 5
+
+
+class Ticket:
+    """A player's place in the matchmaking queue.
+
+    ``result`` resolves to the created ``Game`` once the player is matched,
+    and is cancelled if the player leaves the queue. ``polled_at`` is the
+    time of the player's last poll, or of the enqueue.
+    """
+    __slots__ = ('player', 'bracket', 'enqueued_at', 'polled_at', 'result', '__weakref__')
+
+    def __init__(self, player: Player, bracket: int, enqueued_at: float):
+        self.player = player
+        self.bracket = bracket
+        self.enqueued_at = enqueued_at
+        self.polled_at = enqueued_at
+        self.result = Future()
+
+    @property
+    def matched(self) -> bool:
+        """Whether a game was created for the ticket."""
+        return self.result.done() and not self.result.cancelled() and self.result.exception() is None
+
+    def reach(self, now: float, widen_after: float) -> int:
+        """Return how many brackets away the ticket accepts an opponent."""
+        return min(MATCH_MAX_REACH, int((now - self.enqueued_at) // widen_after))
+
+    def idle(self, now: float) -> bool:
+        """Whether the player stopped polling and is assumed gone."""
+        return now - self.polled_at > MATCH_IDLE_TTL
+
+
+class LocalMatchmaker:
+    """Pair the players queued in this process."""
+    clock = staticmethod(monotonic)
+
+    def __init__(self, bracket_size: int | None = None, widen_after: float | None = None,
+                 interval: float | None = None):
+        self.bracket_size = bracket_size or settings.GAME_MATCHMAKING_BRACKET_SIZE
+        self.widen_after = widen_after or settings.GAME_MATCHMAKING_WIDEN_AFTER
+        self.interval = settings.GAME_MATCHMAKING_INTERVAL if interval is None else interval
+        self._waiting = {}
+        self._brackets = []
+        self._tickets = {}
+        self._matched = deque()
+        self._last_run = float('-inf')
+        self._lock = threading.Lock()
+
+    def enqueue(self, player: Player, now: float | None = None) -> Ticket:
+        """Queue a player, pairing them at once if an opponent is in reach.
+
+        A player already waiting keeps their ticket.
+
+        Args:
+            player (Player): The player to queue.
+            now (float | None): The current ``clock()`` value.
+        Returns:
+            Ticket: The ticket of the player, already matched if an opponent
+            was waiting.
+        """
+        now = self.clock() if now is None else now
+        idle = None
+        with self._queue():
+            ticket = self._tickets.get(player.id)
+            if ticket is not None and not ticket.result.done():
+                return ticket
+            ticket = Ticket(player, player.score // self.bracket_size, now)
+            self._tickets[player.id] = ticket
+            opponent = self._take_opponent(ticket, now)
+            if opponent is None:
+                # Only an idle ticket can be left in the bracket; it gives way.
+                idle = self._waiting.get(ticket.bracket)
+                if idle is not None:
+                    self._remove_waiting(idle)
+                    del self._tickets[idle.player.id]
+                self._waiting[ticket.bracket] = ticket
+                insort(self._brackets, ticket.bracket)
+        if idle is not None:
+            idle.result.cancel()
+        if opponent is not None:
+            self._start_game(opponent, ticket)
+        return ticket
+
+    def get_ticket(self, player_id, now: float | None = None) -> Ticket | None:
+        """Return the waiting or recently matched ticket of a player.
+
+        Called on every poll of the player, whose time is recorded on the
+        ticket.
+        """
+        now = self.clock() if now is None else now
+        with self._queue():
+            ticket = self._tickets.get(player_id)
+            if ticket is not None:
+                ticket.polled_at = now
+            return ticket
+
+    def cancel(self, player_id) -> bool:
+        """Remove a waiting player from the queue.
+
+        Returns:
+            bool: False if the player was not waiting.
+        """
+        with self._queue():
+            ticket = self._tickets.get(player_id)
+            if ticket is None or self._waiting.get(ticket.bracket) is not ticket:
+                return False
+            self._remove_waiting(ticket)
+            del self._tickets[player_id]
+        ticket.result.cancel()
+        return True
+
+    def match_waiting(self, now: float | None = None) -> int:
+        """Pair neighbouring waiting players that are within reach.
+
+        Idle players are dropped from the queue first.
+
+        Returns:
+            int: The number of games created.
+        """
+        now = self.clock() if now is None else now
+        pairs = []
+        with self._queue():
+            self._expire_matched(now)
+            idle = self._expire_idle(now)
+            index = 0
+            while index < len(self._brackets) - 1:
+                low = self._waiting[self._brackets[index]]
+                high = self._waiting[self._brackets[index + 1]]
+                reach = max(low.reach(now, self.widen_after), high.reach(now, self.widen_after))
+                if reach >= high.bracket - low.bracket:
+                    del self._waiting[low.bracket], self._waiting[high.bracket]
+                    del self._brackets[index:index + 2]
+                    pairs.append((low, high))
+                else:
+                    index += 1
+        for ticket in idle:
+            ticket.result.cancel()
+        for first, second in pairs:
+            self._start_game(first, second)
+        return len(pairs)
+
+    def schedule(self) -> None:
+        """Run ``match_waiting`` unless it ran less than an interval ago."""
+        now = self.clock()
+        with self._queue():
+            if now - self._last_run < self.interval:
+                return
+            self._last_run = now
+        self.match_waiting(now)
+
+    def waiting_count(self) -> int:
+        """Return the number of players waiting for an opponent."""
+        with self._queue():
+            return len(self._waiting)
+
+    def _take_opponent(self, ticket: Ticket, now: float) -> Ticket | None:
+        """Remove and return the nearest waiting ticket that accepts ``ticket``."""
+        best = None
+        index = bisect_left(self._brackets, ticket.bracket - MATCH_MAX_REACH)
+        while index < len(self._brackets) and self._brackets[index] <= ticket.bracket + MATCH_MAX_REACH:
+            candidate = self._waiting[self._brackets[index]]
+            distance = abs(candidate.bracket - ticket.bracket)
+            if not candidate.idle(now) and candidate.reach(now, self.widen_after) >= distance:
+                if best is None or distance < abs(best.bracket - ticket.bracket):
+                    best = candidate
+            index += 1
+        if best is not None:
+            self._remove_waiting(best)
+        return best
+
+    def _remove_waiting(self, ticket: Ticket) -> None:
+        del self._waiting[ticket.bracket]
+        del self._brackets[bisect_left(self._brackets, ticket.bracket)]
+
+    def _expire_matched(self, now: float) -> None:
+        """Forget the matched tickets older than ``MATCH_TTL``."""
+        while self._matched and now - self._matched[0][0] > MATCH_TTL:
+            _, ticket = self._matched.popleft()
+            if self._tickets.get(ticket.player.id) is ticket:
+                del self._tickets[ticket.player.id]
+
+    def _expire_idle(self, now: float) -> list[Ticket]:
+        """Remove and return the waiting tickets of the idle players."""
+        idle = [ticket for ticket in self._waiting.values() if ticket.idle(now)]
+        for ticket in idle:
+            self._remove_waiting(ticket)
+            del self._tickets[ticket.player.id]
+        return idle
+
+    @contextmanager
+    def _queue(self):
+        """Hold the queue for the block."""
+        with self._lock:
+            yield
+
+    def _remember(self, game: Game, first: Ticket, second: Ticket) -> None:
+        """Keep the tickets of a created game for ``MATCH_TTL`` seconds."""
+        now = self.clock()
+        with self._queue():
+            self._matched.extend([(now, first), (now, second)])
+
+    def _forget(self, first: Ticket, second: Ticket) -> None:
+        """Drop the tickets of a game that could not be created."""
+        with self._queue():
+            for ticket in (first, second):
+                if self._tickets.get(ticket.player.id) is ticket:
+                    del self._tickets[ticket.player.id]
+
+    def _start_game(self, first: Ticket, second: Ticket) -> Game:
+        """Create the game of a pair and resolve both tickets with it.
+
+        If the game cannot be created, both tickets fail with the error and
+        leave the queue, and the error is raised.
+        """
+        try:
+            with transaction.atomic():
+                game = Game.objects.create(player1=first.player, player2=second.player)
+        except Exception as error:
+            self._forget(first, second)
+            first.result.set_exception(error)
+            second.result.set_exception(error)
+            raise
+        self._remember(game, first, second)
+        first.result.set_result(game)
+        second.result.set_result(game)
+        return game
+
+
+def match_key(player_id) -> str:
+    """Return the cache key of a player's matched ticket."""
+    return f'game:matchmaking:ticket:{player_id}'
+
+
+class CacheMatchmaker(LocalMatchmaker):
+    """Pair the players queued by every worker through the ``matchmaking`` cache.
+
+    The waiting tickets and the time of the last scheduler run are stored
+    under a single key, which every operation reads and writes back under a
+    lock taken with ``cache.add``; the queue holds at most one ticket per
+    bracket, so the entry stays small. Tickets that leave the queue for a
+    game are stored under their own key for ``MATCH_TTL`` seconds, with the
+    id of the game once it is created. Times are taken from the wall clock,
+    which all the workers share.
+
+    ``schedule`` also resolves the tickets polled in this process that
+    another worker matched or dropped.
+    """
+    clock = staticmethod(time)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = caches[MATCHMAKING_CACHE]
+        self._polled = weakref.WeakValueDictionary()
+        self._synced_at = float('-inf')
+
+    def enqueue(self, player: Player, now: float | None = None) -> Ticket:
+        ticket = super().enqueue(player, now)
+        self._polled[player.id] = ticket
+        return ticket
+
+    def get_ticket(self, player_id, now: float | None = None) -> Ticket | None:
+        ticket = super().get_ticket(player_id, now)
+        if ticket is None:
+            entry = self.cache.get(match_key(player_id))
+            if entry is None:
+                return None
+            ticket = self._resolve(self._load_ticket(entry[1:]), entry[0])
+        self._polled[ticket.player.id] = ticket
+        return ticket
+
+    def schedule(self) -> None:
+        self._sync()
+        super().schedule()
+
+    def _sync(self) -> None:
+        """Resolve the polled tickets that left the queue, once per interval."""
+        now = self.clock()
+        with self._lock:
+            if now - self._synced_at < self.interval:
+                return
+            self._synced_at = now
+            polled = [ticket for ticket in self._polled.values() if not ticket.result.done()]
+        if not polled:
+            return
+        with self._queue():
+            gone = [ticket for ticket in polled if ticket.player.id not in self._tickets]
+        entries = self.cache.get_many([match_key(ticket.player.id) for ticket in gone])
+        for ticket in gone:
+            entry = entries.get(match_key(ticket.player.id))
+            if entry is None:
+                ticket.result.cancel()
+            else:
+                self._resolve(ticket, entry[0])
+
+    def _resolve(self, ticket: Ticket, game_id: str | None) -> Ticket:
+        """Resolve a ticket with its game, unless it is still being created."""
+        if game_id is not None and not ticket.result.done():
+            ticket.result.set_result(Game.objects.select_related('player1', 'player2').get(id=game_id))
+        return ticket
+
+    @contextmanager
+    def _queue(self):
+        """Load the shared queue for the block and store it back afterwards.
+
+        The tickets that left the queue in the block without being dropped
+        from ``_tickets`` were paired; they are stored as matched, without a
+        game yet, so that their pollers keep waiting for it.
+        """
+        with self._lock:
+            while not self.cache.add(MATCH_LOCK_KEY, True, MATCH_LOCK_TIMEOUT):
+                sleep(0.001)
+            try:
+                state = self.cache.get(MATCH_QUEUE_KEY, {'waiting': [], 'last_run': float('-inf')})
+                self._last_run = state['last_run']
+                self._waiting = {}
+                for entry in state['waiting']:
+                    ticket = self._load_ticket(entry)
+                    self._waiting[ticket.bracket] = ticket
+                self._brackets = sorted(self._waiting)
+                self._tickets = {ticket.player.id: ticket for ticket in self._waiting.values()}
+                yield
+                self.cache.set(MATCH_QUEUE_KEY, {
+                    'waiting': [self._dump_ticket(ticket) for ticket in self._waiting.values()],
+                    'last_run': self._last_run
+                }, None)
+                paired = {
+                    match_key(player_id): (None, *self._dump_ticket(ticket))
+                    for player_id, ticket in self._tickets.items()
+                    if self._waiting.get(ticket.bracket) is not ticket
+                }
+                if paired:
+                    self.cache.set_many(paired, MATCH_TTL)
+            finally:
+                self.cache.delete(MATCH_LOCK_KEY)
+
+    def _remember(self, game: Game, first: Ticket, second: Ticket) -> None:
+        self.cache.set_many({
+            match_key(ticket.player.id): (str(game.id), *self._dump_ticket(ticket))
+            for ticket in (first, second)
+        }, MATCH_TTL)
+
+    def _forget(self, first: Ticket, second: Ticket) -> None:
+        self.cache.delete_many([match_key(ticket.player.id) for ticket in (first, second)])
+
+    def _load_ticket(self, entry: tuple) -> Ticket:
+        """Return the ticket of a stored entry, reusing the one polled here."""
+        player_id, name, score, bracket, enqueued_at, polled_at = entry
+        player_id = uuid.UUID(player_id)
+        ticket = self._polled.get(player_id)
+        if ticket is None or ticket.result.done():
+            ticket = Ticket(Player(id=player_id, name=name, score=score), bracket, enqueued_at)
+        ticket.polled_at = polled_at
+        return ticket
+
+    def _dump_ticket(self, ticket: Ticket) -> tuple:
+        player = ticket.player
+        return str(player.id), player.name, player.score, ticket.bracket, ticket.enqueued_at, ticket.polled_at
+
+
+@lru_cache(maxsize=None)
+def get_matchmaker():
+    """Return the configured matchmaker."""
+    return import_string(settings.GAME_MATCHMAKING_BACKEND)()
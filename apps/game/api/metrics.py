@@ -0,0 +1,289 @@
+"""Per-request cost metrics of the game API.
+
+``RequestMetricsMiddleware`` measures every request routed to a view of the
+game app: the number of SQL queries and the time spent running them, the
+time spent in serializers and renderers, the total time and the size of the
+response. The timings are returned to the client in a ``Server-Timing``
+header and aggregated in per-view histograms, exposed in the Prometheus text
+format by ``render_metrics``.
+
+The measurements of a request live in a context variable, so they follow the
+request into ``sync_to_async`` threads. Queries are counted by a wrapper
+installed once on every database connection, which does nothing but a
+context variable lookup outside of measured requests. Code outside of the
+serializers and renderers can be measured with ``timer``.
+
+Histograms are kept in process memory, so each worker process reports its
+own requests.
+
+``/metrics`` is only served to the addresses of ``GAME_METRICS_ALLOWED_IPS``
+or to requests carrying the ``GAME_METRICS_TOKEN`` bearer token.
+"""
+import hmac
+import ipaddress
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from apps.game.api.cache import STAT_NAMES, cache_stats
+
+
+TIMINGS = ('db', 'serialize', 'render')
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_current_metrics = ContextVar('game_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """The measurements of a single request."""
+    __slots__ = ('view', 'queries', 'timings', 'render_started')
+
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.timings = dict.fromkeys(TIMINGS, 0.0)
+        self.render_started = None
+
+    def add_timing(self, name: str, seconds: float) -> None:
+        """Add ``seconds`` to a timing."""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        """Format the timings as a ``Server-Timing`` header value."""
+        entries = [f'db;desc="{self.queries} queries";dur={self.timings["db"] * 1000:.3f}']
+        entries += [
+            f'{name};dur={seconds * 1000:.3f}'
+            for name, seconds in self.timings.items()
+            if name != 'db'
+        ]
+        entries.append(f'total;dur={total * 1000:.3f}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def timer(name: str):
+    """Add the time spent in the block to a timing of the current request.
+
+    Does nothing outside of a measured request.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_timing(name, perf_counter() - start)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of the current request."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.add_timing('db', perf_counter() - start)
+
+
+def install_query_recorder(sender, connection, **kwargs) -> None:
+    """Install ``record_query`` on a new database connection.
+
+    Connected to ``connection_created``. The wrapper goes first so that
+    ``connection.execute_wrapper`` blocks, which pop the last wrapper, leave
+    it in place.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class Histogram:
+    """A labelled Prometheus histogram with fixed buckets."""
+
+    def __init__(self, name: str, documentation: str, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        """Record a value for a set of label values."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def clear(self) -> None:
+        """Forget every recorded value."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self, label_names: tuple) -> list[str]:
+        """Render the histogram in the Prometheus text format."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in sorted(self._series.items())]
+        for labels, counts, total in series:
+            label_text = ','.join(f'{name}="{value}"' for name, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+LABEL_NAMES = ('view', 'method')
+
+REQUEST_DURATION = Histogram(
+    'game_request_duration_seconds', 'Time spent handling a request.', DURATION_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    'game_request_queries', 'SQL queries run by a request.', QUERY_BUCKETS
+)
+REQUEST_TIMINGS = {
+    name: Histogram(f'game_request_{name}_seconds', documentation, DURATION_BUCKETS)
+    for name, documentation in (
+        ('db', 'Time spent running the SQL queries of a request.'),
+        ('serialize', 'Time spent in the serializers of a request.'),
+        ('render', 'Time spent rendering the response of a request.'),
+    )
+}
+RESPONSE_BYTES = Histogram(
+    'game_response_bytes', 'Size of the response body, if not streamed.', BYTES_BUCKETS
+)
+
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_QUERIES, *REQUEST_TIMINGS.values(), RESPONSE_BYTES)
+
+
+def observe_request(metrics: RequestMetrics, method: str, total: float, size: int | None) -> None:
+    """Record the measurements of a request in the histograms."""
+    labels = (metrics.view, method)
+    REQUEST_DURATION.observe(labels, total)
+    REQUEST_QUERIES.observe(labels, metrics.queries)
+    for name, histogram in REQUEST_TIMINGS.items():
+        histogram.observe(labels, metrics.timings[name])
+    if size is not None:
+        RESPONSE_BYTES.observe(labels, size)
+
+
+def render_metrics() -> str:
+    """Render the request histograms and cache counters for Prometheus."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render(LABEL_NAMES)
+    stats = cache_stats()
+    for stat in STAT_NAMES:
+        name = f'game_cache_{stat}_total'
+        lines += [f'# HELP {name} Cache {stat} reported by the cache backend.', f'# TYPE {name} counter']
+        lines += [
+            f'{name}{{cache="{alias}"}} {counters[stat]}'
+            for alias, counters in stats.items()
+            if counters is not None
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def can_scrape(request) -> bool:
+    """Whether a request may read the metrics.
+
+    The client address must be in ``GAME_METRICS_ALLOWED_IPS``, a list of
+    addresses or networks, or the request must send ``GAME_METRICS_TOKEN``
+    as a bearer token.
+    """
+    token = settings.GAME_METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.GAME_METRICS_ALLOWED_IPS
+    )
+
+
+class RequestMetricsMiddleware:
+    """Measure the requests handled by the views of the game app.
+
+    Must be the last middleware, so that the time between the view and the
+    rest of the middleware chain is only the rendering of the response.
+    Disabled with ``GAME_API_METRICS = False``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.GAME_API_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if view_func.__module__.startswith('apps.game.'):
+            _current_metrics.get().view = request.resolver_match.view_name
+
+    def process_template_response(self, request, response):
+        metrics = _current_metrics.get()
+        if metrics.view is not None:
+            metrics.render_started = perf_counter()
+        return response
+
+    def finish(self, request, response, metrics: RequestMetrics, start: float):
+        """Report the measurements of a game view request."""
+        if metrics.view is None:
+            return response
+        end = perf_counter()
+        if metrics.render_started is not None:
+            metrics.add_timing('render', end - metrics.render_started)
+        total = end - start
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = metrics.server_timing(total)
+        observe_request(metrics, request.method, total, size)
+        return response
@@ -0,0 +1,66 @@
+from base64 import b64decode, b64encode
+from datetime import datetime
+from uuid import UUID
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class GameCursorPagination(CursorPagination):
+    """Keyset pagination for game listings.
+
+    Pages are addressed by an opaque cursor over ``created_at`` instead of an
+    offset, so fetching any page costs the same no matter how deep it is.
+    """
+    ordering = '-created_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def is_requested(self, request) -> bool:
+        """Return True if the client asked for the paginated list mode."""
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+
+class GameKeysetPagination:
+    """Forward-only keyset pagination over ``(created_at, id)``.
+
+    Unlike ``GameCursorPagination`` it does not paginate a queryset itself:
+    the view fetches ``page_size + 1`` rows after the decoded position, which
+    lets it build the page from several index-ordered queries.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def decode_cursor(self, request) -> tuple[datetime, str] | None:
+        """Return the ``(created_at, id)`` position encoded in the request."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, game_id = b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            return datetime.fromisoformat(created_at), str(UUID(game_id))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, game) -> str:
+        """Encode the position right after ``game``."""
+        return b64encode(f'{game.created_at.isoformat()}|{game.id}'.encode('ascii')).decode('ascii')
+
+    def get_paginated_response(self, request, games: list, page_size: int, data) -> Response:
+        """Wrap serialized games with the link to the next page.
+
+        ``games`` holds up to ``page_size + 1`` rows; the extra one only tells
+        whether a next page exists and must not be included in ``data``.
+        """
+        next_url = None
+        if len(games) > page_size:
+            next_url = replace_query_param(
+                request.build_absolute_uri(),
+                self.cursor_query_param,
+                self.encode_cursor(games[page_size - 1])
+            )
+        return Response({'next': next_url, 'results': data})
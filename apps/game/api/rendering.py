@@ -0,0 +1,171 @@
+"""Fast read path for the game list and detail endpoints.
+
+``GameSerializer`` builds every payload through DRF's field machinery: one
+``to_representation`` call per field and per nested object, ``ReturnDict``
+wrappers and finally ``JSONRenderer``. For read-only endpoints that always
+return the same shape this is mostly overhead, so this module produces the
+same bytes from flat ``values_list()`` rows with plain functions and a fast
+JSON encoder (``orjson`` when installed, the standard library otherwise).
+
+The output must stay byte-for-byte identical to the serializer path; the
+conformance tests in ``test_rendering.py`` compare both. It assumes DRF's
+default ISO 8601 datetime format and compact, unicode JSON settings.
+"""
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.game.models import Game, Round
+from apps.game.api.metrics import timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+GAME_COLUMNS = (
+    'id',
+    'created_at',
+    'finished_at',
+    'player1_id',
+    'player1__name',
+    'player1__score',
+    'player2_id',
+    'player2__name',
+    'player2__score',
+    'winner_id',
+    'winner__name',
+    'winner__score',
+    'rounds_played',
+)
+
+ROUND_COLUMNS = (
+    'game_id',
+    'id',
+    'round_number',
+    'player1_choice',
+    'player2_choice',
+    'round_winner_id',
+    'round_winner__name',
+    'round_winner__score',
+    'created_at',
+    'updated_at',
+)
+
+
+def datetime_formatter():
+    """Return a function formatting datetimes like DRF's ``DateTimeField``."""
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def format_datetime(value):
+        if value is None:
+            return None
+        if tz is not None and timezone.is_aware(value):
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return format_datetime
+
+
+def player(player_id, name, score) -> dict | None:
+    """Build the ``PlayerSerializer`` payload of a player, if any."""
+    if player_id is None:
+        return None
+    return {'id': str(player_id), 'name': name, 'score': score}
+
+
+def game_rows(queryset):
+    """Narrow a game queryset to the rows rendered by ``build_games``.
+
+    Rows are named tuples, so they can be paginated by ``created_at`` like
+    model instances.
+    """
+    return queryset.values_list(*GAME_COLUMNS, named=True)
+
+
+def build_games(rows) -> list[dict]:
+    """Build the ``GameSerializer`` payloads of a sequence of game rows.
+
+    The rounds of all the games are fetched with a single query.
+
+    Args:
+        rows: Rows returned by a ``game_rows`` queryset.
+    Returns:
+        list[dict]: The payloads, in the order of ``rows``.
+    """
+    rows = list(rows)
+    format_datetime = datetime_formatter()
+
+    rounds = defaultdict(list)
+    if rows:
+        round_rows = Round.objects.filter(
+            game_id__in=[row[0] for row in rows]
+        ).order_by('round_number').values_list(*ROUND_COLUMNS)
+        for game_id, round_id, number, choice1, choice2, winner_id, name, score, created, updated in round_rows:
+            rounds[game_id].append({
+                'id': str(round_id),
+                'round_number': number,
+                'player1_choice': choice1,
+                'player2_choice': choice2,
+                'round_winner': player(winner_id, name, score),
+                'game': str(game_id),
+                'created_at': format_datetime(created),
+                'updated_at': format_datetime(updated),
+            })
+
+    return [
+        {
+            'id': str(row[0]),
+            'player1': player(row[3], row[4], row[5]),
+            'player2': player(row[6], row[7], row[8]),
+            'winner': player(row[9], row[10], row[11]),
+            'created_at': format_datetime(row[1]),
+            'finished_at': format_datetime(row[2]),
+            'rounds': rounds.get(row[0], []),
+        }
+        for row in rows
+    ]
+
+
+def dumps(data) -> bytes:
+    """Encode data exactly like DRF's ``JSONRenderer`` does."""
+    with timer('render'):
+        if orjson is not None:
+            content = orjson.dumps(data)
+        else:
+            content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+    # JSONRenderer escapes these two separators so the output is valid JavaScript.
+    return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def render_games(queryset) -> bytes:
+    """Render the games of a queryset as a JSON list."""
+    return dumps(build_games(game_rows(queryset)))
+
+
+def render_game_page(paginator, queryset, request, view=None) -> bytes:
+    """Render a page of games like ``CursorPagination.get_paginated_response``."""
+    page = paginator.paginate_queryset(game_rows(queryset), request, view=view)
+    return dumps({
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': build_games(page),
+    })
+
+
+def render_game(game_id) -> tuple:
+    """Render a single game.
+
+    Returns:
+        tuple: The game row, for its version fields, and the rendered payload.
+    Raises:
+        Game.DoesNotExist: If there is no game with this id.
+    """
+    row = game_rows(Game.objects.filter(id=game_id)).get()
+    return row, dumps(build_games([row])[0])
@@ -1,7 +1,36 @@
 from rest_framework import serializers
 
-from apps.game.models import Game, Player, Round
-from apps.game.api.services import determine_round_winner, determine_game_winner
+from apps.game.models import Game, Player, PlayerStats, Round
+from apps.game.api.engine import DRAW, PLAYER1, PLAYER2
+from apps.game.api.export import EXPORT_FORMATS, EXPORT_RESOURCES
+from apps.game.api.matchmaking import MATCH_MAX_POLL_TIMEOUT
+from apps.game.api.metrics import timer
+from apps.game.api.services import (
+    record_round,
+    resolve_players,
+    create_games_bulk,
+    LEADERBOARD_MAX_SIZE
+)
+
+
+BULK_GAMES_MAX_SIZE = 10000
+
+ROUND_BATCH_MAX_SIZE = 100
+
+PLAYER_GAMES_MAX_PAGE_SIZE = 100
+
+
+class TimedSerializerMixin:
+    """Count the time spent building ``data`` as serializer time of the request."""
+
+    @property
+    def data(self):
+        with timer('serialize'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """List serializer counted as serializer time of the request."""
 
 
 class ErrorDetailSerializer(serializers.Serializer):
@@ -43,21 +72,86 @@ class NewGameSerializer(serializers.Serializer):
                 }).data
             )
 
-        if Player.objects.filter(name=validated_data['player1_name']).exists():
-            player1 = Player.objects.get(name=validated_data['player1_name'])
-        else:
-            player1 = Player.objects.create(name=validated_data['player1_name'])
-        
-        if Player.objects.filter(name=validated_data['player2_name']).exists():
-            player2 = Player.objects.get(name=validated_data['player2_name'])
-        else:
-            player2 = Player.objects.create(name=validated_data['player2_name'])
+        player1, player2 = resolve_players(
+            validated_data['player1_name'],
+            validated_data['player2_name']
+        )
 
         game = Game.objects.create(player1=player1, player2=player2)
 
         return game
 
 
+class BulkNewGameSerializer(serializers.Serializer):
+    """Serializer for creating many games at once.
+
+    Each item is validated like a single new game. Invalid items are reported
+    back with their index instead of failing the whole request.
+    """
+    games = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=BULK_GAMES_MAX_SIZE,
+        help_text="List of games, each with a player1_name and a player2_name"
+    )
+
+    def create(self, validated_data):
+        """Create the valid games and collect the errors of the invalid ones."""
+        pairs, indexes, errors = [], [], []
+        for index, item in enumerate(validated_data['games']):
+            item_serializer = NewGameSerializer(data=item)
+            if not item_serializer.is_valid():
+                errors.append({'index': index, 'errors': item_serializer.errors})
+                continue
+            player1_name = item_serializer.validated_data['player1_name']
+            player2_name = item_serializer.validated_data['player2_name']
+            if player1_name.lower() == player2_name.lower():
+                errors.append({
+                    'index': index,
+                    'errors': ErrorDetailSerializer({
+                        'detail': "Player names must be different.",
+                        'code': 'duplicate_player_names'
+                    }).data
+                })
+                continue
+            pairs.append((player1_name, player2_name))
+            indexes.append(index)
+
+        games = create_games_bulk(pairs) if pairs else []
+        return {
+            'created': [
+                {
+                    'index': index,
+                    'id': game.id,
+                    'player1': game.player1_id,
+                    'player2': game.player2_id
+                }
+                for index, game in zip(indexes, games)
+            ],
+            'errors': errors
+        }
+
+
+class BulkGameCreatedSerializer(serializers.Serializer):
+    """Serializer for a game created in bulk."""
+    index = serializers.IntegerField(help_text="Position of the game in the request")
+    id = serializers.UUIDField()
+    player1 = serializers.UUIDField()
+    player2 = serializers.UUIDField()
+
+
+class BulkGameErrorSerializer(serializers.Serializer):
+    """Serializer for a game that could not be created in bulk."""
+    index = serializers.IntegerField(help_text="Position of the game in the request")
+    errors = serializers.DictField(help_text="Validation errors of the game")
+
+
+class BulkNewGameResultSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for the result of a bulk game creation."""
+    created = BulkGameCreatedSerializer(many=True)
+    errors = BulkGameErrorSerializer(many=True)
+
+
 class PlayerSerializer(serializers.ModelSerializer):
     """Serializer for the Player model."""
     class Meta:
@@ -66,7 +160,49 @@ class PlayerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class RoundSerializer(serializers.ModelSerializer):
+class PlayerStatsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for the statistics of a player."""
+    player = PlayerSerializer(read_only=True)
+    games_lost = serializers.IntegerField(read_only=True)
+    rounds_lost = serializers.IntegerField(read_only=True)
+    win_rate = serializers.FloatField(
+        read_only=True,
+        allow_null=True,
+        help_text="Share of finished games won; null before the first finished game"
+    )
+    favourite_choice = serializers.ChoiceField(
+        choices=Round.GAME_CHOICES,
+        read_only=True,
+        allow_null=True,
+        help_text="Most played choice; null before the first round"
+    )
+    choice_distribution = serializers.DictField(
+        child=serializers.IntegerField(),
+        read_only=True,
+        help_text="Number of times each choice was played"
+    )
+
+    class Meta:
+        model = PlayerStats
+        fields = [
+            'player',
+            'games_played',
+            'games_won',
+            'games_lost',
+            'win_rate',
+            'rounds_played',
+            'rounds_won',
+            'rounds_drawn',
+            'rounds_lost',
+            'favourite_choice',
+            'choice_distribution',
+            'current_streak',
+            'longest_streak'
+        ]
+        read_only_fields = fields
+
+
+class RoundSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the Round model."""
     player1_choice = serializers.ChoiceField(choices=Round.GAME_CHOICES)
     player2_choice = serializers.ChoiceField(choices=Round.GAME_CHOICES)
@@ -102,28 +238,60 @@ class RoundSerializer(serializers.ModelSerializer):
 
             })
 
-        round_number = game.rounds.count() + 1
-        round_obj = Round.objects.create(
-            game=game,
-            round_number=round_number,
-            player1_choice=validated_data['player1_choice'],
-            player2_choice=validated_data['player2_choice']
+        return record_round(
+            game.pk,
+            validated_data['player1_choice'],
+            validated_data['player2_choice']
         )
 
-        # Determine the winner of the round
-        winner = determine_round_winner(round_obj)
-        if winner:
-            round_obj.round_winner = winner
-            round_obj.save()
 
-        # Check if the game has a winner after this round
-        determine_game_winner(game)
+class RoundBatchSerializer(serializers.Serializer):
+    """Serializer for submitting a sequence of rounds at once.
+
+    The rounds are played in order and the sequence stops at the round that
+    decides the game; later rounds are ignored.
+    """
+    rounds = RoundSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=ROUND_BATCH_MAX_SIZE,
+        help_text="Rounds to play, in order"
+    )
+
+
+class RoundBatchResultSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for the result of a round sequence submission."""
+    rounds = RoundSerializer(many=True, help_text="The rounds that were played")
+    ignored = serializers.IntegerField(help_text="Number of rounds submitted after the game was decided")
 
-        return round_obj
 
+class CompactRoundsField(serializers.Field):
+    """Render the rounds of a game as ``[player1_choice, player2_choice, winner_slot]``.
+
+    The winner slot is 1 or 2 for the winning player and 0 for a draw.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
 
-class GameSerializer(serializers.ModelSerializer):
+    def to_representation(self, game):
+        slots = {game.player1_id: PLAYER1, game.player2_id: PLAYER2}
+        return [
+            [round_obj.player1_choice, round_obj.player2_choice, slots.get(round_obj.round_winner_id, DRAW)]
+            for round_obj in game.rounds.all()
+        ]
+
+
+class GameSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the Game model.
+
+    Args:
+        fields: Names of the fields to render; all of them by default.
+        expand: Names of the relations rendered as nested objects; all of
+            them by default. Players that are not expanded are rendered as
+            their id and rounds as compact ``[p1, p2, winner_slot]`` tuples.
     """
     player1 = PlayerSerializer(read_only=True)
     player2 = PlayerSerializer(read_only=True)
@@ -144,3 +312,224 @@ class GameSerializer(serializers.ModelSerializer):
             'rounds'
             ]
         read_only_fields = ['id', 'created_at', 'finished_at', 'winner']
+        expandable_fields = ['player1', 'player2', 'winner', 'rounds']
+        list_serializer_class = TimedListSerializer
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if expand is not None:
+            for name in set(self.Meta.expandable_fields) - set(expand):
+                if name not in self.fields:
+                    continue
+                if name == 'rounds':
+                    self.fields[name] = CompactRoundsField()
+                else:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class GameFieldsQuerySerializer(serializers.Serializer):
+    """Serializer for the field selection query parameters of game endpoints."""
+    fields = serializers.CharField(
+        required=False,
+        help_text="Comma-separated game fields to return"
+    )
+    expand = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text=(
+            "Comma-separated relations to return as nested objects; other players "
+            "are returned as ids and rounds as [p1, p2, winner_slot] tuples"
+        )
+    )
+
+    @staticmethod
+    def parse_names(value: str, allowed: list[str]) -> list[str]:
+        """Split a comma-separated list of names, keeping the order of ``allowed``."""
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(allowed)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        return [name for name in allowed if name in names]
+
+    def validate_fields(self, value):
+        fields = self.parse_names(value, GameSerializer.Meta.fields)
+        if not fields:
+            raise serializers.ValidationError("At least one field is required.")
+        return fields
+
+    def validate_expand(self, value):
+        return self.parse_names(value, GameSerializer.Meta.expandable_fields)
+
+    def get_serializer_kwargs(self) -> dict:
+        """Return the ``fields`` and ``expand`` arguments of ``GameSerializer``."""
+        return {
+            'fields': self.validated_data.get('fields'),
+            'expand': self.validated_data.get('expand'),
+        }
+
+    def get_queryset_fields(self) -> tuple[list[str], list[str]]:
+        """Return the fields and relations to load for the selection."""
+        fields = self.validated_data.get('fields', GameSerializer.Meta.fields)
+        expand = self.validated_data.get('expand', GameSerializer.Meta.expandable_fields)
+        return fields, expand
+
+    def get_version_fields(self) -> list[str]:
+        """Return the game columns that identify a version of the selection.
+
+        Nested players carry their score, which keeps changing after the
+        game ends, so the scores are part of the version whenever a player
+        or a round is expanded.
+        """
+        fields, expand = self.get_queryset_fields()
+        version = ['rounds_played', 'finished_at']
+        if set(fields) & set(expand):
+            version += ['player1__score', 'player2__score']
+        return version
+
+    def get_variant(self) -> str:
+        """Return a canonical name of the selected representation.
+
+        The default representation is named by an empty string.
+        """
+        parts = [
+            f"{name}={','.join(self.validated_data[name])}"
+            for name in ('fields', 'expand')
+            if name in self.validated_data
+        ]
+        return '&'.join(parts)
+
+
+class GameSummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for a game without its rounds.
+
+    Players are referenced by id, so it can be rendered from the game row alone.
+    """
+    player1 = serializers.PrimaryKeyRelatedField(read_only=True)
+    player2 = serializers.PrimaryKeyRelatedField(read_only=True)
+    winner = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = Game
+        fields = [
+            'id',
+            'player1',
+            'player2',
+            'winner',
+            'player1_wins',
+            'player2_wins',
+            'rounds_played',
+            'created_at',
+            'finished_at'
+        ]
+        read_only_fields = fields
+        list_serializer_class = TimedListSerializer
+
+
+class PlayerGamesQuerySerializer(serializers.Serializer):
+    """Serializer for the player match history query parameters."""
+    finished = serializers.BooleanField(
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text="Only return finished (true) or unfinished (false) games"
+    )
+    won = serializers.BooleanField(
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text="Only return games the player won (true) or lost (false)"
+    )
+    page_size = serializers.IntegerField(
+        min_value=1,
+        max_value=PLAYER_GAMES_MAX_PAGE_SIZE,
+        default=20,
+        help_text="Number of games per page"
+    )
+    cursor = serializers.CharField(
+        required=False,
+        help_text="Cursor returned by a previous page"
+    )
+
+
+class PlayerGamesPageSerializer(serializers.Serializer):
+    """Serializer for a page of a player's games."""
+    next = serializers.URLField(allow_null=True, help_text="Link to the next page")
+    results = GameSummarySerializer(many=True)
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """Serializer for the leaderboard query parameters."""
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=LEADERBOARD_MAX_SIZE,
+        default=10,
+        help_text="Number of top players to return"
+    )
+    player_id = serializers.UUIDField(
+        required=False,
+        help_text="Id of a player whose rank should be included"
+    )
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """Serializer for a ranked player."""
+    rank = serializers.IntegerField()
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    score = serializers.IntegerField()
+
+
+class LeaderboardSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for the leaderboard."""
+    results = LeaderboardEntrySerializer(many=True)
+    player = LeaderboardEntrySerializer(required=False)
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """Serializer for the export query parameters."""
+    resource = serializers.ChoiceField(
+        choices=list(EXPORT_RESOURCES),
+        default='games',
+        help_text="Rows to export"
+    )
+    format = serializers.ChoiceField(
+        choices=list(EXPORT_FORMATS),
+        default='ndjson',
+        help_text="Output format"
+    )
+    updated_since = serializers.DateTimeField(
+        required=False,
+        help_text="Only export rows updated at or after this instant"
+    )
+
+
+class MatchmakingRequestSerializer(serializers.Serializer):
+    """Serializer for joining the matchmaking queue."""
+    player_name = serializers.CharField(
+        max_length=100,
+        required=True,
+        help_text="Name of the player looking for a game"
+    )
+
+
+class MatchmakingPollQuerySerializer(serializers.Serializer):
+    """Serializer for the matchmaking long-poll query parameters."""
+    timeout = serializers.IntegerField(
+        min_value=0,
+        max_value=MATCH_MAX_POLL_TIMEOUT,
+        default=MATCH_MAX_POLL_TIMEOUT,
+        help_text="Seconds to wait for an opponent before answering"
+    )
+
+
+class MatchmakingStatusSerializer(serializers.Serializer):
+    """Serializer for the state of a player in the matchmaking queue."""
+    status = serializers.ChoiceField(
+        choices=['waiting', 'matched'],
+        help_text="Whether the player is still waiting or was matched"
+    )
+    player = serializers.UUIDField(help_text="Id of the queued player")
+    game = GameSummarySerializer(required=False, help_text="Game created for the player, once matched")
@@ -1,13 +1,41 @@
+import heapq
+from datetime import datetime
+from itertools import islice
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
-from apps.game.models import Round, Game, Player
+from apps.game.models import Round, Game, Player, PlayerStats
+from apps.game.api.events import publish_game_event
+from apps.game.api.stats import create_player_stats, record_player_stats
+from apps.game.api.engine import (
+    DRAW,
+    PLAYER1,
+    PLAYER2,
+    resolve_round,
+    decide_game
+)
+from apps.game.api.cache import (
+    LRUCache,
+    leaderboard_key,
+    invalidate_leaderboard,
+    LEADERBOARD_CACHE,
+    LEADERBOARD_TIMEOUT
+)
+
+
+LEADERBOARD_MAX_SIZE = 100
+
+BULK_BATCH_SIZE = 1000
+
+player_ids = LRUCache(maxsize=1024)
+
 
+class GameFinishedError(Exception):
+    """Raised when a round is submitted for a game that already has a winner."""
 
-CHOICES = {
-    'rock': 'scissors',
-    'scissors': 'paper',
-    'paper': 'rock',
-}
 
 def determine_round_winner(round_obj: Round) -> Player | None:
     """Determine the winner of a round based on player choices.
@@ -15,48 +43,354 @@ def determine_round_winner(round_obj: Round) -> Player | None:
     If player1's choice beats player2's choice, player1 wins.
     If player2's choice beats player1's choice, player2 wins.
 
+    The winner is only assigned in memory; persisting the round is up to
+    the caller.
+
     Args:
         round_obj (Round): The round object containing player choices.
     Returns:
         Player | None: The winning player if a winner is determined, otherwise None.
     """
-    p1 = round_obj.player1_choice
-    p2 = round_obj.player2_choice
+    outcome = resolve_round(round_obj.player1_choice, round_obj.player2_choice)
 
-    if p1 == p2:
-        round_obj.round_winner = None
-    elif CHOICES.get(p1) == p2:
+    if outcome == PLAYER1:
         round_obj.round_winner = round_obj.game.player1
-    else:
+    elif outcome == PLAYER2:
         round_obj.round_winner = round_obj.game.player2
+    else:
+        round_obj.round_winner = None
 
-    round_obj.save()
     return round_obj.round_winner
 
 
 def determine_game_winner(game_obj: Game) -> Player | None:
-    """Determine the winner of a game based on the rounds played.
+    """Determine the winner of a game based on its win counters.
     A player wins the game if they win 3 rounds.
     If both players have not won 3 rounds, the game continues.
+
+    When a winner is found their score is incremented atomically in the
+    database. Once the transaction commits, the cached leaderboard is
+    invalidated and a ``game_finished`` event is published on the game
+    channel. The winner and finish time are only assigned in memory;
+    persisting the game is up to the caller.
+
+    Must run inside the transaction that locks the game and records the
+    deciding round. The score is only incremented on the transition to
+    finished: a game that already has a winner is returned unchanged.
+
     Args:
-        game_obj (Game): The game object containing player information and rounds.
+        game_obj (Game): The game object containing player information and win counters.
     Returns:
         Player | None: The winning player if a winner is determined, otherwise None.
     """
-    if not game_obj.rounds.exists():
-        return None
-    p1_wins = game_obj.rounds.filter(round_winner=game_obj.player1).count()
-    p2_wins = game_obj.rounds.filter(round_winner=game_obj.player2).count()
+    if game_obj.winner_id is not None:
+        return game_obj.winner
+
+    outcome = decide_game(game_obj.player1_wins, game_obj.player2_wins)
 
-    if p1_wins >= 3:
+    if outcome == PLAYER1:
         game_obj.winner = game_obj.player1
-        game_obj.finished_at = timezone.now()
-        game_obj.save()
-        return game_obj.player1
-    elif p2_wins >= 3:
+    elif outcome == PLAYER2:
         game_obj.winner = game_obj.player2
-        game_obj.finished_at = timezone.now()
-        game_obj.save()
-        return game_obj.player2
+    else:
+        return None
+
+    game_obj.finished_at = timezone.now()
+    Player.objects.filter(id=game_obj.winner.id).update(score=F('score') + 1)
+    game_obj.winner.score += 1
+    transaction.on_commit(invalidate_leaderboard)
+    transaction.on_commit(lambda: publish_game_event(game_obj.id, {
+        'type': 'game_finished',
+        'winner': str(game_obj.winner.id),
+        'slot': outcome,
+        'finished_at': game_obj.finished_at.isoformat()
+    }))
+    return game_obj.winner
+
+
+def resolve_players(*names: str) -> list[Player]:
+    """Return the players with the given names, creating the missing ones.
+
+    Names seen recently are mapped to player ids through an in-process LRU
+    cache, so hot players are loaded with a single primary key lookup. Unknown
+    or stale names go through ``get_or_create``, which inserts inside a
+    savepoint and falls back to reading the row when a concurrent request
+    created the same player first. New players get their statistics row.
+
+    Args:
+        *names (str): The player names to resolve.
+    Returns:
+        list[Player]: The players, in the same order as ``names``.
+    """
+    cached_ids = {name: player_ids.get(name) for name in names}
+    players = Player.objects.in_bulk([pk for pk in cached_ids.values() if pk is not None])
+
+    resolved = []
+    for name in names:
+        player = players.get(cached_ids[name])
+        if player is None or player.name != name:
+            player, created = Player.objects.get_or_create(name=name)
+            if created:
+                create_player_stats([player.id])
+            player_ids.set(name, player.id)
+        resolved.append(player)
+    return resolved
+
+
+async def aresolve_players(*names: str) -> list[Player]:
+    """Async version of ``resolve_players``."""
+    cached_ids = {name: player_ids.get(name) for name in names}
+    players = await Player.objects.ain_bulk([pk for pk in cached_ids.values() if pk is not None])
+
+    resolved = []
+    for name in names:
+        player = players.get(cached_ids[name])
+        if player is None or player.name != name:
+            player, created = await Player.objects.aget_or_create(name=name)
+            if created:
+                await PlayerStats.objects.acreate(player=player)
+            player_ids.set(name, player.id)
+        resolved.append(player)
+    return resolved
+
+
+def round_event(round_obj: Round) -> dict:
+    """Build the compact event published when a round is recorded."""
+    game = round_obj.game
+    if round_obj.round_winner is None:
+        slot = DRAW
+    else:
+        slot = PLAYER1 if round_obj.round_winner.pk == game.player1_id else PLAYER2
+    return {
+        'type': 'round',
+        'round': round_obj.round_number,
+        'choices': [round_obj.player1_choice, round_obj.player2_choice],
+        'winner': slot,
+        'score': [game.player1_wins, game.player2_wins]
+    }
+
+
+def publish_game_events(game_id, events: list[dict]) -> None:
+    """Publish a sequence of events on the channel of a game."""
+    for event in events:
+        publish_game_event(game_id, event)
+
+
+def record_round(game_id, player1_choice: str, player2_choice: str) -> Round:
+    """Record a new round in a game and update the game state.
+
+    Args:
+        game_id: The id of the game the round belongs to.
+        player1_choice (str): The choice of the first player.
+        player2_choice (str): The choice of the second player.
+    Returns:
+        Round: The persisted round.
+    Raises:
+        Game.DoesNotExist: If the game does not exist.
+        GameFinishedError: If the game already has a winner.
+    """
+    return record_rounds(game_id, [(player1_choice, player2_choice)])[0]
+
+
+def record_rounds(game_id, moves: list[tuple[str, str]]) -> list[Round]:
+    """Record a sequence of rounds in a game and update the game state.
+
+    The game row is locked for the duration of the transaction, so concurrent
+    submissions for the same game are serialized. The moves are evaluated in
+    order in memory against the locked row and evaluation stops at the round
+    that decides the game; any later moves are discarded. The accepted rounds
+    are inserted with one ``bulk_create`` and the game is updated once, so a
+    whole sequence costs the same queries as a single round: the locking
+    read, the round INSERT and the game UPDATE, plus the score UPDATE when
+    the game ends. The statistics of both players are updated once the
+    transaction commits, off the locked path, and a ``round`` event is
+    published on the game channel for every accepted round.
+
+    Args:
+        game_id: The id of the game the rounds belong to.
+        moves (list[tuple[str, str]]): Pairs of (player1_choice, player2_choice).
+    Returns:
+        list[Round]: The persisted rounds, in order.
+    Raises:
+        Game.DoesNotExist: If the game does not exist.
+        GameFinishedError: If the game already has a winner.
+    """
+    with transaction.atomic():
+        game = (
+            Game.objects.select_for_update(of=('self',))
+            .select_related('player1', 'player2')
+            .get(id=game_id)
+        )
+        if game.finished_at or game.winner_id:
+            raise GameFinishedError(game_id)
+
+        rounds, events = [], []
+        transaction.on_commit(lambda: publish_game_events(game.id, events))
+        player1_won = player2_won = 0
+        for player1_choice, player2_choice in moves:
+            round_obj = Round(
+                game=game,
+                round_number=game.rounds_played + 1,
+                player1_choice=player1_choice,
+                player2_choice=player2_choice
+            )
+            rounds.append(round_obj)
+
+            winner = determine_round_winner(round_obj)
+            game.rounds_played += 1
+            if winner is not None and winner.pk == game.player1_id:
+                game.player1_wins += 1
+                player1_won += 1
+            elif winner is not None:
+                game.player2_wins += 1
+                player2_won += 1
+            events.append(round_event(round_obj))
+            if determine_game_winner(game):
+                break
+
+        Round.objects.bulk_create(rounds)
+        if rounds:
+            transaction.on_commit(lambda: record_player_stats(game, rounds), robust=True)
+        Game.objects.filter(id=game.id).update(
+            rounds_played=F('rounds_played') + len(rounds),
+            player1_wins=F('player1_wins') + player1_won,
+            player2_wins=F('player2_wins') + player2_won,
+            winner=game.winner,
+            finished_at=game.finished_at,
+            updated_at=timezone.now()
+        )
+
+    return rounds
+
+
+def get_leaderboard(limit: int) -> list[dict]:
+    """Return the top players ordered by score.
+
+    The top ``LEADERBOARD_MAX_SIZE`` players are read through the score index
+    once per leaderboard generation and served from the cache afterwards.
+    Players with the same score share the same rank.
+
+    Args:
+        limit (int): The number of players to return.
+    Returns:
+        list[dict]: Leaderboard entries with ``rank``, ``id``, ``name`` and ``score``.
+    """
+    cache = caches[LEADERBOARD_CACHE]
+    key = leaderboard_key('top')
+    entries = cache.get(key)
+    if entries is None:
+        entries = []
+        players = Player.objects.order_by('-score', 'name').values('id', 'name', 'score')
+        for position, player in enumerate(players[:LEADERBOARD_MAX_SIZE], start=1):
+            if entries and entries[-1]['score'] == player['score']:
+                rank = entries[-1]['rank']
+            else:
+                rank = position
+            entries.append({'rank': rank, **player})
+        cache.set(key, entries, LEADERBOARD_TIMEOUT)
+    return entries[:limit]
+
+
+def get_player_rank(player: Player) -> int:
+    """Return the leaderboard rank of a player.
+
+    The rank is one more than the number of players with a higher score,
+    which is answered by the score index and cached per score value.
+
+    Args:
+        player (Player): The player to rank.
+    Returns:
+        int: The 1-based rank of the player.
+    """
+    cache = caches[LEADERBOARD_CACHE]
+    key = leaderboard_key('rank', player.score)
+    rank = cache.get(key)
+    if rank is None:
+        rank = Player.objects.filter(score__gt=player.score).count() + 1
+        cache.set(key, rank, LEADERBOARD_TIMEOUT)
+    return rank
+
+
+def create_games_bulk(pairs: list[tuple[str, str]]) -> list[Game]:
+    """Create many games at once from pairs of player names.
+
+    All names are resolved with a single ``IN`` query, the missing players are
+    inserted in bulk (ignoring rows created concurrently by other requests)
+    with their statistics rows, and every game is inserted with a single
+    ``bulk_create``.
+
+    Args:
+        pairs (list[tuple[str, str]]): Pairs of player names, one per game.
+    Returns:
+        list[Game]: The created games, in the same order as ``pairs``.
+    """
+    names = {name for pair in pairs for name in pair}
+
+    with transaction.atomic():
+        players = {player.name: player for player in Player.objects.filter(name__in=names)}
+        missing = names - players.keys()
+        if missing:
+            Player.objects.bulk_create(
+                [Player(name=name) for name in missing],
+                batch_size=BULK_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+            players.update(
+                (player.name, player) for player in Player.objects.filter(name__in=missing)
+            )
+            create_player_stats(players[name].id for name in missing)
+
+        games = Game.objects.bulk_create(
+            [Game(player1=players[name1], player2=players[name2]) for name1, name2 in pairs],
+            batch_size=BULK_BATCH_SIZE
+        )
+
+    return games
+
+
+def get_player_games(
+    player_id,
+    limit: int,
+    before: tuple[datetime, str] | None = None,
+    finished: bool | None = None,
+    won: bool | None = None
+) -> list[Game]:
+    """Return a page of the games of a player, newest first.
+
+    The games where the player is player1 and those where they are player2
+    are read with two separate queries, each walking its own
+    ``(player, created_at)`` index and stopping after ``limit`` rows, and
+    then merged in memory. A single ``OR`` query would have to collect and
+    sort every game of the player before applying the limit.
+
+    Args:
+        player_id: The id of the player.
+        limit (int): The maximum number of games to return.
+        before (tuple[datetime, str] | None): Keyset position; only games
+            strictly older than this ``(created_at, id)`` pair are returned.
+        finished (bool | None): Only return finished (True) or unfinished
+            (False) games.
+        won (bool | None): Only return games the player won (True) or lost (False).
+    Returns:
+        list[Game]: The games, ordered by ``created_at`` and ``id`` descending.
+    """
+    games = Game.objects.order_by('-created_at', '-id')
+    if before is not None:
+        created_at, game_id = before
+        games = games.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=game_id))
+    if finished is not None:
+        games = games.filter(finished_at__isnull=not finished)
+    if won is True:
+        games = games.filter(winner_id=player_id)
+    elif won is False:
+        games = games.filter(winner__isnull=False).exclude(winner_id=player_id)
 
-    return None
\ No newline at end of file
+    as_player1 = games.filter(player1_id=player_id)[:limit]
+    as_player2 = games.filter(player2_id=player_id)[:limit]
+    merged = heapq.merge(
+        as_player1,
+        as_player2,
+        key=lambda game: (game.created_at, game.id),
+        reverse=True
+    )
+    return list(islice(merged, limit))
@@ -0,0 +1,186 @@
+"""Materialized player statistics.
+
+``PlayerStats`` rows are created with their player and maintained
+incrementally from the round pipeline: every recorded batch of rounds adds
+its counts to both players with a single ``UPDATE`` of F-expressions, run
+once the rounds are committed, so reading the statistics of a player is one
+primary key lookup no matter how many rounds they played.
+
+``rebuild_player_stats`` recomputes every row from the stored games and
+rounds with one set-based statement, for backfills and to repair drift.
+"""
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.game.models import Game, Player, PlayerStats, Round
+
+
+COUNTER_FIELDS = (
+    'games_played',
+    'games_won',
+    'rounds_played',
+    'rounds_won',
+    'rounds_drawn',
+    'rock_count',
+    'paper_count',
+    'scissors_count',
+)
+
+
+def create_player_stats(player_ids) -> None:
+    """Create the empty statistics rows of new players."""
+    PlayerStats.objects.bulk_create(
+        [PlayerStats(player_id=player_id) for player_id in player_ids],
+        ignore_conflicts=True
+    )
+
+
+def record_player_stats(game: Game, rounds: list[Round]) -> None:
+    """Add a batch of rounds of a game to the statistics of both players.
+
+    Runs in the transaction that records the rounds or once it commits,
+    after the game winner (if the batch decided the game) has been set on
+    ``game``. It is a single UPDATE when both players have their row; the
+    rows of players created without one are created on the way.
+
+    Args:
+        game (Game): The game the rounds belong to.
+        rounds (list[Round]): The rounds just recorded, with their winners.
+    """
+    player_ids = (game.player1_id, game.player2_id)
+    deltas = {player_id: dict.fromkeys(COUNTER_FIELDS, 0) for player_id in player_ids}
+    for round_obj in rounds:
+        for player_id, choice in zip(player_ids, (round_obj.player1_choice, round_obj.player2_choice)):
+            delta = deltas[player_id]
+            delta['rounds_played'] += 1
+            delta[f'{choice}_count'] += 1
+            if round_obj.round_winner_id is None:
+                delta['rounds_drawn'] += 1
+            elif round_obj.round_winner_id == player_id:
+                delta['rounds_won'] += 1
+    if game.winner_id:
+        for player_id in player_ids:
+            deltas[player_id]['games_played'] += 1
+        deltas[game.winner_id]['games_won'] += 1
+
+    player1, player2 = deltas[game.player1_id], deltas[game.player2_id]
+    updates = {
+        field: F(field) + Case(
+            When(player_id=game.player1_id, then=Value(player1[field])),
+            default=Value(player2[field])
+        )
+        for field in COUNTER_FIELDS
+        if player1[field] or player2[field]
+    }
+    if game.winner_id:
+        winner = When(player_id=game.winner_id, then=F('current_streak') + 1)
+        updates['current_streak'] = Case(winner, default=Value(0))
+        updates['longest_streak'] = Case(
+            When(player_id=game.winner_id, then=Greatest('longest_streak', F('current_streak') + 1)),
+            default=F('longest_streak')
+        )
+    updated = PlayerStats.objects.filter(player_id__in=player_ids).update(updated_at=timezone.now(), **updates)
+    if updated < len(player_ids):
+        missing = set(player_ids) - set(
+            PlayerStats.objects.filter(player_id__in=player_ids).values_list('player_id', flat=True)
+        )
+        create_player_stats(missing)
+        PlayerStats.objects.filter(player_id__in=missing).update(updated_at=timezone.now(), **updates)
+
+
+# Every player gets a row. Rounds are counted once per side; streaks are
+# computed with the gaps-and-islands technique: ordering the finished games
+# of a player, the running count of losses numbers each winning run, and the
+# wins of the last run are the current streak.
+REBUILD_SQL = """
+INSERT INTO {stats} (
+    player_id, games_played, games_won, rounds_played, rounds_won, rounds_drawn,
+    rock_count, paper_count, scissors_count, current_streak, longest_streak, updated_at
+)
+WITH sides AS (
+    SELECT g.player1_id AS player_id, r.player1_choice AS choice,
+           CASE WHEN r.round_winner_id = g.player1_id THEN 1 ELSE 0 END AS won,
+           CASE WHEN r.round_winner_id IS NULL THEN 1 ELSE 0 END AS drawn
+    FROM {round} r JOIN {game} g ON g.id = r.game_id
+    UNION ALL
+    SELECT g.player2_id, r.player2_choice,
+           CASE WHEN r.round_winner_id = g.player2_id THEN 1 ELSE 0 END,
+           CASE WHEN r.round_winner_id IS NULL THEN 1 ELSE 0 END
+    FROM {round} r JOIN {game} g ON g.id = r.game_id
+),
+round_stats AS (
+    SELECT player_id,
+           COUNT(*) AS rounds_played,
+           SUM(won) AS rounds_won,
+           SUM(drawn) AS rounds_drawn,
+           SUM(CASE WHEN choice = 'rock' THEN 1 ELSE 0 END) AS rock_count,
+           SUM(CASE WHEN choice = 'paper' THEN 1 ELSE 0 END) AS paper_count,
+           SUM(CASE WHEN choice = 'scissors' THEN 1 ELSE 0 END) AS scissors_count
+    FROM sides
+    GROUP BY player_id
+),
+results AS (
+    SELECT player1_id AS player_id, id AS game_id, finished_at,
+           CASE WHEN winner_id = player1_id THEN 1 ELSE 0 END AS won
+    FROM {game} WHERE winner_id IS NOT NULL
+    UNION ALL
+    SELECT player2_id, id, finished_at,
+           CASE WHEN winner_id = player2_id THEN 1 ELSE 0 END
+    FROM {game} WHERE winner_id IS NOT NULL
+),
+runs AS (
+    SELECT player_id, won,
+           SUM(1 - won) OVER (
+               PARTITION BY player_id ORDER BY finished_at, game_id ROWS UNBOUNDED PRECEDING
+           ) AS run
+    FROM results
+),
+run_lengths AS (
+    SELECT player_id, run, SUM(won) AS wins
+    FROM runs
+    GROUP BY player_id, run
+),
+game_stats AS (
+    SELECT r.player_id,
+           COUNT(*) AS games_played,
+           SUM(r.won) AS games_won,
+           (SELECT MAX(l.wins) FROM run_lengths l WHERE l.player_id = r.player_id) AS longest_streak,
+           (SELECT l.wins FROM run_lengths l WHERE l.player_id = r.player_id
+            ORDER BY l.run DESC LIMIT 1) AS current_streak
+    FROM results r
+    GROUP BY r.player_id
+)
+SELECT p.id,
+       COALESCE(gs.games_played, 0), COALESCE(gs.games_won, 0),
+       COALESCE(rs.rounds_played, 0), COALESCE(rs.rounds_won, 0), COALESCE(rs.rounds_drawn, 0),
+       COALESCE(rs.rock_count, 0), COALESCE(rs.paper_count, 0), COALESCE(rs.scissors_count, 0),
+       COALESCE(gs.current_streak, 0), COALESCE(gs.longest_streak, 0), %s
+FROM {player} p
+LEFT JOIN round_stats rs ON rs.player_id = p.id
+LEFT JOIN game_stats gs ON gs.player_id = p.id
+"""
+
+
+def rebuild_player_stats() -> int:
+    """Recompute the statistics of every player from scratch.
+
+    Rows are replaced in a single transaction with one ``INSERT ... SELECT``
+    that aggregates all games and rounds, so the cost is a few sequential
+    passes over the tables instead of a query per player.
+
+    Returns:
+        int: The number of players whose statistics were written.
+    """
+    quote = connection.ops.quote_name
+    sql = REBUILD_SQL.format(
+        round=quote(Round._meta.db_table),
+        game=quote(Game._meta.db_table),
+        player=quote(Player._meta.db_table),
+        stats=quote(PlayerStats._meta.db_table),
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        PlayerStats.objects.all().delete()
+        cursor.execute(sql, [connection.ops.adapt_datetimefield_value(timezone.now())])
+        return cursor.rowcount
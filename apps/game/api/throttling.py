@@ -0,0 +1,18 @@
+"""Request throttling backed by the ``rate_limits`` cache."""
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+from rest_framework import throttling
+
+from apps.game.api.cache import RATE_LIMITS_CACHE
+
+
+class GameRateThrottle(throttling.UserRateThrottle):
+    """Limit the request rate of each user or, if anonymous, client address.
+
+    DRF keeps the request history of throttled clients in the default cache;
+    this throttle keeps it in the ``rate_limits`` cache, so it can be shared
+    by every worker without moving the other caches. The rate is set with
+    ``GAME_API_THROTTLE_RATE`` and nothing is throttled while it is empty.
+    """
+    scope = 'game'
+    cache = ConnectionProxy(caches, RATE_LIMITS_CACHE)
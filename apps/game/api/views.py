@@ -3,19 +3,79 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 
-from django.http import HttpRequest
-from drf_spectacular.utils import extend_schema
+import asyncio
 
-from apps.game.models import Game, Player, Round
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse
+)
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from drf_spectacular.utils import extend_schema, OpenApiParameter, PolymorphicProxySerializer
+
+from apps.game.models import Game, Player, PlayerStats, Round
+from apps.game.api.pagination import GameCursorPagination, GameKeysetPagination
+from apps.game.api.events import get_broker, game_channel, format_sse
+from apps.game.api.engine import PLAYER1, PLAYER2
+from apps.game.api.cache import game_etag, get_cached_game_detail, cache_game_detail
+from apps.game.api.rendering import render_game, render_games, render_game_page
+from apps.game.api.export import EXPORT_FORMATS, astream_export, stream_export
+from apps.game.api.idempotency import IDEMPOTENCY_HEADER, IdempotentMixin
+from apps.game.api.ingestion import BacklogFullError, submit_rounds
+from apps.game.api.matchmaking import Ticket, get_matchmaker
+from apps.game.api.metrics import can_scrape, render_metrics
+from apps.game.api.services import (
+    record_rounds,
+    resolve_players,
+    get_leaderboard,
+    get_player_rank,
+    get_player_games,
+    GameFinishedError
+)
 from apps.game.api.serializers import (
     NewGameSerializer,
     GameSerializer,
+    GameFieldsQuerySerializer,
     ErrorDetailSerializer,
-    RoundSerializer
+    RoundSerializer,
+    LeaderboardQuerySerializer,
+    LeaderboardSerializer,
+    BulkNewGameSerializer,
+    BulkNewGameResultSerializer,
+    RoundBatchSerializer,
+    RoundBatchResultSerializer,
+    GameSummarySerializer,
+    PlayerGamesQuerySerializer,
+    PlayerGamesPageSerializer,
+    ExportQuerySerializer,
+    PlayerStatsSerializer,
+    MatchmakingRequestSerializer,
+    MatchmakingPollQuerySerializer,
+    MatchmakingStatusSerializer
+)
+
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    IDEMPOTENCY_HEADER,
+    str,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "Unique key of the request. Retries with the same key replay the first "
+        "response instead of repeating the operation."
+    )
 )
 
 
-class NewGameView(APIView):
+class NewGameView(IdempotentMixin, APIView):
     """API view to create a new game.
     """
     permission_classes = [AllowAny]
@@ -23,11 +83,16 @@ class NewGameView(APIView):
 
     @extend_schema(
         summary="Create a new game",
-        description="This endpoint allows you to create a new game by providing the names of two players.",
+        description=(
+            "This endpoint allows you to create a new game by providing the names of two players. "
+            "Send an `Idempotency-Key` header to safely retry the request."
+        ),
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
         request=NewGameSerializer,
         responses={
             201: GameSerializer,
-            400: ErrorDetailSerializer
+            400: ErrorDetailSerializer,
+            422: ErrorDetailSerializer
         }
     )
     def post(self, request):
@@ -46,6 +111,38 @@ class NewGameView(APIView):
         )
 
 
+class BulkNewGameView(APIView):
+    """API view to create many games at once.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = BulkNewGameSerializer
+
+    @extend_schema(
+        summary="Create games in bulk",
+        description=(
+            "This endpoint allows you to create many games in a single request, "
+            "e.g. to seed a tournament. Invalid games are reported with their "
+            "index and do not prevent the valid ones from being created."
+        ),
+        request=BulkNewGameSerializer,
+        responses={
+            201: BulkNewGameResultSerializer,
+            400: BulkNewGameResultSerializer
+        }
+    )
+    def post(self, request):
+        """Handle POST request to create games in bulk.
+        """
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        result = serializer.save()
+        return Response(
+            BulkNewGameResultSerializer(result).data,
+            status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST
+        )
+
+
 class GameDetailView(APIView):
     """API view to retrieve game details.
     """
@@ -54,18 +151,65 @@ class GameDetailView(APIView):
 
     @extend_schema(
         summary="Get game details",
-        description="This endpoint allows you to retrieve the details of a specific game by its ID.",
+        description=(
+            "This endpoint allows you to retrieve the details of a specific game by its ID. "
+            "Responses carry an ETag; send it back in `If-None-Match` to get a 304 "
+            "when the game has not changed. Use `fields` and `expand` to get a "
+            "smaller representation."
+        ),
+        parameters=[GameFieldsQuerySerializer],
         responses={
             200: GameSerializer,
+            304: None,
+            400: ErrorDetailSerializer,
             404: ErrorDetailSerializer
         }
     )
     def get(self, request: HttpRequest, game_id: str):
         """Handle GET request to retrieve game details.
         """
+        query = GameFieldsQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+        variant = query.get_variant()
+
         try:
-            game = Game.objects.get(id=game_id)
-            return Response(self.serializer_class(game).data, status=status.HTTP_200_OK)
+            rounds_played, finished_at, *scores = Game.objects.values_list(
+                *query.get_version_fields()
+            ).get(id=game_id)
+            etag = game_etag(game_id, rounds_played, finished_at, variant, scores)
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return HttpResponseNotModified(headers={'ETag': etag})
+
+            content = get_cached_game_detail(game_id, etag)
+            if content is not None:
+                return HttpResponse(content, content_type='application/json', headers={'ETag': etag})
+
+            if settings.GAME_API_FAST_RENDER and not variant:
+                row, content = render_game(game_id)
+                etag = game_etag(
+                    game_id, row.rounds_played, row.finished_at, scores=(row.player1__score, row.player2__score)
+                )
+                cache_game_detail(game_id, etag, content, finished=bool(row.finished_at))
+                return HttpResponse(content, content_type='application/json', headers={'ETag': etag})
+
+            fields, expand = query.get_queryset_fields()
+            game = Game.objects.with_fields(
+                [*fields, 'rounds_played', 'finished_at'], expand
+            ).get(id=game_id)
+            # The scores read above are never newer than the ones rendered.
+            etag = game_etag(game_id, game.rounds_played, game.finished_at, variant, scores)
+            response = Response(
+                self.serializer_class(game, **query.get_serializer_kwargs()).data,
+                status=status.HTTP_200_OK
+            )
+            response['ETag'] = etag
+            response.add_post_render_callback(
+                lambda rendered: cache_game_detail(
+                    game_id, etag, rendered.content, finished=bool(game.finished_at)
+                )
+            )
+            return response
         except Game.DoesNotExist:
             return Response(
                 ErrorDetailSerializer(
@@ -78,7 +222,120 @@ class GameDetailView(APIView):
             )
 
 
-class NewRoundView(APIView):
+class GameEventsView(View):
+    """Server-Sent Events stream of a game.
+
+    Emits a ``round`` event every time a round is recorded and a
+    ``game_finished`` event when the game ends, after which the stream is
+    closed. Must be served under ASGI, where idle streams do not hold a thread.
+
+    The game is checked again once subscribed and on every heartbeat, so a
+    game that finished before the subscription or whose ``game_finished``
+    event was lost still ends the stream.
+    """
+    heartbeat_interval = 15
+
+    async def get(self, request: HttpRequest, game_id: str):
+        """Handle GET request to stream game events.
+        """
+        game = await Game.objects.filter(id=game_id).values('finished_at').afirst()
+        if game is None:
+            return JsonResponse(
+                {"detail": "Game not found", "code": "game_not_found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if game['finished_at']:
+            return JsonResponse(
+                {"detail": "The game is already finished", "code": "game_finished"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return StreamingHttpResponse(
+            self.stream(game_id),
+            content_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    async def stream(self, game_id: str):
+        """Yield the events of a game as SSE messages."""
+        async with get_broker().subscribe(game_channel(game_id)) as subscription:
+            yield ': connected\n\n'
+            event = await self.finished_event(game_id)
+            while event is None:
+                try:
+                    received = await asyncio.wait_for(subscription.get(), self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    event = await self.finished_event(game_id)
+                    if event is None:
+                        yield ': keep-alive\n\n'
+                    continue
+                if received['type'] == 'game_finished':
+                    event = received
+                else:
+                    yield format_sse(received)
+            yield format_sse(event)
+
+    async def finished_event(self, game_id: str) -> dict | None:
+        """Return the ``game_finished`` event of the game if it is finished."""
+        game = await (
+            Game.objects.filter(id=game_id, finished_at__isnull=False)
+            .values('finished_at', 'winner_id', 'player1_id')
+            .afirst()
+        )
+        if game is None:
+            return None
+        return {
+            'game': str(game_id),
+            'type': 'game_finished',
+            'winner': str(game['winner_id']),
+            'slot': PLAYER1 if game['winner_id'] == game['player1_id'] else PLAYER2,
+            'finished_at': game['finished_at'].isoformat()
+        }
+
+
+class ExportView(View):
+    """Streaming export of every game or round.
+
+    The payload is produced while it is sent, so exporting the whole table
+    takes constant memory. Under ASGI the body is an async iterator, which
+    Django streams instead of buffering. See ``apps.game.api.export`` for the
+    formats and the ``updated_since`` watermark.
+    """
+
+    def get(self, request: HttpRequest):
+        """Handle GET request to export games or rounds.
+        """
+        query = ExportQuerySerializer(data=request.GET)
+        if not query.is_valid():
+            return JsonResponse(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        resource = query.validated_data['resource']
+        export_format = query.validated_data['format']
+        stream = astream_export if isinstance(request, ASGIRequest) else stream_export
+        return StreamingHttpResponse(
+            stream(resource, export_format, query.validated_data.get('updated_since')),
+            content_type=EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename="{resource}.{export_format}"'}
+        )
+
+
+class MetricsView(View):
+    """Prometheus metrics of the game API.
+
+    Serves the per-view request histograms and the cache counters of this
+    worker process in the Prometheus text exposition format. Clients that
+    are not allowed to scrape get a 404, as if the endpoint did not exist.
+    """
+
+    def get(self, request: HttpRequest):
+        """Handle GET request to scrape the metrics.
+        """
+        if not settings.GAME_API_METRICS or not can_scrape(request):
+            raise Http404
+        return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class NewRoundView(IdempotentMixin, APIView):
     """API view to create a new round in a game.
     """
     permission_classes = [AllowAny]
@@ -86,34 +343,76 @@ class NewRoundView(APIView):
 
     @extend_schema(
         summary="Create a new round",
-        description="This endpoint allows you to create a new round in an existing game.",
-        request=RoundSerializer,
+        description=(
+            "This endpoint allows you to create a new round in an existing game. "
+            "Send a `rounds` list instead of a single pair of choices to play a "
+            "sequence of rounds at once; the sequence stops at the round that "
+            "decides the game. Send an `Idempotency-Key` header to safely retry "
+            "the request."
+        ),
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
+        request=PolymorphicProxySerializer(
+            component_name='NewRoundRequest',
+            serializers=[RoundSerializer, RoundBatchSerializer],
+            resource_type_field_name=None
+        ),
         responses={
-            201: RoundSerializer,
+            201: PolymorphicProxySerializer(
+                component_name='NewRoundResponse',
+                serializers=[RoundSerializer, RoundBatchResultSerializer],
+                resource_type_field_name=None
+            ),
             400: "Bad Request",
-            404: "Game not found"
+            404: "Game not found",
+            422: ErrorDetailSerializer
         }
     )
     def post(self, request: HttpRequest, game_id: str):
         """Handle POST request to create a new round.
         """
+        is_batch = 'rounds' in request.data
+        serializer_class = RoundBatchSerializer if is_batch else self.serializer_class
+        serializer = serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if is_batch:
+            moves = [
+                (round_data['player1_choice'], round_data['player2_choice'])
+                for round_data in serializer.validated_data['rounds']
+            ]
+        else:
+            moves = [(
+                serializer.validated_data['player1_choice'],
+                serializer.validated_data['player2_choice']
+            )]
+
         try:
-            game = Game.objects.get(id=game_id)
-            if game.finished_at or game.winner:
+            if settings.GAME_ROUND_WRITE_BEHIND:
+                rounds = submit_rounds(game_id, moves)
+            else:
+                rounds = record_rounds(game_id, moves)
+            if is_batch:
                 return Response(
-                    ErrorDetailSerializer(
-                        {
-                            "detail": "Cannot create a new round for a finished game",
-                            "code": "game_finished"
-                        }
+                    RoundBatchResultSerializer(
+                        {'rounds': rounds, 'ignored': len(moves) - len(rounds)}
                     ).data,
-                    status=status.HTTP_400_BAD_REQUEST
+                    status=status.HTTP_201_CREATED
                 )
-            serializer = self.serializer_class(data=request.data)
-            if serializer.is_valid():
-                serializer.save(game=game)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return Response(
+                self.serializer_class(rounds[0]).data,
+                status=status.HTTP_201_CREATED
+            )
+        except GameFinishedError:
+            return Response(
+                ErrorDetailSerializer(
+                    {
+                        "detail": "Cannot create a new round for a finished game",
+                        "code": "game_finished"
+                    }
+                ).data,
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Game.DoesNotExist:
             return Response(
                 ErrorDetailSerializer(
@@ -124,6 +423,16 @@ class NewRoundView(APIView):
                 ).data,
                 status=status.HTTP_404_NOT_FOUND
             )
+        except BacklogFullError:
+            return Response(
+                ErrorDetailSerializer(
+                    {
+                        "detail": "Too many rounds are waiting to be saved, retry later",
+                        "code": "rounds_backlog_full"
+                    }
+                ).data,
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
 
 
 class GameListView(APIView):
@@ -131,19 +440,288 @@ class GameListView(APIView):
     """
     permission_classes = [AllowAny]
     serializer_class = GameSerializer
+    pagination_class = GameCursorPagination
 
     @extend_schema(
         summary="List all games",
-        description="This endpoint allows you to retrieve a list of all games.",
+        description=(
+            "This endpoint allows you to retrieve a list of all games. "
+            "Pass `page_size` and/or `cursor` to get cursor-paginated results "
+            "ordered by creation date, newest first. Use `fields` and `expand` "
+            "to get a smaller representation of each game."
+        ),
+        parameters=[
+            OpenApiParameter('cursor', str, description="Cursor returned by a previous page"),
+            OpenApiParameter('page_size', int, description="Number of games per page"),
+            GameFieldsQuerySerializer,
+        ],
         responses={
-            200: GameSerializer(many=True)
+            200: GameSerializer(many=True),
+            400: ErrorDetailSerializer
         }
     )
     def get(self, request: HttpRequest):
         """Handle GET request to list all games.
         """
-        games = Game.objects.all()
+        query = GameFieldsQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = self.pagination_class()
+        if settings.GAME_API_FAST_RENDER and not query.get_variant():
+            if paginator.is_requested(request):
+                content = render_game_page(paginator, Game.objects.all(), request, view=self)
+            else:
+                content = render_games(Game.objects.all())
+            return HttpResponse(content, content_type='application/json')
+
+        fields, expand = query.get_queryset_fields()
+        games = Game.objects.with_fields([*fields, 'created_at'], expand)
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(games, request, view=self)
+            return paginator.get_paginated_response(
+                self.serializer_class(page, many=True, **query.get_serializer_kwargs()).data
+            )
         return Response(
-            self.serializer_class(games, many=True).data,
+            self.serializer_class(games, many=True, **query.get_serializer_kwargs()).data,
             status=status.HTTP_200_OK
         )
+
+
+class PlayerGamesView(APIView):
+    """API view to list the games of a player.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = GameSummarySerializer
+    pagination_class = GameKeysetPagination
+
+    @extend_schema(
+        summary="List the games of a player",
+        description=(
+            "This endpoint returns the games a player took part in, as either "
+            "player, newest first and without their rounds. Results are "
+            "paginated: follow `next` to get the following page."
+        ),
+        parameters=[PlayerGamesQuerySerializer],
+        responses={
+            200: PlayerGamesPageSerializer,
+            400: ErrorDetailSerializer,
+            404: ErrorDetailSerializer
+        }
+    )
+    def get(self, request: HttpRequest, player_id):
+        """Handle GET request to list the games of a player.
+        """
+        query = PlayerGamesQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not Player.objects.filter(id=player_id).exists():
+            return Response(
+                ErrorDetailSerializer(
+                    {
+                        "detail": "Player not found",
+                        "code": "player_not_found"
+                    }
+                ).data,
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        paginator = self.pagination_class()
+        page_size = query.validated_data['page_size']
+        games = get_player_games(
+            player_id,
+            page_size + 1,
+            before=paginator.decode_cursor(request),
+            finished=query.validated_data['finished'],
+            won=query.validated_data['won']
+        )
+        return paginator.get_paginated_response(
+            request,
+            games,
+            page_size,
+            self.serializer_class(games[:page_size], many=True).data
+        )
+
+
+class PlayerStatsView(APIView):
+    """API view to retrieve the statistics of a player.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = PlayerStatsSerializer
+
+    @extend_schema(
+        summary="Get the statistics of a player",
+        description=(
+            "This endpoint returns the aggregated statistics of a player: games "
+            "and rounds won, win rate, choice distribution and win streaks."
+        ),
+        responses={
+            200: PlayerStatsSerializer,
+            404: ErrorDetailSerializer
+        }
+    )
+    def get(self, request: HttpRequest, player_id):
+        """Handle GET request to retrieve the statistics of a player.
+        """
+        try:
+            player = Player.objects.select_related('stats').get(id=player_id)
+        except Player.DoesNotExist:
+            return Response(
+                ErrorDetailSerializer(
+                    {
+                        "detail": "Player not found",
+                        "code": "player_not_found"
+                    }
+                ).data,
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            stats = player.stats
+        except PlayerStats.DoesNotExist:
+            # The player has not played any round yet.
+            stats = PlayerStats(player=player)
+        return Response(self.serializer_class(stats).data, status=status.HTTP_200_OK)
+
+
+class LeaderboardView(APIView):
+    """API view to retrieve the player leaderboard.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = LeaderboardSerializer
+
+    @extend_schema(
+        summary="Get the leaderboard",
+        description=(
+            "This endpoint returns the top players ordered by score and, "
+            "optionally, the rank of a given player."
+        ),
+        parameters=[LeaderboardQuerySerializer],
+        responses={
+            200: LeaderboardSerializer,
+            400: ErrorDetailSerializer,
+            404: ErrorDetailSerializer
+        }
+    )
+    def get(self, request: HttpRequest):
+        """Handle GET request to retrieve the leaderboard.
+        """
+        query = LeaderboardQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {'results': get_leaderboard(query.validated_data['limit'])}
+        player_id = query.validated_data.get('player_id')
+        if player_id:
+            try:
+                player = Player.objects.get(id=player_id)
+            except Player.DoesNotExist:
+                return Response(
+                    ErrorDetailSerializer(
+                        {
+                            "detail": "Player not found",
+                            "code": "player_not_found"
+                        }
+                    ).data,
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            data['player'] = {
+                'rank': get_player_rank(player),
+                'id': player.id,
+                'name': player.name,
+                'score': player.score
+            }
+        return Response(self.serializer_class(data).data, status=status.HTTP_200_OK)
+
+
+def matchmaking_status(ticket: Ticket) -> dict:
+    """Return the payload describing a matchmaking ticket."""
+    data = {'status': 'waiting', 'player': ticket.player.id}
+    if ticket.matched:
+        data['status'] = 'matched'
+        data['game'] = ticket.result.result()
+    return MatchmakingStatusSerializer(data).data
+
+
+class MatchmakingView(APIView):
+    """API view to join the matchmaking queue.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = MatchmakingRequestSerializer
+
+    @extend_schema(
+        summary="Join the matchmaking queue",
+        description=(
+            "This endpoint queues a player until an opponent with a similar score "
+            "is found. If one is already waiting the game is created at once and "
+            "returned with a 201, otherwise the player waits (202) and should "
+            "long-poll `matchmaking/{player_id}/` for the game."
+        ),
+        request=MatchmakingRequestSerializer,
+        responses={
+            201: MatchmakingStatusSerializer,
+            202: MatchmakingStatusSerializer,
+            400: ErrorDetailSerializer
+        }
+    )
+    def post(self, request):
+        """Handle POST request to join the matchmaking queue.
+        """
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        player, = resolve_players(serializer.validated_data['player_name'])
+        ticket = get_matchmaker().enqueue(player)
+        return Response(
+            matchmaking_status(ticket),
+            status=status.HTTP_201_CREATED if ticket.matched else status.HTTP_202_ACCEPTED
+        )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class MatchmakingTicketView(View):
+    """Long-poll or leave a player's place in the matchmaking queue.
+
+    Waiting clients drive the matchmaking scheduler: each poll runs it at most
+    once per ``GAME_MATCHMAKING_INTERVAL`` while it waits for the player's
+    game. Must be served under ASGI, where idle polls do not hold a thread.
+    """
+
+    async def get(self, request: HttpRequest, player_id):
+        """Handle GET request to wait for the game of a queued player.
+        """
+        query = MatchmakingPollQuerySerializer(data=request.GET)
+        if not query.is_valid():
+            return JsonResponse(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        matchmaker = get_matchmaker()
+        ticket = await sync_to_async(matchmaker.get_ticket)(player_id)
+        if ticket is None:
+            return self.not_queued()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + query.validated_data['timeout']
+        result = asyncio.wrap_future(ticket.result, loop=loop)
+        while not ticket.result.done():
+            await sync_to_async(matchmaker.schedule)()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await asyncio.wait({result}, timeout=min(remaining, matchmaker.interval))
+
+        if ticket.result.cancelled():
+            return self.not_queued()
+        return JsonResponse(matchmaking_status(ticket))
+
+    async def delete(self, request: HttpRequest, player_id):
+        """Handle DELETE request to leave the matchmaking queue.
+        """
+        if not await sync_to_async(get_matchmaker().cancel)(player_id):
+            return self.not_queued()
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    def not_queued(self) -> JsonResponse:
+        return JsonResponse(
+            {"detail": "The player is not waiting for a game", "code": "player_not_queued"},
+            status=status.HTTP_404_NOT_FOUND
+        )
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.game'
+
+    def ready(self):
+        if settings.GAME_API_METRICS:
+            from apps.game.api.metrics import install_query_recorder
+
+            connection_created.connect(install_query_recorder)
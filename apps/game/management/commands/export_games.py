@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.game.api.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_RESOURCES, stream_export
+
+
+class Command(BaseCommand):
+    """Export every game or round as NDJSON or CSV."""
+    help = "Stream games or rounds to a file or to standard output with constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--resource',
+            choices=list(EXPORT_RESOURCES),
+            default='games',
+            help="Rows to export."
+        )
+        parser.add_argument(
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            default='ndjson',
+            help="Output format."
+        )
+        parser.add_argument(
+            '--updated-since',
+            help="Only export rows updated at or after this ISO 8601 instant."
+        )
+        parser.add_argument(
+            '--output',
+            help="File to write to; standard output by default."
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Number of rows fetched and written at a time."
+        )
+
+    def handle(self, *args, **options):
+        updated_since = None
+        if options['updated_since']:
+            updated_since = parse_datetime(options['updated_since'])
+            if updated_since is None:
+                raise CommandError(f"Invalid --updated-since value: {options['updated_since']}")
+            if timezone.is_naive(updated_since):
+                updated_since = timezone.make_aware(updated_since)
+
+        chunks = stream_export(
+            options['resource'],
+            options['format'],
+            updated_since,
+            options['chunk_size']
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
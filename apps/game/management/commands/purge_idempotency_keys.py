@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.game.api.idempotency import purge_idempotency_keys
+
+
+class Command(BaseCommand):
+    """Delete expired idempotency keys."""
+    help = "Delete the idempotency keys older than GAME_IDEMPOTENCY_KEY_TTL seconds."
+
+    def handle(self, *args, **options):
+        deleted = purge_idempotency_keys()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
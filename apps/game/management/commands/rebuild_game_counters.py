@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from apps.game.models import Game, Round
+
+
+class Command(BaseCommand):
+    """Rebuild the denormalized round counters stored on each game."""
+    help = "Recompute rounds_played, player1_wins and player2_wins from the stored rounds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of games recomputed and updated per batch."
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        last_id = None
+
+        while True:
+            games = Game.objects.order_by('id').only(
+                'id', 'player1_id', 'player2_id', 'rounds_played', 'player1_wins', 'player2_wins'
+            )
+            if last_id is not None:
+                games = games.filter(id__gt=last_id)
+            batch = list(games[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            with transaction.atomic():
+                updated += self.rebuild_batch(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated counters for {updated} games."))
+
+    def rebuild_batch(self, games: list[Game]) -> int:
+        """Recompute the counters of a batch of games with one aggregate query."""
+        counters = {
+            row['game_id']: row
+            for row in Round.objects.filter(game_id__in=[game.id for game in games])
+            .order_by()
+            .values('game_id')
+            .annotate(
+                total=Count('id'),
+                p1=Count('id', filter=Q(round_winner_id=F('game__player1_id'))),
+                p2=Count('id', filter=Q(round_winner_id=F('game__player2_id'))),
+            )
+        }
+
+        changed = []
+        for game in games:
+            row = counters.get(game.id, {'total': 0, 'p1': 0, 'p2': 0})
+            values = (row['total'], row['p1'], row['p2'])
+            if values != (game.rounds_played, game.player1_wins, game.player2_wins):
+                game.rounds_played, game.player1_wins, game.player2_wins = values
+                changed.append(game)
+
+        Game.objects.bulk_update(changed, ['rounds_played', 'player1_wins', 'player2_wins'])
+        return len(changed)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.game.api.stats import rebuild_player_stats
+
+
+class Command(BaseCommand):
+    """Rebuild the materialized statistics of every player."""
+    help = (
+        "Recompute all player statistics from the stored games and rounds in one set-based "
+        "statement. Rounds recorded while it runs may be missed; run it while writes are paused."
+    )
+
+    def handle(self, *args, **options):
+        updated = rebuild_player_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {updated} players."))
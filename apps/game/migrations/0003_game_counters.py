@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    """Populate the new counters from the rounds already stored."""
+    Game = apps.get_model('game', 'Game')
+    Round = apps.get_model('game', 'Round')
+
+    def round_count(**filters):
+        rounds = (
+            Round.objects.filter(game=OuterRef('pk'), **filters)
+            .order_by()
+            .values('game')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return Coalesce(Subquery(rounds), 0)
+
+    Game.objects.update(
+        rounds_played=round_count(),
+        player1_wins=round_count(round_winner=OuterRef('player1')),
+        player2_wins=round_count(round_winner=OuterRef('player2')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_alter_player_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='player1_wins',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='player2_wins',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='rounds_played',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:52
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def renumber_duplicate_rounds(apps, schema_editor):
+    """Renumber rounds of games that ended up with repeated round numbers."""
+    Round = apps.get_model('game', 'Round')
+    game_ids = (
+        Round.objects.values('game_id', 'round_number')
+        .annotate(total=Count('pk'))
+        .filter(total__gt=1)
+        .values_list('game_id', flat=True)
+        .distinct()
+    )
+    for game_id in list(game_ids):
+        rounds = list(Round.objects.filter(game_id=game_id).order_by('created_at', 'round_number'))
+        for number, round_obj in enumerate(rounds, start=1):
+            round_obj.round_number = number
+        Round.objects.bulk_update(rounds, ['round_number'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_game_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_rounds, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='round',
+            constraint=models.UniqueConstraint(fields=('game', 'round_number'), name='unique_round_number_per_game'),
+        ),
+    ]
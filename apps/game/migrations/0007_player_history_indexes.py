@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0006_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player1', '-created_at', '-id'], name='game_player1_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player2', '-created_at', '-id'], name='game_player2_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:10
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Date existing games by their last round instead of the migration time."""
+    Game = apps.get_model('game', 'Game')
+    Round = apps.get_model('game', 'Round')
+
+    last_round = (
+        Round.objects.filter(game=OuterRef('pk'))
+        .order_by()
+        .values('game')
+        .annotate(last=Max('created_at'))
+        .values('last')
+    )
+    Game.objects.update(updated_at=Coalesce('finished_at', Subquery(last_round), 'created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0007_player_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['updated_at', 'id'], name='game_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='round',
+            index=models.Index(fields=['updated_at', 'id'], name='round_updated_at_idx'),
+        ),
+    ]
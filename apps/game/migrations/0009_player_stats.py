@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_export_watermarks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStats',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='game.player')),
+                ('games_played', models.PositiveIntegerField(default=0)),
+                ('games_won', models.PositiveIntegerField(default=0)),
+                ('rounds_played', models.PositiveIntegerField(default=0)),
+                ('rounds_won', models.PositiveIntegerField(default=0)),
+                ('rounds_drawn', models.PositiveIntegerField(default=0)),
+                ('rock_count', models.PositiveIntegerField(default=0)),
+                ('paper_count', models.PositiveIntegerField(default=0)),
+                ('scissors_count', models.PositiveIntegerField(default=0)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'player stats',
+            },
+        ),
+    ]
@@ -12,9 +12,71 @@ class Player(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', 'name'], name='player_score_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} (Score: {self.score})"
-    
+
+
+class GameQuerySet(models.QuerySet):
+    """Custom queryset for the Game model."""
+
+    def with_details(self):
+        """Load the players and rounds rendered by the game serializer.
+
+        Players are joined in the same query and rounds (with their winners)
+        are fetched in a single extra query, so serializing any number of
+        games costs a constant number of queries.
+        """
+        return self.select_related('player1', 'player2', 'winner').prefetch_related(
+            models.Prefetch(
+                'rounds',
+                queryset=Round.objects.select_related('round_winner').order_by('round_number')
+            )
+        )
+
+    def with_fields(self, fields, expand=()):
+        """Load only the columns and relations needed for a field selection.
+
+        Args:
+            fields: Names of the game fields to load. ``rounds`` prefetches
+                the rounds of each game.
+            expand: Names of the relations rendered as nested objects. Player
+                relations that are not expanded only load their foreign key,
+                and rounds that are not expanded only load the columns of
+                their compact form.
+        Returns:
+            GameQuerySet: The narrowed queryset.
+        """
+        columns = {'id'}
+        related = []
+        for name in fields:
+            if name == 'rounds':
+                continue
+            columns.add(name)
+            if name in expand:
+                related.append(name)
+                columns.update((f'{name}__name', f'{name}__score'))
+
+        queryset = self.select_related(*related) if related else self
+        if 'rounds' in fields:
+            if 'rounds' in expand:
+                rounds = Round.objects.select_related('round_winner')
+            else:
+                # The compact form reports the winner by slot, which needs
+                # both player ids of the game.
+                columns.update(('player1', 'player2'))
+                rounds = Round.objects.only(
+                    'game', 'round_number', 'player1_choice', 'player2_choice', 'round_winner'
+                )
+            queryset = queryset.prefetch_related(
+                models.Prefetch('rounds', queryset=rounds.order_by('round_number'))
+            )
+        return queryset.only(*columns)
+
 
 class Game(models.Model):
     """Model representing a game between two players."""
@@ -30,8 +92,28 @@ class Game(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     finished_at = models.DateTimeField(null=True, blank=True)
 
+    player1_wins = models.PositiveIntegerField(default=0)
+    player2_wins = models.PositiveIntegerField(default=0)
+    rounds_played = models.PositiveIntegerField(default=0)
+
+    objects = GameQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='game_created_at_idx'),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(finished_at__isnull=True),
+                name='game_active_idx'
+            ),
+            models.Index(fields=['player1', '-created_at', '-id'], name='game_player1_created_at_idx'),
+            models.Index(fields=['player2', '-created_at', '-id'], name='game_player2_created_at_idx'),
+            models.Index(fields=['updated_at', 'id'], name='game_updated_at_idx'),
+        ]
+
     def __str__(self):
         return f"Game {self.id} between {self.player1.name} and {self.player2.name}"
 
@@ -64,5 +146,100 @@ class Round(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['game', 'round_number'],
+                name='unique_round_number_per_game'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['game', 'round_winner'], name='round_game_winner_idx'),
+            models.Index(fields=['updated_at', 'id'], name='round_updated_at_idx'),
+        ]
+
     def __str__(self):
         return f"Round {self.round_number} of Game {self.game.id} - {self.player1_choice} vs {self.player2_choice}"
+
+
+class PlayerStats(models.Model):
+    """Aggregated statistics of a player, kept up to date as rounds are recorded.
+
+    Rows are created on the first recorded round of a player and updated
+    incrementally by the round pipeline; ``rebuild_player_stats`` recomputes
+    them all from the stored games and rounds.
+    """
+    player = models.OneToOneField(
+        Player,
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.CASCADE
+    )
+    games_played = models.PositiveIntegerField(default=0)
+    games_won = models.PositiveIntegerField(default=0)
+    rounds_played = models.PositiveIntegerField(default=0)
+    rounds_won = models.PositiveIntegerField(default=0)
+    rounds_drawn = models.PositiveIntegerField(default=0)
+    rock_count = models.PositiveIntegerField(default=0)
+    paper_count = models.PositiveIntegerField(default=0)
+    scissors_count = models.PositiveIntegerField(default=0)
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'player stats'
+
+    def __str__(self):
+        return f"Stats of player {self.player_id}"
+
+    @property
+    def games_lost(self) -> int:
+        return self.games_played - self.games_won
+
+    @property
+    def rounds_lost(self) -> int:
+        return self.rounds_played - self.rounds_won - self.rounds_drawn
+
+    @property
+    def win_rate(self) -> float | None:
+        """Share of finished games won, or None before the first one."""
+        if not self.games_played:
+            return None
+        return self.games_won / self.games_played
+
+    @property
+    def choice_distribution(self) -> dict[str, int]:
+        return {choice: getattr(self, f'{choice}_count') for choice, _ in Round.GAME_CHOICES}
+
+    @property
+    def favourite_choice(self) -> str | None:
+        """The most played choice; ties go to the first one in ``GAME_CHOICES``."""
+        distribution = self.choice_distribution
+        choice = max(distribution, key=distribution.get)
+        return choice if distribution[choice] else None
+
+
+class IdempotencyKey(models.Model):
+    """Response recorded for a client-supplied ``Idempotency-Key``.
+
+    A row is inserted in the transaction that handles the request and
+    completed with the response before it commits, so a key is either
+    absent or maps to a finished response.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    key = models.CharField(max_length=255, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content = models.BinaryField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_key_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key}"
@@ -1,5 +1,47 @@
+import re
+from contextlib import contextmanager
+from functools import wraps
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
+from apps.game.api.services import player_ids
+
+
+def query_budget(budget: int, sizes: tuple[int, ...] = (1, 5)):
+    """Run a test once per data size and check that its queries stay constant.
+
+    The decorated test takes the data size as an argument, creates that much
+    data and measures the request under test with ``assertQueryBudget()``.
+    It fails if a run exceeds ``budget`` queries or if the runs do not all
+    issue the same number of queries, which is how an N+1 shows up::
+
+        @query_budget(3, sizes=(1, 5))
+        def test_detail(self, size):
+            game = self.create_game(rounds=size)
+            with self.assertQueryBudget():
+                self.client.get(f"/api/game/{game.id}/")
+
+    Caches are cleared before every run, so each one starts cold.
+    """
+    def decorator(test):
+        @wraps(test)
+        def wrapper(self):
+            counts = {}
+            for size in sizes:
+                self.clear_caches()
+                self._query_budget, self._query_counts = budget, []
+                with self.subTest(size=size):
+                    test(self, size)
+                counts[size] = self._query_counts
+            del self._query_budget, self._query_counts
+            if len({tuple(count) for count in counts.values()}) > 1:
+                self.fail(f"Query count depends on the data size: {counts}")
+        return wrapper
+    return decorator
+
 
 class GameAPITestCase(APITestCase):
     """Base test case for game API tests.
@@ -11,9 +53,74 @@ class GameAPITestCase(APITestCase):
     def setUp(self):
         """Set up the test environment."""
         # Initialize any common data or state needed for tests here
-        pass
+        self.clear_caches()
 
     def tearDown(self):
         """Clean up after tests."""
         # Perform any necessary cleanup after tests here
-        pass
\ No newline at end of file
+        pass
+
+    def clear_caches(self):
+        """Empty every cache, so the next request runs cold."""
+        for cache in caches.all():
+            cache.clear()
+        player_ids.clear()
+
+    @contextmanager
+    def assertQueryBudget(self, budget: int | None = None):
+        """Fail if the block runs more than ``budget`` queries.
+
+        Savepoints are not counted, as they depend on whether the test runs
+        inside a transaction. Inside a test decorated with ``query_budget``
+        the budget defaults to the decorator's and the count is recorded to
+        be compared across data sizes.
+        """
+        if budget is None:
+            budget = self._query_budget
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        queries = [query['sql'] for query in context.captured_queries if 'SAVEPOINT' not in query['sql']]
+        if hasattr(self, '_query_counts'):
+            self._query_counts.append(len(queries))
+        if len(queries) > budget:
+            self.fail(
+                f"{len(queries)} queries run, budget is {budget}:\n"
+                + "\n".join(f"{i}. {sql}" for i, sql in enumerate(queries, start=1))
+            )
+
+    @contextmanager
+    def assertNoSequentialScans(self):
+        """Fail if any SELECT run inside the block reads a whole table.
+
+        Every captured SELECT is re-run through ``EXPLAIN`` and the plan is
+        searched for full table scans. On PostgreSQL sequential scans are
+        disabled for the check, so one that still shows up means no index
+        can serve the query, regardless of how small the test tables are.
+        """
+        with CaptureQueriesContext(connection) as context:
+            yield
+        scans = []
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            tables = self._sequential_scans(sql)
+            if tables:
+                scans.append(f"{', '.join(tables)}: {sql}")
+        if scans:
+            self.fail("Sequential scans found:\n" + "\n".join(scans))
+
+    def _sequential_scans(self, sql: str) -> list[str]:
+        """Return the tables read with a full scan by a query."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+                cursor.execute('SET LOCAL enable_seqscan = on')
+                return re.findall(r'Seq Scan on (\w+)', plan)
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                details = [row[-1] for row in cursor.fetchall()]
+                return [m.group(1) for d in details if (m := re.fullmatch(r'SCAN (\w+)', d))]
+        self.skipTest(f"Query plans are not checked on {connection.vendor}")
\ No newline at end of file
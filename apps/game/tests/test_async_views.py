@@ -0,0 +1,147 @@
+import json
+
+from django.core.cache import caches
+from django.test import AsyncRequestFactory, override_settings
+
+from apps.game.api import async_views
+from apps.game.api.cache import GAME_PAYLOADS_CACHE
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player, Round
+
+
+class AsyncViewsTestCase(GameAPITestCase):
+    """Test case for the async versions of the core game views."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.player1 = Player.objects.create(name="Alice")
+        self.player2 = Player.objects.create(name="Bob")
+        self.game = Game.objects.create(player1=self.player1, player2=self.player2)
+        Round.objects.create(
+            game=self.game,
+            round_number=1,
+            player1_choice='rock',
+            player2_choice='scissors',
+            round_winner=self.player1
+        )
+        Game.objects.filter(id=self.game.id).update(rounds_played=1, player1_wins=1)
+
+    def post(self, path, data):
+        return self.factory.post(path, json.dumps(data), content_type='application/json')
+
+    async def test_list_matches_sync_view(self):
+        """The async list should return the same payload as the sync one."""
+        expected = await self.async_client.get("/api/game/")
+        response = await async_views.GameListView.as_view()(self.factory.get("/api/game/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+
+    async def test_list_paginated(self):
+        """Pagination parameters should switch to the cursor-paginated mode."""
+        view = async_views.GameListView.as_view()
+        response = await view(self.factory.get("/api/game/", {"page_size": 1}))
+        data = json.loads(response.content)
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["rounds"][0]["round_winner"]["name"], "Alice")
+
+    async def test_field_selection_matches_sync_view(self):
+        """Field selection should give the same payloads as the sync views."""
+        params = {"fields": "id,player1,rounds", "expand": ""}
+        expected = await self.async_client.get("/api/game/", params)
+        response = await async_views.GameListView.as_view()(self.factory.get("/api/game/", params))
+        self.assertEqual(response.content, expected.content)
+
+        url = f"/api/game/{self.game.id}/"
+        expected = await self.async_client.get(url, params)
+        view = async_views.GameDetailView.as_view()
+        response = await view(self.factory.get(url, params), game_id=str(self.game.id))
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response["ETag"], expected["ETag"])
+
+    async def test_fast_render_matches_sync_view(self):
+        """The fast read path of the async views should give the same payloads."""
+        url = f"/api/game/{self.game.id}/"
+        expected_list = await self.async_client.get("/api/game/")
+        expected_detail = await self.async_client.get(url)
+        await caches[GAME_PAYLOADS_CACHE].aclear()
+        with override_settings(GAME_API_FAST_RENDER=True):
+            response = await async_views.GameListView.as_view()(self.factory.get("/api/game/"))
+            self.assertEqual(response.content, expected_list.content)
+            view = async_views.GameDetailView.as_view()
+            response = await view(self.factory.get(url), game_id=str(self.game.id))
+            self.assertEqual(response.content, expected_detail.content)
+            self.assertEqual(response["ETag"], expected_detail["ETag"])
+
+    async def test_detail_matches_sync_view(self):
+        """The async detail should return the same payload and ETag."""
+        url = f"/api/game/{self.game.id}/"
+        expected = await self.async_client.get(url)
+        view = async_views.GameDetailView.as_view()
+        response = await view(self.factory.get(url), game_id=str(self.game.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response["ETag"], expected["ETag"])
+
+        response = await view(
+            self.factory.get(url, headers={"If-None-Match": expected["ETag"]}),
+            game_id=str(self.game.id)
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_detail_not_found(self):
+        """Unknown games should return the usual error payload."""
+        game_id = "00000000-0000-0000-0000-000000000000"
+        response = await async_views.GameDetailView.as_view()(
+            self.factory.get(f"/api/game/{game_id}/"), game_id=game_id
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content)["code"], "game_not_found")
+
+    async def test_new_game(self):
+        """Games should be created with new and existing players."""
+        view = async_views.NewGameView.as_view()
+        response = await view(self.post("/api/game/new/", {"player1_name": "Alice", "player2_name": "Carol"}))
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.content)
+        self.assertEqual(data["player1"]["id"], str(self.player1.id))
+        self.assertEqual(data["player2"]["name"], "Carol")
+        self.assertEqual(data["rounds"], [])
+
+    async def test_new_game_invalid(self):
+        """Invalid payloads should be rejected like in the sync view."""
+        view = async_views.NewGameView.as_view()
+        response = await view(self.post("/api/game/new/", {"player1_name": "Alice"}))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("player2_name", json.loads(response.content))
+
+        response = await view(self.post("/api/game/new/", {"player1_name": "Eve", "player2_name": "eve"}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)["code"], "duplicate_player_names")
+
+    async def test_new_round(self):
+        """Single rounds and round sequences should be recorded."""
+        view = async_views.NewRoundView.as_view()
+        url = f"/api/game/{self.game.id}/rounds/new/"
+        response = await view(
+            self.post(url, {"player1_choice": "paper", "player2_choice": "rock"}),
+            game_id=str(self.game.id)
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)["round_number"], 2)
+
+        response = await view(
+            self.post(url, {"rounds": [{"player1_choice": "paper", "player2_choice": "rock"}] * 3}),
+            game_id=str(self.game.id)
+        )
+        data = json.loads(response.content)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((len(data["rounds"]), data["ignored"]), (1, 2))
+
+        response = await view(
+            self.post(url, {"player1_choice": "paper", "player2_choice": "rock"}),
+            game_id=str(self.game.id)
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)["code"], "game_finished")
@@ -0,0 +1,104 @@
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import caches
+from rest_framework import status
+
+from apps.game.api.cache import (
+    GAME_PAYLOADS_CACHE,
+    RATE_LIMITS_CACHE,
+    CacheStats,
+    FileBasedCache,
+    LocMemCache,
+    cache_stats,
+    game_detail_key,
+    game_etag,
+)
+from apps.game.api.throttling import GameRateThrottle
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player
+
+
+class CacheTestCase(GameAPITestCase):
+    """Test case for the named caches and their counters."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        for stats in CacheStats._registry.values():
+            stats.reset()
+
+    def test_local_memory_counters(self):
+        """The local memory backend should count hits, misses and evictions."""
+        cache = LocMemCache('test-counters', {'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2}})
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+        cache.get('c')
+        cache.get_many(['a', 'b', 'c'])
+
+        self.assertEqual(cache.stats.as_dict(), {'hits': 3, 'misses': 1, 'evictions': 1})
+
+    def test_file_based_counters(self):
+        """The file-based backend should count hits, misses and evictions."""
+        with tempfile.TemporaryDirectory() as location:
+            cache = FileBasedCache(location, {'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2}})
+            cache.set('a', 1)
+            cache.set('b', 2)
+            cache.set('c', 3)
+            self.assertEqual(cache.get('c'), 3)
+            cache.get('missing')
+
+            self.assertEqual(cache.stats.as_dict(), {'hits': 1, 'misses': 1, 'evictions': 1})
+
+    def test_counters_are_shared_by_location(self):
+        """Backend instances of the same location should share their counters."""
+        first = LocMemCache('test-shared', {})
+        second = LocMemCache('test-shared', {})
+        first.get('missing')
+        second.get('missing')
+        self.assertEqual(second.stats.as_dict()['misses'], 2)
+
+    def test_cache_stats_by_alias(self):
+        """Reading a game detail twice should count a miss and a hit."""
+        game = Game.objects.create(
+            player1=Player.objects.create(name="Alice"),
+            player2=Player.objects.create(name="Bob")
+        )
+        self.client.get(f"/api/game/{game.id}/")
+        self.client.get(f"/api/game/{game.id}/")
+
+        stats = cache_stats()
+        self.assertEqual(
+            set(stats),
+            {'default', 'game_payloads', 'leaderboard', 'idempotency', 'rate_limits', 'matchmaking'}
+        )
+        self.assertEqual(stats[GAME_PAYLOADS_CACHE], {'hits': 1, 'misses': 1, 'evictions': 0})
+
+    def test_game_payloads_are_keyed_by_version(self):
+        """Recording a round should move the game detail to a new cache key."""
+        game = Game.objects.create(
+            player1=Player.objects.create(name="Alice"),
+            player2=Player.objects.create(name="Bob")
+        )
+        url = f"/api/game/{game.id}/"
+        first = self.client.get(url)
+        self.client.post(f"{url}rounds/new/", {"player1_choice": "rock", "player2_choice": "scissors"}, format="json")
+        second = self.client.get(url)
+
+        payloads = caches[GAME_PAYLOADS_CACHE]
+        self.assertEqual(payloads.get(game_detail_key(game.id, first["ETag"])), first.content)
+        self.assertEqual(payloads.get(game_detail_key(game.id, second["ETag"])), second.content)
+        self.assertEqual(second["ETag"], game_etag(game.id, 1, None, scores=(0, 0)))
+
+    def test_throttle_uses_rate_limits_cache(self):
+        """Throttled clients should be tracked in the rate limits cache."""
+        with patch.dict(GameRateThrottle.THROTTLE_RATES, {'game': '2/min'}):
+            responses = [self.client.get("/api/game/") for _ in range(3)]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_200_OK, status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS]
+        )
+        self.assertEqual(len(caches[RATE_LIMITS_CACHE]._cache), 1)
+        self.assertEqual(len(caches['default']._cache), 0)
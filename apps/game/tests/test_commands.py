@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player, PlayerStats, Round
+
+
+class RebuildGameCountersCommandTestCase(GameAPITestCase):
+    """Test case for the rebuild_game_counters command."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.player1 = Player.objects.create(name="Player 1")
+        self.player2 = Player.objects.create(name="Player 2")
+        self.games = [
+            Game.objects.create(player1=self.player1, player2=self.player2)
+            for _ in range(3)
+        ]
+        winners = [self.player1, self.player2, None, self.player1]
+        for number, winner in enumerate(winners, start=1):
+            Round.objects.create(
+                game=self.games[0],
+                round_number=number,
+                player1_choice='rock',
+                player2_choice='rock',
+                round_winner=winner
+            )
+
+    def test_rebuild_counters(self):
+        """Counters should match the stored rounds after a rebuild."""
+        out = StringIO()
+        call_command('rebuild_game_counters', batch_size=2, stdout=out)
+
+        game = Game.objects.get(id=self.games[0].id)
+        self.assertEqual(game.rounds_played, 4)
+        self.assertEqual(game.player1_wins, 2)
+        self.assertEqual(game.player2_wins, 1)
+        self.assertEqual(Game.objects.filter(rounds_played=0).count(), 2)
+        self.assertIn("Updated counters for 1 games.", out.getvalue())
+
+    def test_rebuild_counters_resets_stale_values(self):
+        """Games without rounds should have their counters reset."""
+        Game.objects.filter(id=self.games[1].id).update(rounds_played=5, player2_wins=3)
+        call_command('rebuild_game_counters', stdout=StringIO())
+
+        game = Game.objects.get(id=self.games[1].id)
+        self.assertEqual((game.rounds_played, game.player1_wins, game.player2_wins), (0, 0, 0))
+
+
+class RoundNumberConstraintTestCase(GameAPITestCase):
+    """Test case for the unique round number constraint."""
+
+    def test_duplicate_round_number_rejected(self):
+        """Two rounds of a game cannot share a round number."""
+        player1 = Player.objects.create(name="Player 1")
+        player2 = Player.objects.create(name="Player 2")
+        game = Game.objects.create(player1=player1, player2=player2)
+        Round.objects.create(game=game, round_number=1, player1_choice='rock', player2_choice='rock')
+        with self.assertRaises(IntegrityError):
+            Round.objects.create(game=game, round_number=1, player1_choice='rock', player2_choice='paper')
+
+
+class ExportGamesCommandTestCase(GameAPITestCase):
+    """Test case for the export_games command."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.player1 = Player.objects.create(name="Player 1")
+        self.player2 = Player.objects.create(name="Player 2")
+        self.games = [
+            Game.objects.create(player1=self.player1, player2=self.player2)
+            for _ in range(5)
+        ]
+
+    def test_export_to_stdout(self):
+        """Every game should be written as one JSON line, in chunks."""
+        out = StringIO()
+        call_command('export_games', chunk_size=2, stdout=out)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record['id'] for record in records], [str(game.id) for game in self.games])
+
+    def test_export_to_file(self):
+        """CSV exports should be written to the given file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rounds.csv')
+            call_command('export_games', resource='rounds', format='csv', output=path)
+            with open(path, encoding='utf-8') as output:
+                self.assertEqual(output.read().splitlines(), [
+                    'id,game_id,round_number,player1_choice,player2_choice,round_winner_id,created_at,updated_at'
+                ])
+
+    def test_invalid_updated_since(self):
+        """A malformed watermark should be rejected."""
+        with self.assertRaises(CommandError):
+            call_command('export_games', updated_since='yesterday', stdout=StringIO())
+
+
+class RebuildPlayerStatsCommandTestCase(GameAPITestCase):
+    """Test case for the rebuild_player_stats command."""
+
+    def test_rebuild_player_stats(self):
+        """Every player should get a statistics row."""
+        player1 = Player.objects.create(name="Player 1")
+        player2 = Player.objects.create(name="Player 2")
+        game = Game.objects.create(player1=player1, player2=player2, winner=player1)
+        Round.objects.create(
+            game=game,
+            round_number=1,
+            player1_choice='paper',
+            player2_choice='rock',
+            round_winner=player1
+        )
+        out = StringIO()
+        call_command('rebuild_player_stats', stdout=out)
+
+        self.assertIn("Rebuilt statistics for 2 players.", out.getvalue())
+        self.assertEqual(PlayerStats.objects.get(player=player1).paper_count, 1)
+        self.assertEqual(PlayerStats.objects.get(player=player2).games_played, 1)
@@ -0,0 +1,64 @@
+import numpy as np
+
+from django.test import SimpleTestCase
+
+from apps.game.api.engine import (
+    CHOICES,
+    CHOICE_CODES,
+    DRAW,
+    PLAYER1,
+    PLAYER2,
+    decide_game,
+    encode_choices,
+    random_choices,
+    resolve_games,
+    resolve_round,
+    resolve_rounds,
+)
+
+
+class EngineTestCase(SimpleTestCase):
+    """Test case for the pure computation engine."""
+
+    def test_resolve_round_matches_rules(self):
+        """Every pair of choices should follow the CHOICES table."""
+        for p1 in CHOICE_CODES:
+            for p2 in CHOICE_CODES:
+                expected = DRAW if p1 == p2 else PLAYER1 if CHOICES[p1] == p2 else PLAYER2
+                self.assertEqual(resolve_round(p1, p2), expected)
+
+    def test_resolve_rounds_matches_scalar_path(self):
+        """The vectorized path should agree with the scalar one."""
+        p1 = ['rock', 'paper', 'scissors', 'rock', 'scissors']
+        p2 = ['scissors', 'scissors', 'scissors', 'paper', 'paper']
+        outcomes = resolve_rounds(encode_choices(p1), encode_choices(p2))
+        self.assertEqual(outcomes.tolist(), [resolve_round(a, b) for a, b in zip(p1, p2)])
+
+    def test_decide_game(self):
+        """A game is decided once a player reaches three wins."""
+        self.assertEqual(decide_game(3, 1), PLAYER1)
+        self.assertEqual(decide_game(2, 3), PLAYER2)
+        self.assertEqual(decide_game(2, 2), DRAW)
+
+    def test_resolve_games(self):
+        """Games should end at the round that gives a player three wins."""
+        rock, paper, scissors = (CHOICE_CODES[c] for c in ('rock', 'paper', 'scissors'))
+        p1 = np.array([
+            [rock, rock, rock, rock, rock],
+            [rock, rock, rock, rock, rock],
+            [rock, rock, rock, rock, rock],
+        ], dtype=np.int8)
+        p2 = np.array([
+            [scissors, scissors, scissors, paper, paper],
+            [paper, rock, paper, scissors, paper],
+            [rock, rock, paper, rock, scissors],
+        ], dtype=np.int8)
+        winners, rounds_played = resolve_games(p1, p2)
+        self.assertEqual(winners.tolist(), [PLAYER1, PLAYER2, DRAW])
+        self.assertEqual(rounds_played.tolist(), [3, 5, 5])
+
+    def test_random_choices_are_reproducible(self):
+        """The same seed should draw the same choices."""
+        first = random_choices((10, 5), seed=7)
+        self.assertTrue(np.array_equal(first, random_choices((10, 5), seed=7)))
+        self.assertTrue(((first >= 0) & (first < 3)).all())
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.game.api.events import (
+    SUBSCRIBER_QUEUE_SIZE,
+    InProcessBroker,
+    Subscription,
+    format_sse,
+    game_channel,
+    get_broker
+)
+from apps.game.api.services import record_round
+from apps.game.api.views import GameEventsView
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player
+
+
+class InProcessBrokerTestCase(SimpleTestCase):
+    """Test case for the in-process event broker."""
+
+    async def test_fan_out_to_many_subscribers(self):
+        """Every subscriber should receive an event published from another thread."""
+        broker = InProcessBroker()
+        subscribers = 2000
+        ready = asyncio.Event()
+        subscribed = 0
+
+        async def listen():
+            nonlocal subscribed
+            async with broker.subscribe('game:1') as subscription:
+                subscribed += 1
+                if subscribed == subscribers:
+                    ready.set()
+                return await asyncio.wait_for(subscription.get(), 5)
+
+        tasks = [asyncio.create_task(listen()) for _ in range(subscribers)]
+        await asyncio.wait_for(ready.wait(), 5)
+        self.assertEqual(broker.subscriber_count('game:1'), subscribers)
+
+        publisher = threading.Thread(target=broker.publish, args=('game:1', {'type': 'round'}))
+        publisher.start()
+        events = await asyncio.gather(*tasks)
+        publisher.join()
+
+        self.assertEqual(events, [{'type': 'round'}] * subscribers)
+        self.assertEqual(broker.subscriber_count('game:1'), 0)
+
+    async def test_publish_only_reaches_channel(self):
+        """Subscribers of other channels should not receive the event."""
+        broker = InProcessBroker()
+        async with broker.subscribe('game:1') as first, broker.subscribe('game:2') as second:
+            broker.publish('game:1', {'type': 'round'})
+            self.assertEqual(await asyncio.wait_for(first.get(), 1), {'type': 'round'})
+            await asyncio.sleep(0)
+            self.assertTrue(second.queue.empty())
+
+    async def test_game_finished_is_never_dropped(self):
+        """A full queue should make room for the event that ends the stream."""
+        subscription = Subscription('game:1', asyncio.get_running_loop())
+        for number in range(SUBSCRIBER_QUEUE_SIZE + 1):
+            subscription.deliver({'type': 'round', 'round': number})
+        subscription.deliver({'type': 'game_finished'})
+
+        self.assertEqual(subscription.queue.qsize(), SUBSCRIBER_QUEUE_SIZE)
+        self.assertEqual((await subscription.get())['round'], 1)
+        events = [subscription.queue.get_nowait() for _ in range(SUBSCRIBER_QUEUE_SIZE - 1)]
+        self.assertEqual(events[-1], {'type': 'game_finished'})
+
+    def test_format_sse(self):
+        """Events should be encoded as named SSE messages."""
+        message = format_sse({'type': 'round', 'round': 1})
+        self.assertEqual(message, 'event: round\ndata: {"type":"round","round":1}\n\n')
+
+
+class GameEventsTestCase(GameAPITestCase):
+    """Test case for the game events published by the services and the SSE view."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.player1 = Player.objects.create(name="Player 1")
+        self.player2 = Player.objects.create(name="Player 2")
+        self.game = Game.objects.create(player1=self.player1, player2=self.player2)
+
+    async def read_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        return chunk.decode()
+
+    async def test_stream_round_and_finish_events(self):
+        """The stream should relay round events and close when the game ends."""
+        response = await self.async_client.get(f"/api/game/{self.game.id}/events/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await self.read_event(stream), ': connected\n\n')
+
+        broker = get_broker()
+        channel = game_channel(self.game.id)
+        broker.publish(channel, {'type': 'round', 'round': 1})
+        self.assertEqual(
+            await self.read_event(stream),
+            'event: round\ndata: {"type":"round","round":1}\n\n'
+        )
+        broker.publish(channel, {'type': 'game_finished'})
+        self.assertTrue((await self.read_event(stream)).startswith('event: game_finished'))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(broker.subscriber_count(channel), 0)
+
+    async def finish_game(self):
+        await Game.objects.filter(id=self.game.id).aupdate(winner=self.player2, finished_at=timezone.now())
+
+    async def test_stream_game_finished_before_subscribing(self):
+        """A game that finishes before the subscription should end the stream."""
+        stream = GameEventsView().stream(str(self.game.id))
+        await self.finish_game()
+        self.assertEqual(await anext(stream), ': connected\n\n')
+        event = await anext(stream)
+        self.assertTrue(event.startswith('event: game_finished'))
+        self.assertEqual(json.loads(event.split('data: ')[1])['slot'], 2)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    async def test_stream_rechecks_game_on_heartbeat(self):
+        """A lost game_finished event should be recovered at the next heartbeat."""
+        stream = GameEventsView().stream(str(self.game.id))
+        with patch.object(GameEventsView, 'heartbeat_interval', 0.01):
+            self.assertEqual(await anext(stream), ': connected\n\n')
+            self.assertEqual(await anext(stream), ': keep-alive\n\n')
+            await self.finish_game()
+            while (event := await anext(stream)) == ': keep-alive\n\n':
+                pass
+        self.assertTrue(event.startswith('event: game_finished'))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    async def test_stream_game_not_found(self):
+        """Unknown games should be rejected."""
+        response = await self.async_client.get("/api/game/00000000-0000-0000-0000-000000000000/events/")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content)['code'], 'game_not_found')
+
+    def test_recording_rounds_publishes_events(self):
+        """Rounds and the game result should be published after commit."""
+        with patch.object(get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    record_round(self.game.id, 'rock', 'scissors')
+
+        published = [c.args for c in publish.call_args_list]
+        channel = game_channel(self.game.id)
+        self.assertEqual([c for c, _ in published], [channel] * 4)
+        events = [event for _, event in published]
+        self.assertEqual([e['type'] for e in events], ['round', 'round', 'round', 'game_finished'])
+        self.assertEqual(events[0], {
+            'game': str(self.game.id),
+            'type': 'round',
+            'round': 1,
+            'choices': ['rock', 'scissors'],
+            'winner': 1,
+            'score': [1, 0]
+        })
+        self.assertEqual(events[3]['winner'], str(self.player1.id))
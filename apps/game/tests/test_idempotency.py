@@ -0,0 +1,179 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient, APITransactionTestCase
+
+from apps.game.api import async_views
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, IdempotencyKey, Player, Round
+
+
+class IdempotencyTestCase(GameAPITestCase):
+    """Test case for Idempotency-Key support on the write endpoints."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.alice = Player.objects.create(name="Alice")
+        self.bob = Player.objects.create(name="Bob")
+        self.game = Game.objects.create(player1=self.alice, player2=self.bob)
+        self.round_url = f"/api/game/{self.game.id}/rounds/new/"
+        self.round = {"player1_choice": "rock", "player2_choice": "scissors"}
+
+    def post(self, url, data, key):
+        return self.client.post(url, data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_new_game_is_replayed(self):
+        """A retried game creation should return the first game."""
+        data = {"player1_name": "Carol", "player2_name": "Dave"}
+        first = self.post("/api/game/new/", data, "key-1")
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.post("/api/game/new/", data, "key-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Game.objects.filter(player1__name="Carol").count(), 1)
+        touched = [q["sql"] for q in ctx.captured_queries if "game_game" in q["sql"] or "game_player" in q["sql"]]
+        self.assertEqual(touched, [])
+
+    def test_new_round_is_replayed(self):
+        """A retried round should not be played twice."""
+        first = self.post(self.round_url, self.round, "key-1")
+        second = self.post(self.round_url, self.round, "key-1")
+
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(Round.objects.filter(game=self.game).count(), 1)
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.rounds_played, 1)
+
+    def test_replay_is_served_from_cache(self):
+        """Committed responses should be replayed without database queries."""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.post(self.round_url, self.round, "key-1")
+        with self.assertNumQueries(0):
+            second = self.post(self.round_url, self.round, "key-1")
+            reused = self.post(self.round_url, {"player1_choice": "paper", "player2_choice": "rock"}, "key-1")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        """Requests without the header should behave as before."""
+        self.client.post(self.round_url, self.round, format="json")
+        self.client.post(self.round_url, self.round, format="json")
+        self.assertEqual(Round.objects.filter(game=self.game).count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_client_errors_are_replayed(self):
+        """Validation errors are final and should be replayed as well."""
+        data = {"player1_choice": "lizard", "player2_choice": "rock"}
+        first = self.post(self.round_url, data, "key-1")
+        second = self.post(self.round_url, data, "key-1")
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.content, first.content)
+
+    def test_key_reused_for_other_request(self):
+        """Reusing a key with a different payload should be rejected."""
+        self.post(self.round_url, self.round, "key-1")
+        response = self.post(self.round_url, {"player1_choice": "paper", "player2_choice": "rock"}, "key-1")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(response.json()["code"], "idempotency_key_reused")
+        self.assertEqual(Round.objects.filter(game=self.game).count(), 1)
+
+    def test_reformatted_retry_is_replayed(self):
+        """A retry whose JSON only differs in whitespace and key order should be replayed."""
+        first = self.post(self.round_url, self.round, "key-1")
+        second = self.client.post(
+            self.round_url,
+            '{ "player2_choice": "scissors",\n  "player1_choice": "rock" }',
+            content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY="key-1"
+        )
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(Round.objects.filter(game=self.game).count(), 1)
+
+    def test_invalid_key(self):
+        """Overlong keys should be rejected."""
+        response = self.post(self.round_url, self.round, "k" * 256)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["code"], "invalid_idempotency_key")
+
+    def test_failed_request_releases_key(self):
+        """A request that crashes should not record its key."""
+        with patch("apps.game.api.views.record_rounds", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post(self.round_url, self.round, "key-1")
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        response = self.post(self.round_url, self.round, "key-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    async def test_async_views_are_idempotent(self):
+        """The async write views should honour the key too."""
+        factory = AsyncRequestFactory()
+        view = async_views.NewRoundView.as_view()
+
+        def request():
+            return factory.post(
+                self.round_url,
+                json.dumps(self.round),
+                content_type="application/json",
+                headers={"Idempotency-Key": "key-1"}
+            )
+
+        first = await view(request(), game_id=str(self.game.id))
+        second = await view(request(), game_id=str(self.game.id))
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(await Round.objects.filter(game=self.game).acount(), 1)
+
+    def test_purge_expired_keys(self):
+        """The purge command should only delete keys older than the TTL."""
+        self.post(self.round_url, self.round, "old")
+        self.post(self.round_url, self.round, "new")
+        IdempotencyKey.objects.filter(key="old").update(created_at=self.game.created_at - timedelta(days=2))
+
+        out = StringIO()
+        call_command('purge_idempotency_keys', stdout=out)
+        self.assertIn("Deleted 1 expired idempotency keys.", out.getvalue())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ["new"])
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class IdempotencyConcurrencyTestCase(APITransactionTestCase):
+    """Concurrent duplicates of a request should run it only once."""
+
+    def post_round(self, url):
+        try:
+            data = {"player1_choice": "rock", "player2_choice": "scissors"}
+            response = APIClient().post(url, data, format="json", HTTP_IDEMPOTENCY_KEY="retry")
+            return response.status_code, response.content
+        finally:
+            connection.close()
+
+    def test_concurrent_duplicates(self):
+        game = Game.objects.create(
+            player1=Player.objects.create(name="Alice"),
+            player2=Player.objects.create(name="Bob")
+        )
+        url = f"/api/game/{game.id}/rounds/new/"
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(self.post_round, [url] * 10))
+
+        self.assertEqual({code for code, _ in results}, {status.HTTP_201_CREATED})
+        self.assertEqual(len({content for _, content in results}), 1)
+        self.assertEqual(Round.objects.filter(game=game).count(), 1)
@@ -0,0 +1,261 @@
+import json
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import ANY, patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.game.api.ingestion import BacklogFullError, RoundIngestor, start_ingestor
+from apps.game.api.services import GameFinishedError
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player, PlayerStats, Round
+
+
+class RoundIngestorTestCase(GameAPITestCase):
+    """Test case for the write-behind round ingestion."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.journal_path = Path(directory) / "rounds.ndjson"
+        self.ingestor = self.create_ingestor()
+        self.alice = Player.objects.create(name="Alice")
+        self.bob = Player.objects.create(name="Bob")
+        self.game = Game.objects.create(player1=self.alice, player2=self.bob)
+
+    def create_ingestor(self) -> RoundIngestor:
+        return RoundIngestor(self.journal_path, interval=60, max_pending=1000)
+
+    def test_rounds_are_written_on_flush(self):
+        """Rounds should be acknowledged at once and written by the flush."""
+        updated_at = self.game.updated_at
+        rounds = self.ingestor.submit(self.game.id, [("rock", "scissors"), ("rock", "rock")])
+        self.assertEqual([r.round_number for r in rounds], [1, 2])
+        self.assertEqual(rounds[0].round_winner, self.alice)
+        self.assertFalse(Round.objects.exists())
+
+        self.assertEqual(self.ingestor.flush(), 2)
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.rounds_played, self.game.player1_wins, self.game.player2_wins), (2, 1, 0))
+        self.assertGreater(self.game.updated_at, updated_at)
+        self.assertEqual(
+            list(Round.objects.order_by("round_number").values_list("id", flat=True)),
+            [r.id for r in rounds]
+        )
+        stats = PlayerStats.objects.get(player=self.alice)
+        self.assertEqual((stats.rounds_played, stats.rounds_won, stats.rounds_drawn), (2, 1, 1))
+        self.assertEqual(self.ingestor.flush(), 0)
+
+    def test_flush_batches_games(self):
+        """All the rounds of a flush should be inserted at once."""
+        other = Game.objects.create(player1=self.bob, player2=self.alice)
+        for _ in range(3):
+            self.ingestor.submit(self.game.id, [("rock", "rock")])
+            self.ingestor.submit(other.id, [("paper", "paper")])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.ingestor.flush(), 6)
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "game_round"')]
+        game_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "game_game"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(game_updates), 2)
+        self.assertEqual(Game.objects.get(id=other.id).rounds_played, 3)
+
+    def test_finished_game(self):
+        """The deciding round should finish the game and reject later rounds."""
+        rounds = self.ingestor.submit(self.game.id, [("paper", "rock")] * 4)
+        self.assertEqual(len(rounds), 3)
+        with self.assertRaises(GameFinishedError):
+            self.ingestor.submit(self.game.id, [("rock", "rock")])
+
+        with patch("apps.game.api.services.publish_game_event") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.ingestor.flush()
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.winner, self.alice)
+        self.assertIsNotNone(self.game.finished_at)
+        self.assertEqual(Player.objects.get(id=self.alice.id).score, 1)
+        events = [call.args[1] for call in publish.call_args_list]
+        self.assertEqual([event["type"] for event in events], ["round", "round", "round", "game_finished"])
+        self.assertEqual([event["round"] for event in events[:3]], [1, 2, 3])
+
+        with self.assertRaises(GameFinishedError):
+            self.ingestor.submit(self.game.id, [("rock", "rock")])
+
+    def test_unknown_game(self):
+        """Rounds of a missing game should be rejected."""
+        with self.assertRaises(Game.DoesNotExist):
+            self.ingestor.submit("00000000-0000-0000-0000-000000000000", [("rock", "rock")])
+        with self.assertRaises(Game.DoesNotExist):
+            self.ingestor.submit("not-a-game", [("rock", "rock")])
+
+    def test_journal_is_removed_after_flush(self):
+        """Acknowledged rounds should be journaled until they are written."""
+        self.ingestor.submit(self.game.id, [("rock", "rock")])
+        self.assertEqual(len(self.journal_path.read_text().splitlines()), 1)
+
+        self.ingestor.flush()
+        self.assertFalse(self.journal_path.exists())
+        self.assertFalse(self.ingestor.segment_path.exists())
+
+    def test_replay_after_crash(self):
+        """A new ingestor should write the rounds a crashed one acknowledged."""
+        rounds = self.ingestor.submit(self.game.id, [("rock", "scissors")])
+        rounds += self.ingestor.submit(self.game.id, [("rock", "paper")])
+        with self.journal_path.open("a") as journal:
+            journal.write('{"game": "')
+
+        self.assertEqual(self.create_ingestor().replay(), 2)
+        self.assertEqual(set(Round.objects.values_list("id", flat=True)), {r.id for r in rounds})
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.rounds_played, self.game.player1_wins, self.game.player2_wins), (2, 1, 1))
+        self.assertFalse(self.journal_path.exists())
+
+    def test_replay_skips_written_rounds(self):
+        """Replaying a segment whose flush committed should not duplicate rounds."""
+        self.ingestor.submit(self.game.id, [("rock", "scissors")])
+        journal = self.journal_path.read_text()
+        self.ingestor.flush()
+        self.ingestor.segment_path.write_text(journal)
+
+        self.assertEqual(self.create_ingestor().replay(), 0)
+        self.assertEqual(Round.objects.count(), 1)
+        self.assertFalse(self.ingestor.segment_path.exists())
+
+    def test_concurrent_submissions_share_a_sync(self):
+        """Rounds submitted while the journal is being synced should share the next sync."""
+        self.ingestor.submit(self.game.id, [("rock", "rock")])
+        with patch("apps.game.api.ingestion.os.fsync", side_effect=lambda fd: time.sleep(0.05)) as fsync:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: self.ingestor.submit(self.game.id, [("rock", "rock")]), range(8)))
+
+        self.assertLess(fsync.call_count, 8)
+        self.assertEqual(len(self.journal_path.read_text().splitlines()), 9)
+        self.assertEqual(self.ingestor.flush(), 9)
+
+    def test_failed_flush_is_retried(self):
+        """A batch that could not be written should be kept and retried."""
+        self.ingestor.submit(self.game.id, [("rock", "rock")])
+        with patch("apps.game.api.ingestion.Round.objects.bulk_create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.ingestor.flush()
+        self.ingestor.submit(self.game.id, [("rock", "rock")])
+
+        self.assertEqual(self.ingestor.flush(), 1)
+        self.assertEqual(self.ingestor.flush(), 1)
+        self.assertEqual(sorted(Round.objects.values_list("round_number", flat=True)), [1, 2])
+
+    def test_backlog_is_capped(self):
+        """Rounds should be refused while too many are waiting to be written."""
+        ingestor = RoundIngestor(self.journal_path, interval=60, max_pending=1000, max_backlog=2)
+        ingestor.submit(self.game.id, [("rock", "rock"), ("rock", "rock")])
+        with patch("apps.game.api.ingestion.Round.objects.bulk_create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                ingestor.flush()
+        with self.assertRaises(BacklogFullError):
+            ingestor.submit(self.game.id, [("rock", "rock")])
+
+        self.assertEqual(ingestor.flush(), 2)
+        self.assertEqual(ingestor.submit(self.game.id, [("rock", "rock")])[0].round_number, 3)
+
+    def test_failing_batch_is_set_aside(self):
+        """A batch that keeps failing should be moved to the failed journal."""
+        ingestor = RoundIngestor(self.journal_path, interval=60, max_pending=1000, max_attempts=2)
+        other = Game.objects.create(player1=self.bob, player2=self.alice)
+        ingestor.submit(self.game.id, [("rock", "scissors")])
+        with patch("apps.game.api.ingestion.Round.objects.bulk_create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                ingestor.flush()
+            ingestor.submit(self.game.id, [("rock", "paper")])
+            ingestor.submit(other.id, [("rock", "rock")])
+            with self.assertRaises(RuntimeError), self.assertLogs("apps.game.api.ingestion", "ERROR"):
+                ingestor.flush()
+
+        failed = [json.loads(line) for line in ingestor.failed_path.read_text().splitlines()]
+        self.assertEqual(failed, [
+            {"game": str(self.game.id), "rounds": [[ANY, 1, "rock", "scissors"], [ANY, 2, "rock", "paper"]]}
+        ])
+        self.assertFalse(ingestor.segment_path.exists())
+        self.assertEqual(ingestor.flush(), 1)
+        self.assertEqual(ingestor.submit(self.game.id, [("rock", "rock")])[0].round_number, 1)
+
+    def test_replay_after_set_aside(self):
+        """A crash after a set-aside should only replay the rounds acknowledged since."""
+        ingestor = RoundIngestor(self.journal_path, interval=60, max_pending=1000, max_attempts=2)
+        ingestor.submit(self.game.id, [("rock", "scissors")])
+        with patch("apps.game.api.ingestion.Round.objects.bulk_create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                ingestor.flush()
+            ingestor.submit(self.game.id, [("rock", "paper")])
+            with self.assertRaises(RuntimeError), self.assertLogs("apps.game.api.ingestion", "ERROR"):
+                ingestor.flush()
+        rounds = ingestor.submit(self.game.id, [("paper", "rock")])
+
+        self.assertEqual(self.create_ingestor().replay(), 1)
+        self.assertEqual(
+            list(Round.objects.values_list("id", "round_number", "player1_choice")), [(rounds[0].id, 1, "paper")]
+        )
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.rounds_played, self.game.player1_wins), (1, 1))
+
+    def test_start_ingestor(self):
+        """The ingestor should only be started when write-behind is enabled."""
+        with patch("apps.game.api.ingestion.get_ingestor") as get_ingestor:
+            start_ingestor()
+            get_ingestor.assert_not_called()
+            with self.settings(GAME_ROUND_WRITE_BEHIND=True):
+                start_ingestor()
+            get_ingestor.assert_called_once_with()
+
+    def test_journal_has_a_single_writer(self):
+        """A second process should not be able to take the same journal."""
+        self.ingestor.lock()
+        self.addCleanup(self.ingestor.stop)
+        other = self.create_ingestor()
+        with self.assertRaises(ImproperlyConfigured):
+            other.lock()
+
+        self.ingestor.stop()
+        other.lock()
+        other.stop()
+
+    @override_settings(GAME_ROUND_WRITE_BEHIND=True)
+    def test_new_round_view(self):
+        """The round endpoint should acknowledge rounds through the ingestor."""
+        url = f"/api/game/{self.game.id}/rounds/new/"
+        with patch("apps.game.api.ingestion.get_ingestor", return_value=self.ingestor):
+            response = self.client.post(url, {"player1_choice": "rock", "player2_choice": "scissors"}, format="json")
+            finished = self.client.post(url, {"rounds": [{"player1_choice": "rock", "player2_choice": "scissors"}] * 3}, format="json")
+            rejected = self.client.post(url, {"player1_choice": "rock", "player2_choice": "rock"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["round_number"], 1)
+        self.assertEqual(response.json()["round_winner"]["id"], str(self.alice.id))
+        self.assertEqual(finished.json()["ignored"], 1)
+        self.assertEqual(rejected.json()["code"], "game_finished")
+        self.assertFalse(Round.objects.exists())
+
+        self.ingestor.flush()
+        self.assertEqual(Round.objects.count(), 3)
+
+    @override_settings(GAME_ROUND_WRITE_BEHIND=True)
+    def test_new_round_view_backlog_full(self):
+        """The round endpoint should answer 503 while the backlog is full."""
+        ingestor = RoundIngestor(self.journal_path, interval=60, max_pending=1000, max_backlog=0)
+        with patch("apps.game.api.ingestion.get_ingestor", return_value=ingestor):
+            response = self.client.post(
+                f"/api/game/{self.game.id}/rounds/new/",
+                {"player1_choice": "rock", "player2_choice": "rock"},
+                format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()["code"], "rounds_backlog_full")
@@ -0,0 +1,274 @@
+import asyncio
+import time
+from time import monotonic
+from unittest.mock import patch
+
+from django.test import override_settings
+from rest_framework import status
+
+from apps.game.api.matchmaking import (
+    MATCH_IDLE_TTL,
+    MATCH_TTL,
+    CacheMatchmaker,
+    LocalMatchmaker,
+    get_matchmaker
+)
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player
+
+
+class LocalMatchmakerTestCase(GameAPITestCase):
+    """Test case for the in-process matchmaker."""
+    matchmaker_class = LocalMatchmaker
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.matchmaker = self.create_matchmaker()
+
+    def create_matchmaker(self):
+        return self.matchmaker_class(bracket_size=10, widen_after=5, interval=0)
+
+    def player(self, name: str, score: int) -> Player:
+        return Player.objects.create(name=name, score=score)
+
+    def test_same_bracket_is_paired_at_once(self):
+        """A player should be paired with the player waiting in their bracket."""
+        alice = self.matchmaker.enqueue(self.player("Alice", 12), now=0)
+        self.assertFalse(alice.result.done())
+
+        bob = self.matchmaker.enqueue(self.player("Bob", 19), now=1)
+        game = bob.result.result(0)
+        self.assertEqual(alice.result.result(0), game)
+        self.assertEqual((game.player1.name, game.player2.name), ("Alice", "Bob"))
+        self.assertTrue(Game.objects.filter(id=game.id).exists())
+        self.assertEqual(self.matchmaker.waiting_count(), 0)
+
+    def test_search_widens_while_waiting(self):
+        """Players of neighbouring brackets should be paired once in reach."""
+        alice = self.matchmaker.enqueue(self.player("Alice", 0), now=0)
+        bob = self.matchmaker.enqueue(self.player("Bob", 25), now=0)
+
+        self.assertEqual(self.matchmaker.match_waiting(now=9), 0)
+        self.assertEqual(self.matchmaker.waiting_count(), 2)
+
+        self.assertEqual(self.matchmaker.match_waiting(now=10), 1)
+        self.assertEqual(alice.result.result(0), bob.result.result(0))
+
+    def test_new_player_joins_nearest_waiting_player_in_reach(self):
+        """An enqueue should pick the closest opponent that accepts it."""
+        far = self.matchmaker.enqueue(self.player("Far", 0), now=0)
+        near = self.matchmaker.enqueue(self.player("Near", 40), now=0)
+        new = self.matchmaker.enqueue(self.player("New", 30), now=20)
+
+        self.assertEqual(new.result.result(0), near.result.result(0))
+        self.assertFalse(far.result.done())
+
+    def test_search_is_capped(self):
+        """Players too far apart should never be paired."""
+        self.matchmaker.enqueue(self.player("Alice", 0), now=0)
+        self.matchmaker.enqueue(self.player("Bob", 1000), now=0)
+        self.assertEqual(self.matchmaker.match_waiting(now=10000), 0)
+
+    def test_enqueue_twice_keeps_ticket(self):
+        """A waiting player enqueueing again should keep their place."""
+        alice = self.player("Alice", 0)
+        ticket = self.matchmaker.enqueue(alice, now=0)
+        self.assertIs(self.matchmaker.enqueue(alice, now=3), ticket)
+        self.assertEqual(self.matchmaker.waiting_count(), 1)
+
+    def test_cancel(self):
+        """A cancelled player should leave the queue."""
+        alice = self.player("Alice", 0)
+        ticket = self.matchmaker.enqueue(alice, now=0)
+
+        self.assertTrue(self.matchmaker.cancel(alice.id))
+        self.assertTrue(ticket.result.cancelled())
+        self.assertIsNone(self.matchmaker.get_ticket(alice.id))
+        self.assertFalse(self.matchmaker.cancel(alice.id))
+
+        bob = self.matchmaker.enqueue(self.player("Bob", 0), now=1)
+        self.assertFalse(bob.result.done())
+
+    def test_matched_tickets_expire(self):
+        """Matched tickets should be kept for late polls, then forgotten."""
+        alice = self.player("Alice", 0)
+        self.matchmaker.enqueue(alice)
+        self.matchmaker.enqueue(self.player("Bob", 0))
+
+        self.matchmaker.match_waiting(now=monotonic() + MATCH_TTL / 2)
+        self.assertTrue(self.matchmaker.get_ticket(alice.id).matched)
+        self.matchmaker.match_waiting(now=monotonic() + MATCH_TTL + 1)
+        self.assertIsNone(self.matchmaker.get_ticket(alice.id))
+
+    def test_idle_players_leave_the_queue(self):
+        """Players who stopped polling should be dropped, not matched."""
+        alice = self.player("Alice", 0)
+        bob = self.player("Bob", 40)
+        idle = self.matchmaker.enqueue(alice, now=0)
+        polling = self.matchmaker.enqueue(bob, now=0)
+        self.matchmaker.get_ticket(bob.id, now=MATCH_IDLE_TTL)
+
+        self.assertEqual(self.matchmaker.match_waiting(now=MATCH_IDLE_TTL + 1), 0)
+        self.assertTrue(idle.result.cancelled())
+        self.assertIsNone(self.matchmaker.get_ticket(alice.id))
+        self.assertFalse(polling.result.done())
+        self.assertEqual(self.matchmaker.waiting_count(), 1)
+
+    def test_idle_players_are_not_picked(self):
+        """A new player should not be paired with an idle player."""
+        idle = self.matchmaker.enqueue(self.player("Alice", 0), now=0)
+        new = self.matchmaker.enqueue(self.player("Bob", 0), now=MATCH_IDLE_TTL + 1)
+
+        self.assertTrue(idle.result.cancelled())
+        self.assertFalse(new.result.done())
+        self.assertIs(self.matchmaker.get_ticket(new.player.id), new)
+        self.assertEqual(self.matchmaker.waiting_count(), 1)
+
+    def test_failed_game_creation_fails_both_tickets(self):
+        """Both players should see the error and leave the queue."""
+        alice = self.matchmaker.enqueue(self.player("Alice", 0), now=0)
+        with patch("apps.game.api.matchmaking.Game.objects.create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.matchmaker.enqueue(self.player("Bob", 0), now=0)
+        self.assertIsInstance(alice.result.exception(), RuntimeError)
+        self.assertIsNone(self.matchmaker.get_ticket(alice.player.id))
+
+    def test_many_players(self):
+        """Every player should be paired exactly once."""
+        players = Player.objects.bulk_create([Player(name=f"Player {i}", score=i // 2 * 10) for i in range(400)])
+        tickets = [self.matchmaker.enqueue(player, now=0) for player in players]
+
+        games = {ticket.result.result(0).id for ticket in tickets}
+        self.assertEqual(len(games), 200)
+        self.assertEqual(self.matchmaker.waiting_count(), 0)
+
+
+class CacheMatchmakerTestCase(LocalMatchmakerTestCase):
+    """Test case for the matchmaker shared by the workers through a cache."""
+    matchmaker_class = CacheMatchmaker
+
+    def test_matched_tickets_expire(self):
+        """Matched tickets should be seen by every worker, then forgotten."""
+        alice = self.player("Alice", 0)
+        self.matchmaker.enqueue(alice)
+        with patch("apps.game.api.matchmaking.MATCH_TTL", 0.1):
+            game = self.matchmaker.enqueue(self.player("Bob", 0)).result.result(0)
+
+        ticket = self.create_matchmaker().get_ticket(alice.id)
+        self.assertEqual(ticket.result.result(0), game)
+        time.sleep(0.2)
+        self.assertIsNone(self.create_matchmaker().get_ticket(alice.id))
+
+    def test_workers_share_the_queue(self):
+        """Players queued on different workers should be paired."""
+        other = self.create_matchmaker()
+        alice = self.player("Alice", 0)
+        self.matchmaker.enqueue(alice, now=0)
+        self.assertEqual(other.waiting_count(), 1)
+
+        bob = other.enqueue(self.player("Bob", 0), now=1)
+        self.assertEqual(self.matchmaker.get_ticket(alice.id, now=1).result.result(0), bob.result.result(0))
+        self.assertEqual(self.matchmaker.waiting_count(), 0)
+
+    def test_schedule_resolves_tickets_matched_elsewhere(self):
+        """A ticket polled here should resolve when another worker pairs it."""
+        other = self.create_matchmaker()
+        alice = self.matchmaker.enqueue(self.player("Alice", 0))
+        bob = self.matchmaker.enqueue(self.player("Bob", 1000))
+        other.enqueue(self.player("Carol", 0))
+
+        self.matchmaker.schedule()
+        self.assertEqual(alice.result.result(0).player2.name, "Carol")
+        self.assertFalse(bob.result.done())
+
+        other.cancel(bob.player.id)
+        self.matchmaker.schedule()
+        self.assertTrue(bob.result.cancelled())
+
+
+class MatchmakingViewTestCase(GameAPITestCase):
+    """Test case for the matchmaking endpoints."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        get_matchmaker.cache_clear()
+        self.addCleanup(get_matchmaker.cache_clear)
+
+    def join(self, name: str):
+        return self.client.post("/api/game/matchmaking/", {"player_name": name}, format="json")
+
+    def test_join_and_match(self):
+        """The second player of a bracket should get the game at once."""
+        first = self.join("Alice")
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(first.json()["status"], "waiting")
+
+        second = self.join("Bob")
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        game = second.json()["game"]
+        self.assertEqual(second.json()["status"], "matched")
+        self.assertEqual(game["player1"], first.json()["player"])
+        self.assertEqual(game["player2"], second.json()["player"])
+
+        response = self.client.get(f"/api/game/matchmaking/{first.json()['player']}/", {"timeout": 0})
+        self.assertEqual(response.json(), second.json() | {"player": first.json()["player"]})
+
+    def test_join_requires_player_name(self):
+        """A join request without a name should be rejected."""
+        response = self.client.post("/api/game/matchmaking/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_poll_waits_for_opponent(self):
+        """A long-poll should return as soon as the player is matched."""
+        first = await self.async_client.post(
+            "/api/game/matchmaking/", {"player_name": "Alice"}, content_type="application/json"
+        )
+        player_id = first.json()["player"]
+
+        poll = asyncio.create_task(self.async_client.get(f"/api/game/matchmaking/{player_id}/", {"timeout": 5}))
+        await asyncio.sleep(0.1)
+        self.assertFalse(poll.done())
+        await self.async_client.post(
+            "/api/game/matchmaking/", {"player_name": "Bob"}, content_type="application/json"
+        )
+        response = await asyncio.wait_for(poll, 5)
+        self.assertEqual(response.json()["status"], "matched")
+
+    def test_poll_runs_scheduler(self):
+        """Polls should pair waiting players once their search has widened."""
+        alice = Player.objects.create(name="Alice", score=20)
+        Player.objects.create(name="Bob", score=0)
+        self.join("Alice")
+        self.join("Bob")
+
+        response = self.client.get(f"/api/game/matchmaking/{alice.id}/", {"timeout": 0})
+        self.assertEqual(response.json(), {"status": "waiting", "player": str(alice.id)})
+
+        matchmaker = get_matchmaker()
+        with matchmaker._queue():
+            matchmaker._tickets[alice.id].enqueued_at -= 3600
+            matchmaker._last_run = float('-inf')
+        response = self.client.get(f"/api/game/matchmaking/{alice.id}/", {"timeout": 0})
+        self.assertEqual(response.json()["status"], "matched")
+
+    def test_poll_unknown_player(self):
+        """Polling a player who is not queued should return 404."""
+        response = self.client.get("/api/game/matchmaking/00000000-0000-0000-0000-000000000000/", {"timeout": 0})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json()["code"], "player_not_queued")
+
+    def test_cancel(self):
+        """A waiting player should be able to leave the queue."""
+        player_id = self.join("Alice").json()["player"]
+        url = f"/api/game/matchmaking/{player_id}/"
+
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url, {"timeout": 0}).status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(GAME_MATCHMAKING_BACKEND="apps.game.api.matchmaking.CacheMatchmaker")
+class CacheMatchmakingViewTestCase(MatchmakingViewTestCase):
+    """Test case for the matchmaking endpoints with the shared queue."""
@@ -0,0 +1,118 @@
+import re
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.game.api.metrics import HISTOGRAMS, Histogram, timer
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player
+
+
+def server_timing(response) -> dict[str, dict[str, str]]:
+    """Parse a ``Server-Timing`` header into its metrics and parameters."""
+    metrics = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+class RequestMetricsTestCase(GameAPITestCase):
+    """Test case for the request metrics middleware."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        for histogram in HISTOGRAMS:
+            histogram.clear()
+        self.game = Game.objects.create(
+            player1=Player.objects.create(name="Alice"),
+            player2=Player.objects.create(name="Bob")
+        )
+        self.url = f"/api/game/{self.game.id}/"
+
+    def test_server_timing_header(self):
+        """Game views should report their queries and timings."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        timing = server_timing(response)
+        self.assertEqual(set(timing), {'db', 'serialize', 'render', 'total'})
+        self.assertEqual(timing['db']['desc'], f'"{len(context.captured_queries)} queries"')
+        self.assertGreater(float(timing['serialize']['dur']), 0)
+        self.assertGreater(float(timing['render']['dur']), 0)
+        self.assertGreaterEqual(
+            float(timing['total']['dur']),
+            sum(float(timing[name]['dur']) for name in ('db', 'serialize', 'render'))
+        )
+
+    def test_other_views_are_not_measured(self):
+        """Views outside of the game app should be left alone."""
+        response = self.client.get("/api/schema/")
+        self.assertNotIn('Server-Timing', response)
+
+    async def test_async_requests_count_thread_queries(self):
+        """Queries run in worker threads should count for their request."""
+        response = await self.async_client.get(self.url)
+        self.assertNotEqual(server_timing(response)['db']['desc'], '"0 queries"')
+
+    def test_metrics_endpoint(self):
+        """The metrics endpoint should expose per-view histograms."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.get("/api/game/")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('game_request_duration_seconds_count{view="game_detail",method="GET"} 2', body)
+        self.assertIn('game_request_duration_seconds_count{view="game_list",method="GET"} 1', body)
+        self.assertIn('game_request_queries_bucket{view="game_list",method="GET",le="+Inf"} 1', body)
+        self.assertIn('game_cache_hits_total{cache="game_payloads"} 1', body)
+        self.assertRegex(body, r'game_response_bytes_sum\{view="game_detail",method="GET"\} \d+')
+
+    @override_settings(GAME_API_METRICS=False)
+    def test_disabled(self):
+        """Disabling the metrics should remove the header and the endpoint."""
+        response = self.client.get(self.url)
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(GAME_METRICS_ALLOWED_IPS=['10.0.0.0/8'], GAME_METRICS_TOKEN='')
+    def test_metrics_restricted_to_allowed_ips(self):
+        """Only the allowed networks should be able to scrape the metrics."""
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/metrics", REMOTE_ADDR="10.1.2.3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(GAME_METRICS_ALLOWED_IPS=[], GAME_METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """The bearer token should grant access from any address."""
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Rendered buckets should count every value up to their bound."""
+        histogram = Histogram('test_values', 'Test values.', (1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(('a',), value)
+
+        lines = histogram.render(('label',))
+        self.assertEqual(lines[2:], [
+            'test_values_bucket{label="a",le="1"} 2',
+            'test_values_bucket{label="a",le="5"} 3',
+            'test_values_bucket{label="a",le="+Inf"} 4',
+            'test_values_sum{label="a"} 14.5',
+            'test_values_count{label="a"} 4',
+        ])
+
+    def test_timer_outside_of_requests(self):
+        """Timers should be no-ops outside of a measured request."""
+        with timer('serialize'):
+            pass
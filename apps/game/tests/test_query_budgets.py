@@ -0,0 +1,238 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework import status
+
+from apps.game.api import async_views
+from apps.game.api.ingestion import RoundIngestor
+from apps.game.api.matchmaking import get_matchmaker
+from apps.game.api.services import record_rounds
+from apps.game.tests.base import GameAPITestCase, query_budget
+from apps.game.models import Game, Player
+
+
+# Rounds that alternate winners and draws, so a game never finishes.
+OPEN_MOVES = [('rock', 'scissors'), ('scissors', 'rock'), ('rock', 'rock')]
+
+ROUND = {"player1_choice": "rock", "player2_choice": "rock"}
+
+
+class QueryBudgetTestCase(GameAPITestCase):
+    """Every endpoint runs a fixed number of queries, whatever the data size."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.alice = Player.objects.create(name="Alice")
+        self.bob = Player.objects.create(name="Bob")
+        self.factory = AsyncRequestFactory()
+
+    def create_game(self, rounds: int = 0, finished: bool = False) -> Game:
+        """Create a game between Alice and Bob with ``rounds`` recorded rounds."""
+        game = Game.objects.create(player1=self.alice, player2=self.bob)
+        moves = [OPEN_MOVES[i % len(OPEN_MOVES)] for i in range(rounds)]
+        if finished:
+            moves += [('paper', 'rock')] * 3
+        if moves:
+            record_rounds(game.id, moves)
+        return game
+
+    def create_games(self, count: int, rounds: int = 3) -> list[Game]:
+        return [self.create_game(rounds, finished=i % 2 == 0) for i in range(count)]
+
+    @query_budget(6)
+    def test_new_game(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.post(
+                "/api/game/new/", {"player1_name": f"Carol {size}", "player2_name": "Bob"}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @query_budget(5, sizes=(1, 50))
+    def test_bulk_new_game(self, size):
+        games = [{"player1_name": f"Carol {size} {i}", "player2_name": "Bob"} for i in range(size)]
+        with self.assertQueryBudget():
+            response = self.client.post("/api/game/bulk/", {"games": games}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @query_budget(3)
+    def test_game_detail(self, size):
+        game = self.create_game(size)
+        with self.assertQueryBudget():
+            response = self.client.get(f"/api/game/{game.id}/")
+        self.assertEqual(len(response.json()["rounds"]), size)
+
+    @query_budget(3)
+    def test_game_detail_compact(self, size):
+        game = self.create_game(size)
+        with self.assertQueryBudget():
+            response = self.client.get(f"/api/game/{game.id}/", {"fields": "id,player1,rounds", "expand": ""})
+        self.assertEqual(len(response.json()["rounds"]), size)
+
+    @override_settings(GAME_API_FAST_RENDER=True)
+    @query_budget(3)
+    def test_game_detail_fast_render(self, size):
+        game = self.create_game(size)
+        with self.assertQueryBudget():
+            response = self.client.get(f"/api/game/{game.id}/")
+        self.assertEqual(len(response.json()["rounds"]), size)
+
+    @query_budget(1)
+    def test_game_detail_cached(self, size):
+        game = self.create_game(size)
+        self.client.get(f"/api/game/{game.id}/")
+        with self.assertQueryBudget():
+            response = self.client.get(f"/api/game/{game.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(1)
+    def test_game_events_finished(self, size):
+        game = self.create_game(size, finished=True)
+        with self.assertQueryBudget():
+            response = self.client.get(f"/api/game/{game.id}/events/")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @query_budget(2, sizes=(1, 20))
+    def test_export_games(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get("/api/game/export/", {"resource": "games"})
+            lines = b"".join(response.streaming_content).splitlines()
+        self.assertGreaterEqual(len(lines), size)
+
+    @query_budget(2, sizes=(1, 20))
+    def test_export_rounds(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get("/api/game/export/", {"resource": "rounds"})
+            lines = b"".join(response.streaming_content).splitlines()
+        self.assertGreaterEqual(len(lines), size)
+
+    @query_budget(3)
+    def test_new_round(self, size):
+        game = self.create_game(size)
+        with self.assertQueryBudget():
+            response = self.client.post(f"/api/game/{game.id}/rounds/new/", ROUND, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(GAME_ROUND_WRITE_BEHIND=True)
+    @query_budget(1)
+    def test_new_round_write_behind(self, size):
+        game = self.create_game(size)
+        with tempfile.TemporaryDirectory() as directory:
+            ingestor = RoundIngestor(Path(directory) / "rounds.ndjson", interval=60, max_pending=1000)
+            with patch("apps.game.api.ingestion.get_ingestor", return_value=ingestor), self.assertQueryBudget():
+                response = self.client.post(f"/api/game/{game.id}/rounds/new/", ROUND, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @query_budget(5)
+    def test_new_round_batch(self, size):
+        game = self.create_game(3)
+        rounds = [ROUND] * size
+        with self.assertQueryBudget():
+            response = self.client.post(f"/api/game/{game.id}/rounds/new/", {"rounds": rounds}, format="json")
+        self.assertEqual(len(response.json()["rounds"]), size)
+
+    @query_budget(2, sizes=(1, 20))
+    def test_game_list(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get("/api/game/", {"page_size": 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(1, sizes=(1, 20))
+    def test_game_list_compact(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get("/api/game/", {"page_size": 50, "fields": "id,winner", "expand": ""})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(GAME_API_FAST_RENDER=True)
+    @query_budget(2, sizes=(1, 20))
+    def test_game_list_fast_render(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get("/api/game/", {"page_size": 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(3, sizes=(1, 20))
+    def test_player_games(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get(f"/api/game/players/{self.alice.id}/games/", {"page_size": 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(1, sizes=(1, 20))
+    def test_player_stats(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get(f"/api/game/players/{self.alice.id}/stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(4, sizes=(1, 50))
+    def test_leaderboard(self, size):
+        Player.objects.bulk_create([Player(name=f"Player {size} {i}", score=i) for i in range(size)])
+        with self.assertQueryBudget():
+            response = self.client.get("/api/game/leaderboard/", {"limit": 100, "player_id": self.alice.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(2)
+    def test_matchmaking(self, size):
+        get_matchmaker.cache_clear()
+        self.addCleanup(get_matchmaker.cache_clear)
+        Player.objects.bulk_create([Player(name=f"Player {size} {i}", score=(i + 1) * 100) for i in range(size)])
+        for player in Player.objects.filter(name__startswith=f"Player {size} "):
+            get_matchmaker().enqueue(player)
+        get_matchmaker().enqueue(self.alice)
+        with self.assertQueryBudget():
+            response = self.client.post("/api/game/matchmaking/", {"player_name": "Bob"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @query_budget(0)
+    def test_metrics(self, size):
+        self.create_games(size)
+        with self.assertQueryBudget():
+            response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(2, sizes=(1, 20))
+    def test_async_game_list(self, size):
+        self.create_games(size)
+        view = async_to_sync(async_views.GameListView.as_view())
+        with self.assertQueryBudget():
+            response = view(self.factory.get("/api/game/", {"page_size": 50}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(3)
+    def test_async_game_detail(self, size):
+        game = self.create_game(size)
+        view = async_to_sync(async_views.GameDetailView.as_view())
+        with self.assertQueryBudget():
+            response = view(self.factory.get(f"/api/game/{game.id}/"), game_id=str(game.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @query_budget(7)
+    def test_async_new_game(self, size):
+        self.create_games(size)
+        view = async_to_sync(async_views.NewGameView.as_view())
+        request = self.factory.post(
+            "/api/game/new/",
+            {"player1_name": f"Carol {size}", "player2_name": "Bob"},
+            content_type="application/json"
+        )
+        with self.assertQueryBudget():
+            response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @query_budget(5)
+    def test_async_new_round(self, size):
+        game = self.create_game(size)
+        view = async_to_sync(async_views.NewRoundView.as_view())
+        request = self.factory.post(f"/api/game/{game.id}/rounds/new/", ROUND, content_type="application/json")
+        with self.assertQueryBudget():
+            response = view(request, game_id=str(game.id))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -0,0 +1,77 @@
+from django.db import connection
+
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player, Round
+
+
+class QueryPlanTestCase(GameAPITestCase):
+    """Check that the queries of every endpoint are served by indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seed enough rows for the planner to prefer indexes."""
+        players = Player.objects.bulk_create(
+            [Player(name=f"Player {i}", score=i % 7) for i in range(50)]
+        )
+        games = Game.objects.bulk_create([
+            Game(player1=players[i % 50], player2=players[(i + 1) % 50], rounds_played=3)
+            for i in range(300)
+        ])
+        Round.objects.bulk_create([
+            Round(
+                game=game,
+                round_number=number,
+                player1_choice='rock',
+                player2_choice='scissors',
+                round_winner=game.player1
+            )
+            for game in games
+            for number in range(1, 4)
+        ])
+        cls.game = games[0]
+        cls.player = players[0]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_game_list_paginated(self):
+        with self.assertNoSequentialScans():
+            response = self.client.get("/api/game/", {"page_size": 20})
+        with self.assertNoSequentialScans():
+            self.client.get(response.data["next"])
+
+    def test_game_detail(self):
+        with self.assertNoSequentialScans():
+            self.client.get(f"/api/game/{self.game.id}/")
+
+    def test_new_game(self):
+        data = {"player1_name": "Player 1", "player2_name": "Newcomer"}
+        with self.assertNoSequentialScans():
+            self.client.post("/api/game/new/", data, format="json")
+
+    def test_bulk_new_game(self):
+        data = {"games": [{"player1_name": "Player 1", "player2_name": "Newcomer"}]}
+        with self.assertNoSequentialScans():
+            self.client.post("/api/game/bulk/", data, format="json")
+
+    def test_new_round(self):
+        game = Game.objects.create(player1=self.player, player2=Player.objects.get(name="Player 1"))
+        data = {"player1_choice": "rock", "player2_choice": "rock"}
+        with self.assertNoSequentialScans():
+            self.client.post(f"/api/game/{game.id}/rounds/new/", data, format="json")
+
+    def test_leaderboard(self):
+        with self.assertNoSequentialScans():
+            self.client.get("/api/game/leaderboard/", {"player_id": str(self.player.id)})
+
+    def test_player_games(self):
+        url = f"/api/game/players/{self.player.id}/games/"
+        with self.assertNoSequentialScans():
+            response = self.client.get(url, {"page_size": 5})
+        with self.assertNoSequentialScans():
+            self.client.get(response.data["next"])
+
+    def test_export(self):
+        for params in ({}, {"resource": "rounds", "updated_since": "2020-01-01T00:00:00Z"}):
+            with self.assertNoSequentialScans():
+                response = self.client.get("/api/game/export/", params)
+                b"".join(response.streaming_content)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.game.api import rendering
+from apps.game.api.cache import GAME_PAYLOADS_CACHE
+from apps.game.api.serializers import GameSerializer
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player, Round
+
+
+class RenderingTestCase(GameAPITestCase):
+    """The fast read path must render exactly what GameSerializer renders."""
+
+    def setUp(self):
+        """Set up games covering every shape of the payload."""
+        super().setUp()
+        self.alice = Player.objects.create(name="Alice", score=3)
+        self.bob = Player.objects.create(name="Böb \u2028\u2029 \"q\" \\ \n \U0001f600", score=-1)
+        self.finished = Game.objects.create(player1=self.alice, player2=self.bob)
+        for number, (choice2, winner) in enumerate(
+            [("scissors", self.alice), ("rock", None), ("scissors", self.alice), ("scissors", self.alice)],
+            start=1
+        ):
+            Round.objects.create(
+                game=self.finished,
+                round_number=number,
+                player1_choice="rock",
+                player2_choice=choice2,
+                round_winner=winner
+            )
+        Game.objects.filter(id=self.finished.id).update(
+            winner=self.alice,
+            rounds_played=4,
+            finished_at=timezone.now() + timedelta(microseconds=1)
+        )
+        self.active = Game.objects.create(player1=self.bob, player2=self.alice)
+        self.empty = Game.objects.create(player1=self.alice, player2=self.bob)
+
+    def serializer_payload(self, queryset):
+        return JSONRenderer().render(GameSerializer(queryset.with_details(), many=True).data)
+
+    def test_render_games_matches_serializer(self):
+        games = Game.objects.order_by('-created_at')
+        self.assertEqual(rendering.render_games(games), self.serializer_payload(games))
+
+    def test_render_games_matches_serializer_without_orjson(self):
+        games = Game.objects.order_by('-created_at')
+        with patch.object(rendering, 'orjson', None):
+            self.assertEqual(rendering.render_games(games), self.serializer_payload(games))
+
+    @override_settings(TIME_ZONE='America/Santiago')
+    def test_render_games_matches_serializer_in_other_time_zone(self):
+        games = Game.objects.order_by('-created_at')
+        self.assertEqual(rendering.render_games(games), self.serializer_payload(games))
+
+    def test_render_game_matches_serializer(self):
+        row, content = rendering.render_game(self.finished.id)
+        self.assertEqual(row.rounds_played, 4)
+        self.assertEqual(
+            content,
+            JSONRenderer().render(GameSerializer(Game.objects.with_details().get(id=self.finished.id)).data)
+        )
+
+    def test_render_games_query_count(self):
+        with self.assertNumQueries(2):
+            rendering.render_games(Game.objects.all())
+
+    def test_views_match_serializer_path(self):
+        urls = [
+            "/api/game/",
+            "/api/game/?page_size=2",
+            f"/api/game/{self.finished.id}/",
+            f"/api/game/{self.active.id}/",
+        ]
+        for url in urls:
+            expected = self.client.get(url)
+            caches[GAME_PAYLOADS_CACHE].clear()
+            with override_settings(GAME_API_FAST_RENDER=True):
+                response = self.client.get(url)
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], expected['Content-Type'])
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    @override_settings(GAME_API_FAST_RENDER=True)
+    def test_paginated_view_follows_next_link(self):
+        first = self.client.get("/api/game/", {"page_size": 2}).json()
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(len(first["results"]) + len(second["results"]), 3)
+        self.assertIsNone(second["next"])
@@ -1,6 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
 from apps.game.tests.base import GameAPITestCase
-from apps.game.models import Game, Player, Round
-from apps.game.api.services import determine_game_winner, determine_round_winner
+from apps.game.models import Game, Player, PlayerStats, Round
+from apps.game.api.services import (
+    determine_game_winner,
+    determine_round_winner,
+    get_leaderboard,
+    get_player_rank,
+    record_round,
+    resolve_players,
+    GameFinishedError,
+)
 
 
 class GameServiceTestCase(GameAPITestCase):
@@ -29,8 +43,10 @@ class GameServiceTestCase(GameAPITestCase):
                 player2_choice='scissors',
                 round_winner=self.player1
             )
+        self.game.player1_wins = 3
         winner = determine_game_winner(self.game)
         self.assertEqual(winner, self.player1)
+        self.assertIsNotNone(self.game.finished_at)
 
     def test_determine_game_winner_player2(self):
         """Player 2 should win after 3 victories."""
@@ -42,9 +58,21 @@ class GameServiceTestCase(GameAPITestCase):
                 player2_choice='rock',
                 round_winner=self.player2
             )
+        self.game.player2_wins = 3
         winner = determine_game_winner(self.game)
         self.assertEqual(winner, self.player2)
 
+    def test_determine_game_winner_scores_once(self):
+        """Deciding an already finished game again should not add to the score."""
+        self.game.player1_wins = 3
+        determine_game_winner(self.game)
+        finished_at = self.game.finished_at
+
+        self.assertEqual(determine_game_winner(self.game), self.player1)
+        self.assertEqual(self.game.finished_at, finished_at)
+        self.player1.refresh_from_db()
+        self.assertEqual(self.player1.score, 1)
+
     def test_determine_game_winner_no_winner_yet(self):
         """Should return None if neither player has 3 wins."""
         Round.objects.create(
@@ -61,8 +89,11 @@ class GameServiceTestCase(GameAPITestCase):
             player2_choice='rock',
             round_winner=self.player2
         )
+        self.game.player1_wins = 1
+        self.game.player2_wins = 1
         winner = determine_game_winner(self.game)
         self.assertIsNone(winner)
+        self.assertIsNone(self.game.finished_at)
 
     def test_determine_round_winner_player1_wins(self):
         """Player 1 should win when their choice beats player 2."""
@@ -95,4 +126,186 @@ class GameServiceTestCase(GameAPITestCase):
             player2_choice='rock'
         )
         winner = determine_round_winner(round_)
-        self.assertIsNone(winner)
\ No newline at end of file
+        self.assertIsNone(winner)
+
+
+class RecordRoundTestCase(GameAPITestCase):
+    """Test case for the round submission pipeline."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.player1 = Player.objects.create(name="Player 1")
+        self.player2 = Player.objects.create(name="Player 2")
+        self.game = Game.objects.create(player1=self.player1, player2=self.player2)
+
+    def test_record_round_updates_counters(self):
+        """Recording rounds should number them and keep the win counters."""
+        first = record_round(self.game.id, 'rock', 'scissors')
+        second = record_round(self.game.id, 'rock', 'rock')
+        third = record_round(self.game.id, 'rock', 'paper')
+
+        self.assertEqual([first.round_number, second.round_number, third.round_number], [1, 2, 3])
+        self.assertEqual(first.round_winner, self.player1)
+        self.assertIsNone(second.round_winner)
+        self.assertEqual(third.round_winner, self.player2)
+
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.rounds_played, 3)
+        self.assertEqual(self.game.player1_wins, 1)
+        self.assertEqual(self.game.player2_wins, 1)
+        self.assertIsNone(self.game.winner)
+
+    def test_record_round_bumps_updated_at(self):
+        """Recording a round should move the export watermark of the game."""
+        created_updated_at = self.game.updated_at
+        record_round(self.game.id, 'rock', 'scissors')
+
+        self.game.refresh_from_db()
+        self.assertGreater(self.game.updated_at, created_updated_at)
+
+    def test_record_round_finishes_game(self):
+        """The third win should finish the game and block further rounds."""
+        for _ in range(3):
+            record_round(self.game.id, 'paper', 'rock')
+
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.winner, self.player1)
+        self.assertIsNotNone(self.game.finished_at)
+        with self.assertRaises(GameFinishedError):
+            record_round(self.game.id, 'paper', 'rock')
+        self.assertEqual(self.game.rounds.count(), 3)
+
+    def test_record_round_increments_winner_score(self):
+        """Finishing a game should add a point to the winner's score."""
+        for _ in range(3):
+            round_obj = record_round(self.game.id, 'scissors', 'rock')
+
+        self.assertEqual(round_obj.round_winner.score, 1)
+        self.player1.refresh_from_db()
+        self.player2.refresh_from_db()
+        self.assertEqual(self.player1.score, 0)
+        self.assertEqual(self.player2.score, 1)
+
+    def test_record_round_game_not_found(self):
+        """Should raise DoesNotExist for an unknown game."""
+        with self.assertRaises(Game.DoesNotExist):
+            record_round('00000000-0000-0000-0000-000000000000', 'rock', 'paper')
+
+    def test_record_round_query_count(self):
+        """Should lock, insert and update without any aggregate queries."""
+        record_round(self.game.id, 'rock', 'scissors')
+        with CaptureQueriesContext(connection) as ctx:
+            record_round(self.game.id, 'rock', 'scissors')
+        queries = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(queries), 3)
+
+
+class ResolvePlayersTestCase(GameAPITestCase):
+    """Test case for player resolution."""
+
+    def test_resolve_players_creates_missing(self):
+        """Unknown names should be created, known names reused."""
+        existing = Player.objects.create(name="Alice")
+        alice, bob = resolve_players("Alice", "Bob")
+        self.assertEqual(alice, existing)
+        self.assertEqual(bob.name, "Bob")
+        self.assertEqual(Player.objects.count(), 2)
+
+    def test_resolve_players_creates_stats(self):
+        """New players should get their statistics row with them."""
+        alice, = resolve_players("Alice")
+        self.assertTrue(PlayerStats.objects.filter(player=alice).exists())
+
+    def test_resolve_players_uses_cached_ids(self):
+        """Hot names should be loaded with a single query."""
+        resolve_players("Alice", "Bob")
+        with self.assertNumQueries(1):
+            alice, bob = resolve_players("Alice", "Bob")
+        self.assertEqual((alice.name, bob.name), ("Alice", "Bob"))
+
+    def test_resolve_players_recovers_from_stale_ids(self):
+        """A deleted player should be recreated instead of reusing its id."""
+        alice, = resolve_players("Alice")
+        alice.delete()
+        recreated, = resolve_players("Alice")
+        self.assertNotEqual(recreated.id, alice.id)
+        self.assertTrue(Player.objects.filter(id=recreated.id).exists())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class RecordRoundConcurrencyTestCase(TransactionTestCase):
+    """Concurrent submissions against a database with row locking."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.player1 = Player.objects.create(name="Player 1")
+        self.player2 = Player.objects.create(name="Player 2")
+        self.game = Game.objects.create(player1=self.player1, player2=self.player2)
+
+    def submit(self, _):
+        try:
+            return record_round(self.game.id, 'paper', 'rock').round_number
+        except GameFinishedError:
+            return None
+        finally:
+            connection.close()
+
+    def test_concurrent_rounds_are_serialized(self):
+        """Only three rounds should be accepted, each with its own number."""
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(self.submit, range(10)))
+
+        self.assertEqual(sorted(r for r in results if r is not None), [1, 2, 3])
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.rounds_played, 3)
+        self.assertEqual(self.game.player1_wins, 3)
+        self.assertEqual(self.game.winner, self.player1)
+
+
+class LeaderboardServiceTestCase(GameAPITestCase):
+    """Test case for the leaderboard service functions."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.alice = Player.objects.create(name="Alice", score=5)
+        self.bob = Player.objects.create(name="Bob", score=3)
+        self.carol = Player.objects.create(name="Carol", score=3)
+        self.dave = Player.objects.create(name="Dave", score=0)
+
+    def test_get_leaderboard_ranks_ties(self):
+        """Players with the same score should share a rank."""
+        entries = get_leaderboard(10)
+        self.assertEqual(
+            [(e['rank'], e['name']) for e in entries],
+            [(1, "Alice"), (2, "Bob"), (2, "Carol"), (4, "Dave")]
+        )
+        self.assertEqual(len(get_leaderboard(2)), 2)
+
+    def test_get_leaderboard_is_cached(self):
+        """A second read should be served without queries."""
+        get_leaderboard(10)
+        with self.assertNumQueries(0):
+            get_leaderboard(3)
+
+    def test_get_player_rank(self):
+        """The rank should count the players with a higher score."""
+        self.assertEqual(get_player_rank(self.alice), 1)
+        self.assertEqual(get_player_rank(self.carol), 2)
+        self.assertEqual(get_player_rank(self.dave), 4)
+
+    def test_leaderboard_invalidated_when_game_finishes(self):
+        """Finishing a game should refresh the cached ranking."""
+        self.assertEqual(get_leaderboard(1)[0]['name'], "Alice")
+        game = Game.objects.create(player1=self.dave, player2=self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                record_round(game.id, 'paper', 'scissors')
+
+        entries = get_leaderboard(10)
+        self.assertEqual([(e['rank'], e['name']) for e in entries[:2]], [(1, "Alice"), (2, "Bob")])
+        self.assertEqual(entries[1]['score'], 4)
+        self.bob.refresh_from_db()
+        self.assertEqual(get_player_rank(self.bob), 2)
+        self.assertEqual(get_player_rank(self.carol), 3)
@@ -0,0 +1,94 @@
+from apps.game.tests.base import GameAPITestCase
+from apps.game.models import Game, Player, PlayerStats
+from apps.game.api.services import record_rounds
+from apps.game.api.stats import COUNTER_FIELDS, rebuild_player_stats
+
+
+STAT_FIELDS = (*COUNTER_FIELDS, 'current_streak', 'longest_streak')
+
+
+class PlayerStatsTestCase(GameAPITestCase):
+    """Test case for the materialized player statistics."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        super().setUp()
+        self.alice = Player.objects.create(name="Alice")
+        self.bob = Player.objects.create(name="Bob")
+        self.charlie = Player.objects.create(name="Charlie")
+
+    def play(self, player1, player2, moves):
+        game = Game.objects.create(player1=player1, player2=player2)
+        with self.captureOnCommitCallbacks(execute=True):
+            record_rounds(game.id, moves)
+        return game
+
+    def stats(self, player):
+        return PlayerStats.objects.get(player=player)
+
+    def snapshot(self):
+        return {
+            stats.player_id: {field: getattr(stats, field) for field in STAT_FIELDS}
+            for stats in PlayerStats.objects.all()
+        }
+
+    def test_rounds_update_stats(self):
+        """Every recorded round should count for both players."""
+        game = Game.objects.create(player1=self.alice, player2=self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            record_rounds(game.id, [('rock', 'scissors'), ('rock', 'rock')])
+            record_rounds(game.id, [('paper', 'scissors')])
+
+        alice = self.stats(self.alice)
+        self.assertEqual(alice.rounds_played, 3)
+        self.assertEqual(alice.rounds_won, 1)
+        self.assertEqual(alice.rounds_drawn, 1)
+        self.assertEqual(alice.rounds_lost, 1)
+        self.assertEqual(alice.choice_distribution, {'rock': 2, 'paper': 1, 'scissors': 0})
+        self.assertEqual(alice.favourite_choice, 'rock')
+        self.assertEqual(alice.games_played, 0)
+        self.assertIsNone(alice.win_rate)
+
+        bob = self.stats(self.bob)
+        self.assertEqual(bob.rounds_won, 1)
+        self.assertEqual(bob.favourite_choice, 'scissors')
+
+    def test_finished_games_update_results_and_streaks(self):
+        """Finishing games should update the results and win streaks."""
+        win = [('rock', 'scissors')] * 3
+        loss = [('scissors', 'rock')] * 3
+        self.play(self.alice, self.bob, win)
+        self.play(self.charlie, self.alice, loss)
+        self.play(self.alice, self.bob, loss)
+        self.play(self.alice, self.charlie, win)
+
+        alice = self.stats(self.alice)
+        self.assertEqual(alice.games_played, 4)
+        self.assertEqual(alice.games_won, 3)
+        self.assertEqual(alice.win_rate, 0.75)
+        self.assertEqual(alice.current_streak, 1)
+        self.assertEqual(alice.longest_streak, 2)
+
+        bob = self.stats(self.bob)
+        self.assertEqual((bob.games_won, bob.current_streak, bob.longest_streak), (1, 1, 1))
+        charlie = self.stats(self.charlie)
+        self.assertEqual((charlie.games_won, charlie.current_streak, charlie.longest_streak), (0, 0, 0))
+
+    def test_rebuild_matches_incremental_stats(self):
+        """A rebuild should produce the same rows as the incremental updates."""
+        win = [('rock', 'scissors')] * 3
+        self.play(self.alice, self.bob, win)
+        self.play(self.bob, self.alice, [('rock', 'rock'), ('paper', 'rock')] + win)
+        self.play(self.alice, self.charlie, [('paper', 'paper')] + win)
+        self.play(self.charlie, self.bob, [('scissors', 'paper')])
+        expected = self.snapshot()
+
+        PlayerStats.objects.update(rounds_played=0, longest_streak=9)
+        self.assertEqual(rebuild_player_stats(), 3)
+        self.assertEqual(self.snapshot(), expected)
+
+    def test_rebuild_creates_rows_for_idle_players(self):
+        """Players without rounds should get zeroed statistics."""
+        rebuild_player_stats()
+        stats = self.stats(self.alice)
+        self.assertEqual([getattr(stats, field) for field in STAT_FIELDS], [0] * len(STAT_FIELDS))
@@ -1,8 +1,24 @@
 from apps.game.tests.base import GameAPITestCase
-from apps.game.models import Game, Player, Round
+from apps.game.models import Game, Player, PlayerStats, Round
+from apps.game.api.pagination import GameCursorPagination
+from apps.game.api.services import BULK_BATCH_SIZE
 
+import csv
+import io
+import json
+import math
+from unittest.mock import patch
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.test import APIClient, APITransactionTestCase
 
 
 class TestNewGameView(GameAPITestCase):
@@ -58,6 +74,98 @@ class TestNewGameView(GameAPITestCase):
         assert "id" in response.data
 
 
+@skipUnlessDBFeature('has_select_for_update')
+class TestNewGameViewConcurrency(APITransactionTestCase):
+    url = "/api/game/new/"
+
+    def create_game(self, index):
+        try:
+            data = {"player1_name": "Streamer", "player2_name": f"Viewer {index}"}
+            return APIClient().post(self.url, data, format="json").status_code
+        finally:
+            connection.close()
+
+    def test_concurrent_games_for_same_new_player(self):
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            codes = list(executor.map(self.create_game, range(50)))
+        assert codes == [status.HTTP_201_CREATED] * 50
+        assert Player.objects.filter(name="Streamer").count() == 1
+        assert Game.objects.count() == 50
+
+
+class TestBulkNewGameView(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = "/api/game/bulk/"
+
+    def test_bulk_create_games(self):
+        Player.objects.create(name="Alice")
+        data = {"games": [
+            {"player1_name": "Alice", "player2_name": "Bob"},
+            {"player1_name": "Bob", "player2_name": "Charlie"},
+        ]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [g["index"] for g in response.data["created"]] == [0, 1]
+        assert response.data["errors"] == []
+        assert Game.objects.count() == 2
+        assert Player.objects.count() == 3
+        bob = Player.objects.get(name="Bob")
+        assert response.data["created"][0]["player2"] == str(bob.id)
+        assert response.data["created"][1]["player1"] == str(bob.id)
+
+    def test_bulk_create_games_reports_invalid_items(self):
+        data = {"games": [
+            {"player1_name": "Alice", "player2_name": "Bob"},
+            {"player1_name": "Alice"},
+            {"player1_name": "Carol", "player2_name": "carol"},
+        ]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data["created"]) == 1
+        assert response.data["errors"][0]["index"] == 1
+        assert "player2_name" in response.data["errors"][0]["errors"]
+        assert response.data["errors"][1]["index"] == 2
+        assert response.data["errors"][1]["errors"]["code"] == "duplicate_player_names"
+        assert Game.objects.count() == 1
+
+    def test_bulk_create_games_all_invalid(self):
+        data = {"games": [{"player1_name": "Alice", "player2_name": "alice"}]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["created"] == []
+        assert Game.objects.count() == 0
+
+    def test_bulk_create_games_empty(self):
+        response = self.client.post(self.url, {"games": []}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "games" in response.data
+
+    def test_bulk_create_games_query_count(self):
+        Player.objects.create(name="Player 0")
+        data = {"games": [
+            {"player1_name": f"Player {i}", "player2_name": f"Player {i + 1}"}
+            for i in range(100)
+        ]}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        queries = [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+
+        def insert_batches(model, count):
+            # The backend may split an INSERT to stay under its parameter limit.
+            fields = model._meta.concrete_fields
+            size = min(BULK_BATCH_SIZE, connection.ops.bulk_batch_size(fields, [model()] * count))
+            return math.ceil(count / size)
+
+        # Two reads of the players, then the player, statistics and game INSERTs.
+        assert len(queries) == (
+            2 + insert_batches(Player, 100) + insert_batches(PlayerStats, 100) + insert_batches(Game, 100)
+        )
+        assert Game.objects.count() == 100
+        assert Player.objects.count() == 101
+
+
 class TestGameDetailView(GameAPITestCase):
     def setUp(self):
         super().setUp()
@@ -81,6 +189,164 @@ class TestGameDetailView(GameAPITestCase):
         assert response.data["code"] == "game_not_found"
 
 
+class TestGameDetailViewCaching(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.player1 = Player.objects.create(name="Alice")
+        self.player2 = Player.objects.create(name="Bob")
+        self.game = Game.objects.create(player1=self.player1, player2=self.player2)
+        self.url = "/api/game/{}/".format(self.game.id)
+
+    def play_round(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/game/{self.game.id}/rounds/new/",
+                {"player1_choice": "rock", "player2_choice": "scissors"},
+                format="json"
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_get_game_detail_returns_etag(self):
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"].startswith('"')
+
+    def test_get_game_detail_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+    def test_get_game_detail_served_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        assert second.status_code == status.HTTP_200_OK
+        assert second.content == first.content
+        assert second["ETag"] == first["ETag"]
+        assert second["Content-Type"] == "application/json"
+
+    def test_new_round_changes_etag_and_invalidates_cache(self):
+        first = self.client.get(self.url)
+        self.play_round()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != first["ETag"]
+        assert len(response.data["rounds"]) == 1
+
+    def test_finished_game_etag(self):
+        for _ in range(3):
+            self.play_round()
+        response = self.client.get(self.url)
+        assert response.data["winner"]["name"] == "Alice"
+        etag = response["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_finished_game_shows_current_scores(self):
+        for _ in range(3):
+            self.play_round()
+        first = self.client.get(self.url)
+        assert json.loads(first.content)["player1"]["score"] == 1
+
+        finished, self.game = self.game, Game.objects.create(player1=self.player1, player2=self.player2)
+        for _ in range(3):
+            self.play_round()
+        self.game = finished
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != first["ETag"]
+        assert json.loads(response.content)["player1"]["score"] == 2
+
+
+class TestGameFieldSelection(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.player1 = Player.objects.create(name="Alice")
+        self.player2 = Player.objects.create(name="Bob")
+        self.game = Game.objects.create(player1=self.player1, player2=self.player2)
+        rounds = [("scissors", self.player1), ("rock", None), ("paper", self.player2)]
+        for number, (player2_choice, winner) in enumerate(rounds, start=1):
+            Round.objects.create(
+                game=self.game,
+                round_number=number,
+                player1_choice="rock",
+                player2_choice=player2_choice,
+                round_winner=winner
+            )
+        Game.objects.filter(id=self.game.id).update(rounds_played=3, player1_wins=1, player2_wins=1)
+        self.url = f"/api/game/{self.game.id}/"
+
+    def test_detail_selected_fields(self):
+        response = self.client.get(self.url, {"fields": "winner,id"})
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.json()) == ["id", "winner"]
+
+    def test_detail_collapsed_relations(self):
+        response = self.client.get(self.url, {"fields": "player1,player2,rounds", "expand": ""})
+        assert response.json() == {
+            "player1": str(self.player1.id),
+            "player2": str(self.player2.id),
+            "rounds": [["rock", "scissors", 1], ["rock", "rock", 0], ["rock", "paper", 2]],
+        }
+
+    def test_detail_partially_expanded(self):
+        response = self.client.get(self.url, {"expand": "player1"})
+        data = response.json()
+        assert data["player1"]["name"] == "Alice"
+        assert data["player2"] == str(self.player2.id)
+        assert data["winner"] is None
+        assert data["rounds"][0] == ["rock", "scissors", 1]
+
+    def test_detail_default_representation_unchanged(self):
+        default = self.client.get(self.url).json()
+        selected = self.client.get(
+            self.url, {"fields": ",".join(default), "expand": "player1,player2,winner,rounds"}
+        ).json()
+        assert selected == default
+
+    def test_detail_unknown_field(self):
+        response = self.client.get(self.url, {"fields": "id,password"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "fields" in response.data
+
+    def test_detail_selection_has_its_own_etag_and_cache_entry(self):
+        full = self.client.get(self.url)
+        compact = self.client.get(self.url, {"expand": ""})
+        assert compact["ETag"] != full["ETag"]
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.url, {"expand": ""})
+        assert cached.content == compact.content
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.url)
+        assert cached.content == full.content
+
+        response = self.client.get(self.url, {"expand": ""}, HTTP_IF_NONE_MATCH=full["ETag"])
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_detail_query_is_narrowed(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {"fields": "id,player1,rounds", "expand": ""})
+        sql = "\n".join(query["sql"] for query in queries.captured_queries)
+        assert "game_player" not in sql
+        assert "updated_at" not in sql
+        assert "finished_at" in sql
+
+    def test_list_selected_fields(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/game/", {"fields": "id,winner", "expand": ""})
+        assert response.json() == [{"id": str(self.game.id), "winner": None}]
+
+    def test_list_paginated_selected_fields(self):
+        response = self.client.get("/api/game/", {"page_size": 1, "fields": "id,rounds", "expand": ""})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["rounds"][2] == ["rock", "paper", 2]
+
+
 class TestNewRoundView(GameAPITestCase):
     def setUp(self):
         super().setUp()
@@ -140,6 +406,69 @@ class TestNewRoundView(GameAPITestCase):
         assert response.data["code"] == "game_finished"
 
 
+class TestNewRoundViewBatch(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.player1 = Player.objects.create(name="Alice")
+        self.player2 = Player.objects.create(name="Bob")
+        self.game = Game.objects.create(player1=self.player1, player2=self.player2)
+        self.url = f"/api/game/{self.game.id}/rounds/new/"
+
+    def test_create_round_batch(self):
+        data = {"rounds": [
+            {"player1_choice": "rock", "player2_choice": "scissors"},
+            {"player1_choice": "rock", "player2_choice": "rock"},
+        ]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [r["round_number"] for r in response.data["rounds"]] == [1, 2]
+        assert response.data["rounds"][0]["round_winner"]["name"] == "Alice"
+        assert response.data["rounds"][1]["round_winner"] is None
+        assert response.data["ignored"] == 0
+        self.game.refresh_from_db()
+        assert self.game.rounds_played == 2
+        assert self.game.winner is None
+
+    def test_create_round_batch_stops_at_game_winner(self):
+        data = {"rounds": [
+            {"player1_choice": "rock", "player2_choice": "paper"}
+            for _ in range(5)
+        ]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data["rounds"]) == 3
+        assert response.data["ignored"] == 2
+        self.game.refresh_from_db()
+        assert self.game.winner == self.player2
+        assert self.game.rounds.count() == 3
+
+    def test_create_round_batch_invalid_choice(self):
+        data = {"rounds": [
+            {"player1_choice": "rock", "player2_choice": "paper"},
+            {"player1_choice": "lizard", "player2_choice": "paper"},
+        ]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "player1_choice" in response.data["rounds"][1]
+        assert self.game.rounds.count() == 0
+
+    def test_create_round_batch_empty(self):
+        response = self.client.post(self.url, {"rounds": []}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "rounds" in response.data
+
+    def test_create_round_batch_query_count(self):
+        data = {"rounds": [
+            {"player1_choice": "rock", "player2_choice": "rock"}
+            for _ in range(5)
+        ]}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        queries = [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+        assert len(queries) == 3
+
+
 class TestGameListView(GameAPITestCase):
     def setUp(self):
         super().setUp()
@@ -187,3 +516,281 @@ class TestGameListView(GameAPITestCase):
         assert "player1" in game_data
         assert "player2" in game_data
         assert "created_at" in game_data
+
+
+class TestGameListViewPagination(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = "/api/game/"
+        self.player1 = Player.objects.create(name="Alice")
+        self.player2 = Player.objects.create(name="Bob")
+
+    def create_games(self, count, rounds_per_game=0):
+        games = []
+        for _ in range(count):
+            game = Game.objects.create(player1=self.player1, player2=self.player2)
+            for i in range(1, rounds_per_game + 1):
+                Round.objects.create(
+                    game=game,
+                    round_number=i,
+                    player1_choice="rock",
+                    player2_choice="scissors",
+                    round_winner=self.player1
+                )
+            games.append(game)
+        return games
+
+    def test_list_games_paginated(self):
+        games = self.create_games(3)
+        response = self.client.get(self.url, {"page_size": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 2
+        assert response.data["results"][0]["id"] == str(games[-1].id)
+        assert response.data["next"] is not None
+
+        response = self.client.get(response.data["next"])
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 1
+        assert response.data["results"][0]["id"] == str(games[0].id)
+        assert response.data["next"] is None
+
+    def test_list_games_page_size_is_capped(self):
+        self.create_games(3)
+        with patch.object(GameCursorPagination, "max_page_size", 2):
+            response = self.client.get(self.url, {"page_size": 1000})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 2
+
+    def test_list_games_paginated_query_count_is_constant(self):
+        self.create_games(1, rounds_per_game=1)
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {"page_size": 50})
+
+        self.create_games(20, rounds_per_game=3)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"page_size": 50})
+        assert len(response.data["results"]) == 21
+        assert response.data["results"][0]["rounds"][0]["round_winner"]["name"] == "Alice"
+
+
+class TestPlayerGamesView(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = Player.objects.create(name="Alice")
+        self.bob = Player.objects.create(name="Bob")
+        self.charlie = Player.objects.create(name="Charlie")
+        self.url = f"/api/game/players/{self.alice.id}/games/"
+
+    def create_game(self, player1, player2, winner=None):
+        game = Game.objects.create(player1=player1, player2=player2)
+        if winner is not None:
+            Game.objects.filter(id=game.id).update(winner=winner, finished_at=timezone.now())
+        return game
+
+    def test_player_games_newest_first(self):
+        games = [
+            self.create_game(self.alice, self.bob),
+            self.create_game(self.bob, self.charlie),
+            self.create_game(self.charlie, self.alice),
+            self.create_game(self.alice, self.charlie),
+        ]
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert [game["id"] for game in response.data["results"]] == [
+            str(games[3].id), str(games[2].id), str(games[0].id)
+        ]
+        assert response.data["next"] is None
+        assert "rounds" not in response.data["results"][0]
+        assert response.data["results"][0]["player1"] == self.alice.id
+
+    def test_player_games_paginated(self):
+        games = [self.create_game(self.alice, self.bob) for _ in range(3)]
+        games += [self.create_game(self.bob, self.alice) for _ in range(2)]
+        expected = [str(game.id) for game in reversed(games)]
+
+        seen = []
+        response = self.client.get(self.url, {"page_size": 2})
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            seen += [game["id"] for game in response.data["results"]]
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+        assert seen == expected
+
+    def test_player_games_same_created_at(self):
+        games = [self.create_game(self.alice, self.bob), self.create_game(self.bob, self.alice)]
+        Game.objects.update(created_at=timezone.now())
+        first = self.client.get(self.url, {"page_size": 1})
+        second = self.client.get(first.data["next"])
+        assert {first.data["results"][0]["id"], second.data["results"][0]["id"]} == {
+            str(game.id) for game in games
+        }
+        assert second.data["next"] is None
+
+    def test_player_games_filters(self):
+        won = self.create_game(self.alice, self.bob, winner=self.alice)
+        lost = self.create_game(self.charlie, self.alice, winner=self.charlie)
+        active = self.create_game(self.alice, self.charlie)
+
+        response = self.client.get(self.url, {"won": "true"})
+        assert [game["id"] for game in response.data["results"]] == [str(won.id)]
+        response = self.client.get(self.url, {"won": "false"})
+        assert [game["id"] for game in response.data["results"]] == [str(lost.id)]
+        response = self.client.get(self.url, {"finished": "false"})
+        assert [game["id"] for game in response.data["results"]] == [str(active.id)]
+        response = self.client.get(self.url, {"finished": "true"})
+        assert len(response.data["results"]) == 2
+
+    def test_player_games_query_count_is_constant(self):
+        self.create_game(self.alice, self.bob)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        for _ in range(30):
+            self.create_game(self.bob, self.alice, winner=self.bob)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        assert len(response.data["results"]) == 20
+
+    def test_player_games_player_not_found(self):
+        response = self.client.get("/api/game/players/00000000-0000-0000-0000-000000000000/games/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data["code"] == "player_not_found"
+
+    def test_player_games_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "garbage"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_player_games_invalid_page_size(self):
+        response = self.client.get(self.url, {"page_size": 1000})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "page_size" in response.data
+
+
+class TestExportView(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = "/api/game/export/"
+        self.alice = Player.objects.create(name="Alice")
+        self.bob = Player.objects.create(name="Bob, Jr.")
+        self.game = Game.objects.create(player1=self.alice, player2=self.bob)
+        Round.objects.create(
+            game=self.game,
+            round_number=1,
+            player1_choice="rock",
+            player2_choice="scissors",
+            round_winner=self.alice
+        )
+
+    def read(self, response):
+        assert response.streaming
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_games_ndjson(self):
+        other = Game.objects.create(player1=self.bob, player2=self.alice)
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [record["id"] for record in records] == [str(self.game.id), str(other.id)]
+        assert records[0]["player2_name"] == "Bob, Jr."
+        assert records[0]["winner_id"] is None
+
+    def test_export_rounds_csv(self):
+        response = self.client.get(self.url, {"resource": "rounds", "format": "csv"})
+        assert response["Content-Type"] == "text/csv"
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        assert rows[0][:3] == ["id", "game_id", "round_number"]
+        assert rows[1][1:6] == [str(self.game.id), "1", "rock", "scissors", str(self.alice.id)]
+        assert len(rows) == 2
+
+    def test_export_updated_since(self):
+        watermark = timezone.now()
+        other = Game.objects.create(player1=self.bob, player2=self.alice)
+        response = self.client.get(self.url, {"updated_since": watermark.isoformat()})
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [record["id"] for record in records] == [str(other.id)]
+
+    async def test_export_is_async_under_asgi(self):
+        params = {"resource": "rounds", "format": "csv"}
+        expected = await sync_to_async(lambda: self.read(self.client.get(self.url, params)))()
+        response = await self.async_client.get(self.url, params)
+        assert response.is_async
+        chunks = [chunk async for chunk in response.streaming_content]
+        assert b"".join(chunks).decode() == expected
+
+    def test_export_invalid_format(self):
+        response = self.client.get(self.url, {"format": "xml"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "format" in response.json()
+
+
+class TestPlayerStatsView(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = Player.objects.create(name="Alice", score=1)
+        self.bob = Player.objects.create(name="Bob")
+        self.url = f"/api/game/players/{self.alice.id}/stats/"
+
+    def test_player_stats(self):
+        game = Game.objects.create(player1=self.alice, player2=self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/game/{game.id}/rounds/new/",
+                {"rounds": [{"player1_choice": "rock", "player2_choice": "scissors"}] * 3},
+                format="json"
+            )
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["player"]["name"] == "Alice"
+        assert response.data["games_won"] == 1
+        assert response.data["win_rate"] == 1.0
+        assert response.data["favourite_choice"] == "rock"
+        assert response.data["choice_distribution"] == {"rock": 3, "paper": 0, "scissors": 0}
+        assert response.data["longest_streak"] == 1
+
+    def test_player_stats_without_rounds(self):
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["rounds_played"] == 0
+        assert response.data["win_rate"] is None
+        assert response.data["favourite_choice"] is None
+
+    def test_player_stats_player_not_found(self):
+        response = self.client.get("/api/game/players/00000000-0000-0000-0000-000000000000/stats/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data["code"] == "player_not_found"
+
+
+class TestLeaderboardView(GameAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = "/api/game/leaderboard/"
+        self.alice = Player.objects.create(name="Alice", score=7)
+        self.bob = Player.objects.create(name="Bob", score=2)
+        self.charlie = Player.objects.create(name="Charlie", score=4)
+
+    def test_leaderboard_top_players(self):
+        response = self.client.get(self.url, {"limit": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["name"] for p in response.data["results"]] == ["Alice", "Charlie"]
+        assert response.data["results"][1]["rank"] == 2
+        assert "player" not in response.data
+
+    def test_leaderboard_with_player_rank(self):
+        response = self.client.get(self.url, {"limit": 1, "player_id": str(self.bob.id)})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["player"]["name"] == "Bob"
+        assert response.data["player"]["rank"] == 3
+
+    def test_leaderboard_player_not_found(self):
+        response = self.client.get(self.url, {"player_id": "00000000-0000-0000-0000-000000000000"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data["code"] == "player_not_found"
+
+    def test_leaderboard_invalid_limit(self):
+        response = self.client.get(self.url, {"limit": 1000})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "limit" in response.data
@@ -1,16 +1,41 @@
+from django.conf import settings
 from django.urls import path
 
 from apps.game.api.views import (
     NewGameView,
+    BulkNewGameView,
     GameDetailView,
+    GameEventsView,
+    ExportView,
     NewRoundView,
-    GameListView
+    GameListView,
+    LeaderboardView,
+    PlayerGamesView,
+    PlayerStatsView,
+    MatchmakingView,
+    MatchmakingTicketView
 )
 
+if settings.GAME_API_ASYNC:
+    from apps.game.api.async_views import (  # noqa: F811
+        NewGameView,
+        GameDetailView,
+        NewRoundView,
+        GameListView
+    )
+
 
 urlpatterns = [
     path('', GameListView.as_view(), name='game_list'),
     path('new/', NewGameView.as_view(), name='new_game'),
+    path('bulk/', BulkNewGameView.as_view(), name='bulk_new_game'),
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
+    path('export/', ExportView.as_view(), name='export'),
+    path('matchmaking/', MatchmakingView.as_view(), name='matchmaking'),
+    path('matchmaking/<uuid:player_id>/', MatchmakingTicketView.as_view(), name='matchmaking_ticket'),
+    path('players/<uuid:player_id>/games/', PlayerGamesView.as_view(), name='player_games'),
+    path('players/<uuid:player_id>/stats/', PlayerStatsView.as_view(), name='player_stats'),
     path('<str:game_id>/', GameDetailView.as_view(), name='game_detail'),
+    path('<str:game_id>/events/', GameEventsView.as_view(), name='game_events'),
     path('<str:game_id>/rounds/new/', NewRoundView.as_view(), name='new_round'),
 ]
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""Performance benchmarks for the game API.
+
+Benchmarks are run as modules from the project root, e.g.
+``python -m benchmarks.engine``. Unless configured otherwise they use the
+regular Django settings with an in-memory SQLite database.
+"""
+import os
+
+
+def setup_django() -> None:
+    """Configure Django for a standalone benchmark run."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmarks')
+    os.environ.setdefault('DATABASE_URL', 'sqlite://:memory:')
+    os.environ.setdefault('ALLOWED_HOSTS', 'testserver,localhost')
+
+    import django
+    django.setup()
+
+    # Don't keep every executed query in memory while measuring.
+    from django.conf import settings
+    settings.DEBUG = False
@@ -0,0 +1,347 @@
+"""Benchmark the core game endpoints in process and gate regressions.
+
+``run`` seeds a realistic data set, then sends requests to ``NewGameView``,
+``NewRoundView``, ``GameDetailView`` and ``GameListView`` through Django's
+test client, so each request goes through the URL resolver, the middleware
+and the view exactly as in production, without network or server noise.
+Requests are sent one at a time; the throughput is the inverse of the mean
+latency. For every endpoint it reports the throughput, latency percentiles
+and the number of SQL queries per request, and saves the results as JSON.
+
+``compare`` checks a run against a stored baseline and exits with status 1
+if an endpoint got slower, or lost throughput, by more than the threshold,
+or runs more queries per request than before.
+
+Without ``DATABASE_URL`` the data set is seeded into a temporary SQLite file.
+To benchmark PostgreSQL or to keep the seeded data between runs, point
+``DATABASE_URL`` at a database: it is migrated, and seeded only if empty.
+
+Usage::
+
+    python -m benchmarks.api run --output benchmarks/baseline.json
+    python -m benchmarks.api run --output results.json
+    python -m benchmarks.api compare benchmarks/baseline.json results.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+SEED_BATCH_SIZE = 5000
+
+CHOICES = ('rock', 'paper', 'scissors')
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the given percentile of a sorted list of values."""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def seed(players: int, games: int, rounds: int, rng: random.Random) -> None:
+    """Create ``players`` players and ``games`` games with about ``rounds`` rounds.
+
+    Rounds are played at random and a game stops at its share of the rounds
+    or as soon as a player wins it, so the data set mixes finished and
+    active games like a live one. Scores and player statistics are derived
+    from the generated games.
+    """
+    from django.db import transaction
+    from django.db.models import Count, F
+    from django.utils import timezone as django_timezone
+
+    from apps.game.api.engine import PLAYER1, PLAYER2, DRAW, decide_game, resolve_round
+    from apps.game.api.stats import rebuild_player_stats
+    from apps.game.models import Game, Player, Round
+
+    player_objs = Player.objects.bulk_create(
+        [Player(name=f"Player {i}") for i in range(players)],
+        batch_size=SEED_BATCH_SIZE
+    )
+    player_ids = [player.id for player in player_objs]
+    rounds_per_game = rounds / games
+    now = django_timezone.now()
+
+    for start in range(0, games, SEED_BATCH_SIZE):
+        game_objs, round_objs = [], []
+        for _ in range(min(SEED_BATCH_SIZE, games - start)):
+            player1, player2 = rng.sample(player_ids, 2)
+            game = Game(player1_id=player1, player2_id=player2)
+            limit = rng.randint(1, max(1, round(rounds_per_game * 2 - 1)))
+            wins = {PLAYER1: 0, PLAYER2: 0}
+            outcome = DRAW
+            while game.rounds_played < limit and outcome == DRAW:
+                choice1, choice2 = rng.choice(CHOICES), rng.choice(CHOICES)
+                result = resolve_round(choice1, choice2)
+                if result != DRAW:
+                    wins[result] += 1
+                game.rounds_played += 1
+                round_objs.append(Round(
+                    game=game,
+                    round_number=game.rounds_played,
+                    player1_choice=choice1,
+                    player2_choice=choice2,
+                    round_winner_id={PLAYER1: player1, PLAYER2: player2}.get(result)
+                ))
+                outcome = decide_game(wins[PLAYER1], wins[PLAYER2])
+            game.player1_wins, game.player2_wins = wins[PLAYER1], wins[PLAYER2]
+            if outcome != DRAW:
+                game.winner_id = player1 if outcome == PLAYER1 else player2
+                game.finished_at = now
+            game_objs.append(game)
+        with transaction.atomic():
+            Game.objects.bulk_create(game_objs)
+            Round.objects.bulk_create(round_objs, batch_size=SEED_BATCH_SIZE)
+
+    scores = Game.objects.filter(winner__isnull=False).values('winner').annotate(wins=Count('id'))
+    for row in scores.iterator():
+        Player.objects.filter(id=row['winner']).update(score=F('score') + row['wins'])
+    rebuild_player_stats()
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries it runs."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(client, make_request, requests: int, warmup: int) -> dict:
+    """Send ``warmup`` then ``requests`` requests one at a time and time them."""
+    from django.db import connection
+
+    for i in range(warmup):
+        make_request(client, i)
+
+    counter = QueryCounter()
+    latencies, queries = [], []
+    with connection.execute_wrapper(counter):
+        for i in range(warmup, warmup + requests):
+            counter.count = 0
+            start = time.perf_counter()
+            response = make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            queries.append(counter.count)
+            if response.status_code >= 400:
+                raise SystemExit(f"Request failed with {response.status_code}: {response.content[:200]}")
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'throughput_rps': requests / sum(latencies),
+        'latency_ms': {
+            'mean': statistics.fmean(latencies) * 1000,
+            'p50': percentile(latencies, 0.50) * 1000,
+            'p90': percentile(latencies, 0.90) * 1000,
+            'p95': percentile(latencies, 0.95) * 1000,
+            'p99': percentile(latencies, 0.99) * 1000,
+            'max': latencies[-1] * 1000,
+        },
+        'queries_per_request': {
+            'mean': statistics.fmean(queries),
+            'max': max(queries),
+        },
+    }
+
+
+def scenarios(rng: random.Random, run_id: str) -> dict:
+    """Build the request makers of every scenario, keyed by name."""
+    from apps.game.models import Game
+
+    game_ids = [str(pk) for pk in Game.objects.values_list('id', flat=True)]
+    active_ids = [str(pk) for pk in Game.objects.filter(winner__isnull=True).values_list('id', flat=True)]
+    detail_ids = [rng.choice(game_ids) for _ in range(1000)]
+    round_ids = [rng.choice(active_ids) for _ in range(1000)]
+
+    return {
+        'new_game': lambda c, i: c.post(
+            '/api/game/new/',
+            {'player1_name': f'Bench {run_id} {i}', 'player2_name': f'Player {i % 100}'},
+            content_type='application/json'
+        ),
+        # Draws never finish a game, so every request records a round.
+        'new_round': lambda c, i: c.post(
+            f'/api/game/{round_ids[i % len(round_ids)]}/rounds/new/',
+            {'player1_choice': 'rock', 'player2_choice': 'rock'},
+            content_type='application/json'
+        ),
+        'game_detail': lambda c, i: c.get(f'/api/game/{detail_ids[i % len(detail_ids)]}/'),
+        'game_list': lambda c, i: c.get('/api/game/', {'page_size': 20}),
+    }
+
+
+def git_commit() -> str | None:
+    """Return the commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> None:
+    if 'DATABASE_URL' not in os.environ:
+        workdir = tempfile.mkdtemp(prefix='pptgame-bench-')
+        os.environ['DATABASE_URL'] = f'sqlite:///{workdir}/db.sqlite3'
+
+    from benchmarks import setup_django
+    setup_django()
+
+    import django
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+
+    from apps.game.models import Game, Player, Round
+
+    rng = random.Random(args.seed)
+    call_command('migrate', verbosity=0)
+    if not Game.objects.exists():
+        start = time.perf_counter()
+        seed(args.players, args.games, args.rounds, rng)
+        print(f"Seeded in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    dataset = {
+        'players': Player.objects.count(),
+        'games': Game.objects.count(),
+        'rounds': Round.objects.count(),
+    }
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'machine': platform.machine(),
+        },
+        'dataset': dataset,
+        'scenarios': {},
+    }
+
+    client = Client()
+    run_id = f'{time.time_ns():x}'
+    print(f"{'scenario':<12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+    for name, make_request in scenarios(rng, run_id).items():
+        if args.scenario and name not in args.scenario:
+            continue
+        result = run_scenario(client, make_request, args.requests, args.warmup)
+        results['scenarios'][name] = result
+        latency = result['latency_ms']
+        print(
+            f"{name:<12} {result['throughput_rps']:>9,.0f} {latency['p50']:>9.2f} "
+            f"{latency['p95']:>9.2f} {latency['p99']:>9.2f} {result['queries_per_request']['mean']:>8.1f}"
+        )
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+        output.write('\n')
+    print(f"Results saved to {args.output}", file=sys.stderr)
+
+
+# Metrics checked by ``compare``: path in the results and whether higher is better.
+COMPARED_METRICS = (
+    (('throughput_rps',), True),
+    (('latency_ms', 'p50'), False),
+    (('latency_ms', 'p95'), False),
+    (('latency_ms', 'p99'), False),
+)
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return a description of every regression of ``current`` over ``baseline``.
+
+    Timings regress when they are worse by more than ``threshold`` (a
+    fraction of the baseline value). Query counts are deterministic, so any
+    increase is a regression.
+    """
+    regressions = []
+    for name, before in baseline['scenarios'].items():
+        after = current['scenarios'].get(name)
+        if after is None:
+            continue
+        for path, higher_is_better in COMPARED_METRICS:
+            old, new = before, after
+            for key in path:
+                old, new = old[key], new[key]
+            change = (new - old) / old if old else 0.0
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{name} {'.'.join(path)}: {old:,.2f} -> {new:,.2f} ({change:+.1%})")
+        old = before['queries_per_request']['mean']
+        new = after['queries_per_request']['mean']
+        if new > old:
+            regressions.append(f"{name} queries_per_request: {old:.2f} -> {new:.2f}")
+    return regressions
+
+
+def compare(args) -> None:
+    with open(args.baseline, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.results, encoding='utf-8') as results_file:
+        current = json.load(results_file)
+
+    for name, after in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            print(f"{name:<12} not in the baseline")
+            continue
+        print(
+            f"{name:<12} req/s {before['throughput_rps']:>8,.0f} -> {after['throughput_rps']:<8,.0f} "
+            f"p95 ms {before['latency_ms']['p95']:>7.2f} -> {after['latency_ms']['p95']:<7.2f} "
+            f"queries {before['queries_per_request']['mean']:>5.1f} -> {after['queries_per_request']['mean']:.1f}"
+        )
+
+    regressions = compare_results(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise SystemExit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Seed the database and benchmark the endpoints")
+    run_parser.add_argument('--players', type=int, default=10_000)
+    run_parser.add_argument('--games', type=int, default=100_000)
+    run_parser.add_argument('--rounds', type=int, default=500_000, help="Approximate number of rounds")
+    run_parser.add_argument('--requests', type=int, default=500, help="Measured requests per scenario")
+    run_parser.add_argument('--warmup', type=int, default=50, help="Unmeasured requests per scenario")
+    run_parser.add_argument('--scenario', action='append', help="Only run this scenario (repeatable)")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', default='benchmark-results.json', help="JSON file for the results")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser('compare', help="Compare results with a baseline")
+    compare_parser.add_argument('baseline', help="JSON results of the baseline run")
+    compare_parser.add_argument('results', help="JSON results to check")
+    compare_parser.add_argument(
+        '--threshold', type=float, default=0.1, help="Tolerated slowdown, as a fraction (default 0.1)"
+    )
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
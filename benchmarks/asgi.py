@@ -0,0 +1,113 @@
+"""Compare the sync and async game views under the ASGI request path.
+
+Requests go through Django's in-process ASGI client, so sync views pay the
+``sync_to_async`` hop exactly as they would under ``config.asgi``.
+
+Usage::
+
+    python -m benchmarks.asgi --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from itertools import count
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the given percentile of a list of values."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_scenario(client, requests: int, concurrency: int, make_request) -> dict:
+    """Send ``requests`` requests, ``concurrency`` at a time, and time them."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    sequence = count()
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await make_request(client, next(sequence))
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code < 400, response.content
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        'rps': requests / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def seed(games: int) -> list[str]:
+    """Create games with a couple of rounds each and return their ids."""
+    from apps.game.api.services import create_games_bulk, record_rounds
+
+    created = create_games_bulk([(f"Player {i}", f"Player {i + 1}") for i in range(games)])
+    for game in created:
+        record_rounds(game.id, [('rock', 'scissors'), ('rock', 'paper')])
+    return [str(game.id) for game in created]
+
+
+def scenarios(game_ids: list[str]) -> dict:
+    """Build the request makers of every scenario, keyed by name."""
+    def game_id(i):
+        return game_ids[i % len(game_ids)]
+
+    return {
+        'list': lambda prefix: lambda c, i: c.get(f'/{prefix}/', {'page_size': 20}),
+        'detail': lambda prefix: lambda c, i: c.get(f'/{prefix}/{game_id(i)}/'),
+        'new_game': lambda prefix: lambda c, i: c.post(
+            f'/{prefix}/new/',
+            {'player1_name': f'{prefix} bench {i}', 'player2_name': f'Player {i % 10}'},
+            content_type='application/json'
+        ),
+        'new_round': lambda prefix: lambda c, i: c.post(
+            f'/{prefix}/{game_id(i)}/rounds/new/',
+            {'player1_choice': 'rock', 'player2_choice': 'rock'},
+            content_type='application/json'
+        ),
+    }
+
+
+async def benchmark(args) -> None:
+    from django.test import AsyncClient
+
+    game_ids = await asyncio.to_thread(seed, args.games)
+    client = AsyncClient()
+    print(f"{'scenario':<10} {'stack':<6} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, make in scenarios(game_ids).items():
+        for prefix in ('sync', 'async'):
+            result = await run_scenario(client, args.requests, args.concurrency, make(prefix))
+            print(f"{name:<10} {prefix:<6} {result['rps']:>10,.0f} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per scenario and stack")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--games', type=int, default=200, help="Games seeded before the run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='pptgame-bench-')
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{workdir}/db.sqlite3')
+
+    from benchmarks import setup_django
+    setup_django()
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    settings.ROOT_URLCONF = 'benchmarks.asgi_urls'
+    call_command('migrate', verbosity=0)
+    asyncio.run(benchmark(args))
+
+
+if __name__ == '__main__':
+    main()
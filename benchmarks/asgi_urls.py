@@ -0,0 +1,15 @@
+"""URLconf serving the sync and async game views side by side."""
+from django.urls import path
+
+from apps.game.api import async_views, views
+
+
+urlpatterns = []
+
+for prefix, module in (('sync', views), ('async', async_views)):
+    urlpatterns += [
+        path(f'{prefix}/', module.GameListView.as_view()),
+        path(f'{prefix}/new/', module.NewGameView.as_view()),
+        path(f'{prefix}/<str:game_id>/', module.GameDetailView.as_view()),
+        path(f'{prefix}/<str:game_id>/rounds/new/', module.NewRoundView.as_view()),
+    ]
@@ -0,0 +1,78 @@
+"""Compare the vectorized outcome engine with per-object round resolution.
+
+Usage::
+
+    python -m benchmarks.engine --rounds 1000000
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+def per_object_resolutions_per_second(p1_choices, p2_choices) -> float:
+    """Resolve rounds one unsaved ``Round`` instance at a time.
+
+    Only the winner resolution of the ORM services is measured; the API
+    writes the resolved rounds with a single ``bulk_create``.
+    """
+    from apps.game.api.services import determine_round_winner
+    from apps.game.models import Game, Player, Round
+
+    game = Game(player1=Player(name="Player 1"), player2=Player(name="Player 2"))
+    start = time.perf_counter()
+    for p1, p2 in zip(p1_choices, p2_choices):
+        determine_round_winner(Round(game=game, player1_choice=p1, player2_choice=p2))
+    return len(p1_choices) / (time.perf_counter() - start)
+
+
+def vectorized_rounds_per_second(p1_codes, p2_codes) -> float:
+    """Resolve all rounds with a single table lookup."""
+    from apps.game.api.engine import resolve_rounds
+
+    start = time.perf_counter()
+    resolve_rounds(p1_codes, p2_codes)
+    return p1_codes.size / (time.perf_counter() - start)
+
+
+def vectorized_games_per_second(p1_codes, p2_codes) -> float:
+    """Resolve first-to-3 games laid out as ``(games, 5)`` arrays."""
+    from apps.game.api.engine import resolve_games
+
+    start = time.perf_counter()
+    resolve_games(p1_codes, p2_codes)
+    return p1_codes.shape[0] / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=1_000_000, help="Rounds for the vectorized engine")
+    parser.add_argument('--object-rounds', type=int, default=100_000, help="Rounds for the per-object resolution")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    from apps.game.api.engine import CHOICE_CODES, random_choices
+
+    names = list(CHOICE_CODES)
+    p1_codes = random_choices(args.rounds, seed=args.seed)
+    p2_codes = random_choices(args.rounds, seed=args.seed + 1)
+
+    p1_choices = [names[code] for code in p1_codes[:args.object_rounds]]
+    p2_choices = [names[code] for code in p2_codes[:args.object_rounds]]
+
+    per_object = per_object_resolutions_per_second(p1_choices, p2_choices)
+    vectorized = vectorized_rounds_per_second(p1_codes, p2_codes)
+    games = vectorized_games_per_second(
+        p1_codes[:args.rounds // 5 * 5].reshape(-1, 5),
+        p2_codes[:args.rounds // 5 * 5].reshape(-1, 5)
+    )
+
+    print(f"per-object resolve:{per_object:>14,.0f} rounds/s ({args.object_rounds:,} rounds)")
+    print(f"vectorized path: {vectorized:>16,.0f} rounds/s ({args.rounds:,} rounds)")
+    print(f"vectorized games:{games:>16,.0f} games/s (first to 3, 5 rounds each)")
+    print(f"speedup:         {vectorized / per_object:>16,.1f}x")
+
+
+if __name__ == '__main__':
+    main()
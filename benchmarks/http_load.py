@@ -0,0 +1,79 @@
+"""Closed-loop HTTP load generator for a running API server.
+
+Each client thread keeps one keep-alive connection open and sends requests
+back to back for the given duration. Only the standard library is used, so
+it can run from any machine that can reach the server.
+
+Usage::
+
+    python -m benchmarks.http_load http://localhost:8000/api/game/ \\
+        --concurrency 32 --duration 30
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def worker(url: str, deadline: float, method: str, body: bytes | None, results: list, errors: list):
+    """Send requests over one connection until the deadline."""
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    headers = {'Content-Type': 'application/json'} if body else {}
+    latencies = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            connection.close()
+            continue
+        if response.status >= 400:
+            errors.append(response.status)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    results.extend(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds to run")
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--data', help="JSON body to send with every request")
+    args = parser.parse_args()
+
+    body = json.dumps(json.loads(args.data)).encode() if args.data else None
+    results, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(args.url, deadline, args.method, body, results, errors))
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if not results:
+        raise SystemExit(f"No successful requests ({len(errors)} errors)")
+    results.sort()
+    print(f"requests:   {len(results)}")
+    print(f"errors:     {len(errors)}")
+    print(f"throughput: {len(results) / args.duration:,.1f} req/s")
+    print(f"latency:    p50 {statistics.median(results) * 1000:.1f} ms, "
+          f"p90 {results[int(len(results) * 0.9)] * 1000:.1f} ms, "
+          f"p99 {results[min(len(results) - 1, int(len(results) * 0.99))] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Compare GameSerializer with the fast read path when rendering game lists.
+
+Both paths fetch the same games from the database and produce the same
+bytes; the time reported covers fetching, building and encoding the
+payload, normalized per 1,000 games.
+
+Usage::
+
+    python -m benchmarks.rendering --games 1000 --rounds 5 --repeat 5
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+def seed(games: int, rounds: int) -> None:
+    """Create games with ``rounds`` rounds each."""
+    from apps.game.api.services import create_games_bulk
+    from apps.game.models import Round
+
+    created = create_games_bulk([(f"Player {i}", f"Player {i + 1}") for i in range(games)])
+    Round.objects.bulk_create(
+        [
+            Round(
+                game=game,
+                round_number=number,
+                player1_choice='rock',
+                player2_choice='scissors',
+                round_winner_id=game.player1_id
+            )
+            for game in created
+            for number in range(1, rounds + 1)
+        ],
+        batch_size=500
+    )
+
+
+def serializer_path() -> bytes:
+    from rest_framework.renderers import JSONRenderer
+    from apps.game.api.serializers import GameSerializer
+    from apps.game.models import Game
+
+    return JSONRenderer().render(GameSerializer(Game.objects.with_details(), many=True).data)
+
+
+def fast_path() -> bytes:
+    from apps.game.api.rendering import render_games
+    from apps.game.models import Game
+
+    return render_games(Game.objects.all())
+
+
+def best_time(render, repeat: int) -> float:
+    """Return the best of ``repeat`` runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=5, help="Rounds per game")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from apps.game.api import rendering
+
+    call_command('migrate', verbosity=0)
+    seed(args.games, args.rounds)
+
+    if serializer_path() != fast_path():
+        raise SystemExit("The fast path does not match the serializer output")
+
+    scale = 1000 / args.games * 1000
+    before = best_time(serializer_path, args.repeat)
+    after = best_time(fast_path, args.repeat)
+    encoder = 'orjson' if rendering.orjson is not None else 'json'
+    print(f"GameSerializer:       {before * scale:8.1f} ms per 1,000 games")
+    print(f"fast path ({encoder}):  {after * scale:8.1f} ms per 1,000 games")
+    print(f"speedup:              {before / after:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
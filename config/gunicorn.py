@@ -0,0 +1,38 @@
+"""Gunicorn configuration, tunable through environment variables.
+
+Worker classes:
+
+- ``sync``: one request per process; simplest, CPU-bound workloads.
+- ``gthread``: ``GUNICORN_THREADS`` requests per process; good default for
+  the DB-bound WSGI API.
+- ``uvicorn_worker.UvicornWorker``: serves ``config.asgi`` on an event loop;
+  required for the SSE game events and the async views (``GAME_API_ASYNC``).
+
+With ``GAME_ROUND_WRITE_BEHIND`` every round must reach the process that owns
+the round journal, so the server runs a single worker by default and refuses
+to start with more.
+"""
+import multiprocessing
+import os
+from pathlib import Path
+
+import environ
+
+
+env = environ.Env(GAME_ROUND_WRITE_BEHIND=(bool, False))
+environ.Env.read_env(Path(__file__).resolve().parent / '.env')
+write_behind = env('GAME_ROUND_WRITE_BEHIND')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1 if write_behind else multiprocessing.cpu_count() * 2 + 1))
+if write_behind and workers > 1:
+    raise RuntimeError(
+        f"GAME_ROUND_WRITE_BEHIND needs a single worker accepting rounds, got GUNICORN_WORKERS={workers}"
+    )
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
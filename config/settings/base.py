@@ -7,6 +7,7 @@ import sentry_sdk
 # Initialize environment variables
 env = environ.Env(
     DJANGO_SECRET_KEY=(str, ''),
+    DJANGO_DEBUG=(bool, True),
     ALLOWED_HOSTS=(list, []),
     CORS_ALLOWED_ORIGINS=(list, []),
     USE_DOCKER=(bool, False),
@@ -20,6 +21,31 @@ env = environ.Env(
     DATABASE_URL= (str, ''),
     SENTRY_DNS=(str, ''),
     ENABLE_SENTRY=(bool, False),
+    GAME_EVENTS_BROKER=(str, 'apps.game.api.events.InProcessBroker'),
+    GAME_API_ASYNC=(bool, False),
+    GAME_API_FAST_RENDER=(bool, False),
+    GAME_IDEMPOTENCY_KEY_TTL=(int, 60 * 60 * 24),
+    CACHE_URL=(str, 'locmemcache://'),
+    GAME_PAYLOADS_CACHE_URL=(str, 'locmemcache://game-payloads'),
+    LEADERBOARD_CACHE_URL=(str, 'locmemcache://leaderboard'),
+    IDEMPOTENCY_CACHE_URL=(str, 'locmemcache://idempotency'),
+    RATE_LIMITS_CACHE_URL=(str, 'locmemcache://rate-limits'),
+    MATCHMAKING_CACHE_URL=(str, 'locmemcache://matchmaking'),
+    GAME_CACHE_VERSION=(int, 1),
+    GAME_API_THROTTLE_RATE=(str, ''),
+    GAME_API_METRICS=(bool, True),
+    GAME_METRICS_ALLOWED_IPS=(list, ['127.0.0.1', '::1']),
+    GAME_METRICS_TOKEN=(str, ''),
+    GAME_MATCHMAKING_BACKEND=(str, 'apps.game.api.matchmaking.LocalMatchmaker'),
+    GAME_MATCHMAKING_BRACKET_SIZE=(int, 5),
+    GAME_MATCHMAKING_WIDEN_AFTER=(float, 5.0),
+    GAME_MATCHMAKING_INTERVAL=(float, 0.5),
+    GAME_ROUND_WRITE_BEHIND=(bool, False),
+    GAME_ROUND_JOURNAL_PATH=(str, ''),
+    GAME_ROUND_FLUSH_INTERVAL=(float, 0.2),
+    GAME_ROUND_FLUSH_SIZE=(int, 1000),
+    GAME_ROUND_MAX_BACKLOG=(int, 100000),
+    GAME_ROUND_FLUSH_ATTEMPTS=(int, 10),
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -33,7 +59,7 @@ environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
 SECRET_KEY = env('DJANGO_SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env('DJANGO_DEBUG')
 
 ALLOWED_HOSTS = env('ALLOWED_HOSTS')
 
@@ -69,6 +95,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Must stay last: it times the rendering of responses.
+    'apps.game.api.metrics.RequestMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -110,6 +138,35 @@ if env('ENABLE_SENTRY'):
 
 DATABASES = {"default": env.db("DATABASE_URL")}
 
+# CACHES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+# Every cache is configured with a URL: locmemcache://<name>, filecache:///<dir>,
+# rediscache://<host>:<port>/<db> or pymemcache://<host>:<port>. The named
+# caches of the game app are described in apps/game/api/cache.py.
+CACHES = {
+    'default': env.cache_url('CACHE_URL'),
+    'game_payloads': env.cache_url('GAME_PAYLOADS_CACHE_URL'),
+    'leaderboard': env.cache_url('LEADERBOARD_CACHE_URL'),
+    'idempotency': env.cache_url('IDEMPOTENCY_CACHE_URL'),
+    'rate_limits': env.cache_url('RATE_LIMITS_CACHE_URL'),
+    'matchmaking': env.cache_url('MATCHMAKING_CACHE_URL'),
+}
+
+# Local memory and file caches use the instrumented backends of the game app,
+# which count hits, misses and evictions.
+INSTRUMENTED_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache': 'apps.game.api.cache.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache': 'apps.game.api.cache.FileBasedCache',
+}
+for config in CACHES.values():
+    config['BACKEND'] = INSTRUMENTED_CACHE_BACKENDS.get(config['BACKEND'], config['BACKEND'])
+
+# Bump to drop every cached game payload and ranking at once, e.g. when their
+# format changes in a deploy.
+CACHES['game_payloads']['VERSION'] = env('GAME_CACHE_VERSION')
+CACHES['leaderboard']['VERSION'] = env('GAME_CACHE_VERSION')
+
 # LOGGING
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#logging
@@ -189,6 +246,13 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.game.api.throttling.GameRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        # e.g. "100/minute"; empty disables throttling.
+        'game': env('GAME_API_THROTTLE_RATE') or None,
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -196,4 +260,45 @@ SPECTACULAR_SETTINGS = {
     'DESCRIPTION': 'API for the PPT Game',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
-}
\ No newline at end of file
+}
+
+# GAME
+# ------------------------------------------------------------------------------
+# Import path of the broker used to push real-time game events to subscribers.
+GAME_EVENTS_BROKER = env('GAME_EVENTS_BROKER')
+# Serve the core game endpoints with native async views (use under ASGI).
+GAME_API_ASYNC = env('GAME_API_ASYNC')
+# Render the game list and detail payloads without DRF serializers.
+GAME_API_FAST_RENDER = env('GAME_API_FAST_RENDER')
+# Seconds an Idempotency-Key is remembered before purge_idempotency_keys deletes it.
+GAME_IDEMPOTENCY_KEY_TTL = env('GAME_IDEMPOTENCY_KEY_TTL')
+# Measure the queries, timings and size of game API requests, reported in
+# Server-Timing headers and on /metrics.
+GAME_API_METRICS = env('GAME_API_METRICS')
+# Addresses or networks allowed to read /metrics without a token.
+GAME_METRICS_ALLOWED_IPS = env('GAME_METRICS_ALLOWED_IPS')
+# Bearer token that grants access to /metrics from any address (empty: none).
+GAME_METRICS_TOKEN = env('GAME_METRICS_TOKEN')
+# Import path of the matchmaker that pairs the players waiting for a game; use
+# apps.game.api.matchmaking.CacheMatchmaker with a shared matchmaking cache when
+# more than one worker serves the API.
+GAME_MATCHMAKING_BACKEND = env('GAME_MATCHMAKING_BACKEND')
+# Points of score per matchmaking bracket; players are paired within a bracket.
+GAME_MATCHMAKING_BRACKET_SIZE = env('GAME_MATCHMAKING_BRACKET_SIZE')
+# Seconds of waiting after which a player accepts opponents one bracket further.
+GAME_MATCHMAKING_WIDEN_AFTER = env('GAME_MATCHMAKING_WIDEN_AFTER')
+# Minimum seconds between two runs of the matchmaking scheduler.
+GAME_MATCHMAKING_INTERVAL = env('GAME_MATCHMAKING_INTERVAL')
+# Acknowledge rounds from memory and write them in batches in the background
+# (only for a single process accepting rounds, see apps.game.api.ingestion).
+GAME_ROUND_WRITE_BEHIND = env('GAME_ROUND_WRITE_BEHIND')
+# Append-only journal of the acknowledged rounds not written yet.
+GAME_ROUND_JOURNAL_PATH = env('GAME_ROUND_JOURNAL_PATH') or str(BASE_DIR.parent / 'round-journal.ndjson')
+# Seconds between two batches of write-behind rounds.
+GAME_ROUND_FLUSH_INTERVAL = env('GAME_ROUND_FLUSH_INTERVAL')
+# Pending write-behind rounds that trigger a batch before the interval ends.
+GAME_ROUND_FLUSH_SIZE = env('GAME_ROUND_FLUSH_SIZE')
+# Write-behind rounds waiting to be written past which new rounds get a 503.
+GAME_ROUND_MAX_BACKLOG = env('GAME_ROUND_MAX_BACKLOG')
+# Failed attempts after which a batch of rounds is moved to the .failed journal.
+GAME_ROUND_FLUSH_ATTEMPTS = env('GAME_ROUND_FLUSH_ATTEMPTS')
@@ -0,0 +1,36 @@
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, env
+
+
+# GENERAL
+# ------------------------------------------------------------------------------
+# With DEBUG on, Django keeps every executed query in memory for the lifetime
+# of the request, so it must stay off when serving real traffic.
+DEBUG = env.bool('DJANGO_DEBUG', default=False)
+
+# DATABASES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/5.2/ref/databases/#persistent-connections
+# Reuse database connections across requests instead of opening a new one per
+# request, and check them before reuse so a dropped connection is replaced
+# transparently.
+DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# https://docs.djangoproject.com/en/5.2/ref/databases/#connection-pool
+# Optional connection pool, shared by the threads of a worker. Requires the
+# psycopg 3 driver with its pool extra (`pip install "psycopg[binary,pool]"`)
+# and replaces persistent connections, which must be disabled.
+if env.bool('DJANGO_DB_POOL', default=False):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': env.int('DJANGO_DB_POOL_MIN_SIZE', default=2),
+        'max_size': env.int('DJANGO_DB_POOL_MAX_SIZE', default=10),
+        'timeout': env.int('DJANGO_DB_POOL_TIMEOUT', default=10),
+    }
+
+# SECURITY
+# ------------------------------------------------------------------------------
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SESSION_COOKIE_SECURE = env.bool('DJANGO_SECURE_COOKIES', default=True)
+CSRF_COOKIE_SECURE = env.bool('DJANGO_SECURE_COOKIES', default=True)
@@ -7,10 +7,13 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from apps.game.api.views import MetricsView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/game/', include('apps.game.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 
     # API schema generation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
 
 application = get_wsgi_application()
+
+from apps.game.api.ingestion import start_ingestor  # noqa: E402
+
+start_ingestor()